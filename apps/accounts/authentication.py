@@ -0,0 +1,32 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import ACTIVE_CLAIM, ROLE_CLAIM, VERSION_CLAIM
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds ``request.user`` from the token's claims
+    instead of fetching the row. The user only has ``id``, ``role`` and
+    ``is_active`` loaded; any other field is fetched from the database the
+    first time it is read. Tokens are checked against the user's token
+    version when they are decoded (see ``apps.accounts.tokens``).
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            # Issued before tokens carried claims: look the user up
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        if not validated_token.get(ACTIVE_CLAIM, False):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return self.user_model.from_db(
+            'default',
+            ['id', 'role', 'is_active'],
+            [user_id, validated_token[ROLE_CLAIM], True],
+        )
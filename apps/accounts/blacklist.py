@@ -0,0 +1,169 @@
+"""
+Fast refresh-token blacklist checks.
+
+Every refresh checks its token against ``BlacklistedToken``, and almost
+every token checked was never blacklisted. Each process keeps a Bloom
+filter of the blacklisted jtis that have not expired yet: a jti the
+filter has not seen is not blacklisted, and only the rest (blacklisted
+tokens and the filter's ``TOKEN_BLACKLIST_FALSE_POSITIVE_RATE``) go to
+the database.
+
+The filter is rebuilt every ``TOKEN_BLACKLIST_REBUILD_SECONDS``, which
+drops pruned and expired entries. In between, blacklisting a token bumps
+a generation counter in the cache; a process that sees a new generation
+adds the rows blacklisted since its last look, by ``blacklisted_at``
+with ``TOKEN_BLACKLIST_SYNC_OVERLAP_SECONDS`` of overlap for rows whose
+transaction was still open, before answering.
+
+The filter only answers "not blacklisted" when it can be trusted: with a
+per-process cache (locmem, dummy) or while the generation is unknown,
+every check goes to the database.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.core import metrics
+
+GENERATION_KEY = 'tokbl:generation'
+MIN_CAPACITY = 10000  # room for the entries added between rebuilds
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+BLACKLIST_CHECKS = metrics.Counter(
+    'eventhub_jwt_blacklist_checks_total', 'Refresh token blacklist checks by result.', ['result'],
+)
+TOKEN_ROWS = metrics.Gauge(
+    'eventhub_jwt_token_rows', 'Rows in the outstanding and blacklisted token tables.', ['table'], mode='max',
+)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenBlacklistFilter:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.bloom = None
+        self.built_at = 0.0
+        self.loaded_since = None  # rows blacklisted from here on are loaded by the next sync
+        self.generation = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        # Other workers' blacklistings only reach us through a shared cache
+        return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+    def might_contain(self, jti: str) -> bool:
+        """False only if ``jti`` is certainly not blacklisted; when in doubt, True."""
+        if not self.enabled or not self._sync():
+            return True
+        return jti in self.bloom
+
+    def added(self, jti: str) -> None:
+        """Record a token blacklisted by this process; others catch up through the generation."""
+        with self._lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+        transaction.on_commit(_bump_generation)
+
+    def stats(self) -> dict:
+        bloom = self.bloom
+        return {
+            'enabled': self.enabled,
+            'entries': bloom.count if bloom else 0,
+            'bits': bloom.size if bloom else 0,
+            'hashes': bloom.hashes if bloom else 0,
+            'age_seconds': round(time.monotonic() - self.built_at, 1) if bloom else None,
+        }
+
+    def _sync(self) -> bool:
+        """Bring the filter up to date; False if it cannot be trusted for this check."""
+        # Read the generation first: rows committed after this read bump it again
+        generation = cache.get(GENERATION_KEY)
+        if generation is None:
+            # Never set or evicted: start a new one (time-based, so it cannot
+            # match a version anyone has seen) and ask the database this time
+            cache.add(GENERATION_KEY, _new_generation(), timeout=None)
+            return False
+        with self._lock:
+            if self.bloom is None or time.monotonic() - self.built_at >= settings.TOKEN_BLACKLIST_REBUILD_SECONDS:
+                self._rebuild()
+            elif generation != self.generation:
+                self._load_recent()
+            self.generation = generation
+        return True
+
+    def _load_recent(self) -> None:
+        # Ids and timestamps can commit out of order: reload an overlapping
+        # window so rows from transactions still open at the last sync are seen
+        started = timezone.now()
+        since = self.loaded_since - timedelta(seconds=settings.TOKEN_BLACKLIST_SYNC_OVERLAP_SECONDS)
+        for jti in BlacklistedToken.objects.filter(blacklisted_at__gte=since).values_list('token__jti', flat=True):
+            self.bloom.add(jti)
+        self.loaded_since = started
+
+    def _rebuild(self) -> None:
+        started = timezone.now()
+        jtis = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow()).values_list('token__jti', flat=True)
+        )
+        bloom = BloomFilter(max(MIN_CAPACITY, 2 * len(jtis)), settings.TOKEN_BLACKLIST_FALSE_POSITIVE_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom, self.loaded_since, self.built_at = bloom, started, time.monotonic()
+        token_rows_update()
+
+
+def _new_generation() -> int:
+    return time.time_ns() // 1000
+
+
+def _bump_generation() -> None:
+    if not cache.add(GENERATION_KEY, _new_generation(), timeout=None):
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:  # evicted in between
+            cache.set(GENERATION_KEY, _new_generation(), timeout=None)
+
+
+def token_rows_update() -> None:
+    TOKEN_ROWS.set(OutstandingToken.objects.count(), table='outstanding')
+    TOKEN_ROWS.set(BlacklistedToken.objects.count(), table='blacklisted')
+
+
+token_blacklist = TokenBlacklistFilter()
+os.register_at_fork(after_in_child=token_blacklist.reset)
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .blacklist import LOCAL_CACHE_BACKENDS
+
+
+@register()
+def token_blacklist_cache_check(app_configs, **kwargs):
+    """The blacklist Bloom filter turns itself off on a per-process cache."""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [Warning(
+        f'The refresh token blacklist filter is disabled: {backend} is not shared '
+        'between workers, so every refresh checks the database.',
+        hint='Set CACHE_BACKEND to a shared cache such as django.core.cache.backends.redis.RedisCache.',
+        id='accounts.W001',
+    )]
@@ -0,0 +1,49 @@
+"""
+Delete expired refresh tokens from the outstanding and blacklisted token
+tables, which otherwise grow with every login, refresh and logout.
+
+Meant to run from cron (or with ``--every`` as a long-running worker).
+Concurrent runs are serialized by an advisory lock; a run that cannot
+take it exits without doing anything.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.accounts import services
+from apps.core.locks import advisory_lock
+
+LOCK_NAME = 'eventhub.prune_token_blacklist'
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted refresh tokens in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=services.TOKEN_PRUNE_CHUNK_SIZE, help='Tokens per DELETE')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the tokens that would be deleted')
+        parser.add_argument('--every', type=int, help='Keep running, pruning every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            self.prune(options)
+            if not options['every']:
+                return
+            time.sleep(options['every'])
+
+    def prune(self, options):
+        now = aware_utcnow()
+        if options['dry_run']:
+            count = OutstandingToken.objects.filter(expires_at__lt=now).count()
+            self.stdout.write(f'{count} expired token(s) would be deleted')
+            return
+
+        with advisory_lock(LOCK_NAME) as acquired:
+            if not acquired:
+                self.stdout.write('Another prune is running; skipping')
+                return
+            started = time.perf_counter()
+            deleted = services.token_blacklist_prune(before=now, chunk_size=options['chunk_size'])
+            self.stdout.write(f'Deleted {deleted} expired token(s) in {time.perf_counter() - started:.1f} s')
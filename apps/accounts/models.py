@@ -59,3 +59,23 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     
     def __str__(self):
         return f"{self.full_name} ({self.email})"
+
+    def refresh_from_db(self, using=None, fields=None):
+        # Users built from token claims defer most fields: load them all
+        # with the first one read instead of one query per field.
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
+
+
+class UserTokenVersion(models.Model):
+    """
+    Current version of a user's JWTs. Tokens carry the version they were
+    issued with; bumping it revokes every token issued before.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='token_version')
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'user_token_versions'
@@ -1,10 +1,25 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import QuerySet
 
+from .models import UserTokenVersion
+
 User = get_user_model()
 
+TOKEN_VERSION_KEY = 'tokver:{}'
+
 def user_list() -> QuerySet:
     return User.objects.filter(role='organizer')
 
 def user_get_by_id(user_id: int) -> User:
     return User.objects.get(id=user_id)
+
+def user_token_version(user_id: int) -> int:
+    """Current JWT version of a user, cached; 0 until first bumped."""
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = UserTokenVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+        cache.set(key, version, timeout=settings.TOKEN_VERSION_CACHE_SECONDS)
+    return version
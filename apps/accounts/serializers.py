@@ -2,8 +2,10 @@
 SERIALIZERS - Data validation and transformation (Controller layer)
 """
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from django.contrib.auth import authenticate
 from .models import User
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -86,3 +88,8 @@ class ChangePasswordSerializer(serializers.Serializer):
         if attrs['new_password'] != attrs['new_password2']:
             raise serializers.ValidationError({"new_password": "New passwords do not match"})
         return attrs
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh with versioned tokens, so revoked refresh tokens are rejected"""
+    token_class = RefreshToken
@@ -1,9 +1,21 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db import transaction
-from django.core.exceptions import ValidationError
+from django.db.models import F
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from apps.core import metrics
+from .blacklist import token_rows_update
+from .models import UserTokenVersion
+from .selectors import TOKEN_VERSION_KEY
 
 User = get_user_model()
 
+TOKEN_PRUNE_CHUNK_SIZE = 1000
+
+TOKENS_PRUNED = metrics.Counter('eventhub_jwt_tokens_pruned_total', 'Expired outstanding tokens deleted.')
+
 def user_create(*, email: str, password: str, full_name: str, **extra_fields) -> User:
     # Pop fields that are not in the model but might be passed from serializers
     extra_fields.pop('password2', None)
@@ -27,20 +39,55 @@ def user_update(*, user: User, data) -> User:
     user.save()
     return user
 
-def user_toggle_status(*, user: User) -> bool:
-    user.is_active = not user.is_active
-    user.save(update_fields=['is_active'])
-    return user.is_active
-
-def user_change_role(*, user: User, role: str) -> User:
-    if role not in dict(User.ROLE_CHOICES):
-        raise ValidationError(f"Invalid role: {role}")
-    
-    user.role = role
-    user.is_staff = (role == 'admin')
-    user.save(update_fields=['role', 'is_staff'])
-    return user
-
+@transaction.atomic
 def user_change_password(*, user: User, new_password: str) -> None:
     user.set_password(new_password)
     user.save(update_fields=['password'])
+    user_token_versions_bump(user_ids=[user.pk])
+
+def user_token_versions_bump(*, user_ids) -> None:
+    """
+    Revoke every JWT issued so far to these users. Tokens carry the role
+    and active flag they were issued with: the User receivers call this
+    whenever either changes, and password changes call it too.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    with transaction.atomic():
+        existing = set(
+            UserTokenVersion.objects.select_for_update().filter(user_id__in=user_ids).values_list('user_id', flat=True)
+        )
+        UserTokenVersion.objects.filter(user_id__in=existing).update(version=F('version') + 1)
+        UserTokenVersion.objects.bulk_create(
+            [UserTokenVersion(user_id=user_id, version=1) for user_id in user_ids - existing],
+            ignore_conflicts=True,
+        )
+        keys = [TOKEN_VERSION_KEY.format(user_id) for user_id in user_ids]
+        # After commit, so a reader can never re-cache the old version
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+def token_blacklist_prune(*, before=None, chunk_size: int = TOKEN_PRUNE_CHUNK_SIZE) -> int:
+    """
+    Delete outstanding tokens that expired before ``before`` (default:
+    now), with their blacklist entries: an expired token fails
+    verification anyway. ``expires_at`` has no index, so the table is
+    walked in primary key order (roughly issue order), ``chunk_size``
+    expired rows per transaction, and no statement locks more than one
+    chunk. Returns the number of tokens deleted.
+    """
+    before = before or aware_utcnow()
+    expired = OutstandingToken.objects.filter(expires_at__lt=before).order_by('id')
+    deleted, last_id = 0, 0
+    while True:
+        pks = list(expired.filter(id__gt=last_id).values_list('id', flat=True)[:chunk_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            # BlacklistedToken rows cascade in one DELETE
+            OutstandingToken.objects.filter(id__in=pks).delete()
+        deleted += len(pks)
+        last_id = pks[-1]
+        TOKENS_PRUNED.inc(len(pks))
+    token_rows_update()
+    return deleted
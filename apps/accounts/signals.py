@@ -0,0 +1,48 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.cache import invalidate_on_commit
+from apps.core.signals import soft_deleted
+from .models import User
+from .services import user_token_versions_bump
+
+
+@receiver(post_save, sender=User)
+def user_cache_invalidate(sender, instance, update_fields=None, **kwargs):
+    # Event responses embed the organizer's full name; ignore the
+    # last_login/password writes that happen on every login.
+    if update_fields is not None and 'full_name' not in update_fields:
+        return
+    invalidate_on_commit('users')
+
+
+# Fields whose change must revoke the user's JWTs: tokens carry the role
+# and active flag, and staff status goes with the role
+TOKEN_CLAIM_FIELDS = ('role', 'is_active', 'is_staff')
+
+
+@receiver(pre_save, sender=User)
+def user_token_claims_check(sender, instance, update_fields=None, **kwargs):
+    # Compare with the stored row, not the loaded one: users built from
+    # token claims carry the role the token was issued with
+    instance._token_claims_changed = False
+    if instance._state.adding or (update_fields is not None and not set(TOKEN_CLAIM_FIELDS) & set(update_fields)):
+        return
+    stored = User.objects.filter(pk=instance.pk).values_list(*TOKEN_CLAIM_FIELDS).first()
+    current = tuple(getattr(instance, field) for field in TOKEN_CLAIM_FIELDS)
+    instance._token_claims_changed = stored is not None and stored != current
+
+
+@receiver(post_save, sender=User)
+def user_tokens_revoke_on_change(sender, instance, **kwargs):
+    # Any save counts (API, admin, shell): tokens issued before the change
+    # stop verifying, refresh tokens included
+    if getattr(instance, '_token_claims_changed', False):
+        user_token_versions_bump(user_ids=[instance.pk])
+
+
+@receiver(soft_deleted, sender=User)
+def user_tokens_revoke(sender, pks, **kwargs):
+    # Claim-built users are never looked up, so deleted users' tokens
+    # must stop verifying.
+    user_token_versions_bump(user_ids=pks)
@@ -0,0 +1,68 @@
+"""
+JWTs that carry what permission checks need about their user.
+
+Besides the user id, tokens are issued with the user's ``role``, active
+flag and token version (``ver``, see ``UserTokenVersion``), so
+``StatelessJWTAuthentication`` can authenticate a request without
+loading the user row. A token whose version is behind the user's current
+one is rejected, for access and refresh alike, which is how role,
+status and password changes revoke the tokens issued before them.
+Tokens issued without a version (before this change) are still
+accepted and authenticated against the database.
+
+Refresh tokens check the blacklist through the Bloom filter in
+``apps.accounts.blacklist`` first.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken as BaseAccessToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .blacklist import BLACKLIST_CHECKS, token_blacklist
+from .selectors import user_token_version
+
+ROLE_CLAIM = 'role'
+ACTIVE_CLAIM = 'active'
+VERSION_CLAIM = 'ver'
+
+
+class VersionedTokenMixin:
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[ACTIVE_CLAIM] = user.is_active
+        token[VERSION_CLAIM] = user_token_version(user.pk)
+        return token
+
+    def verify(self, *args, **kwargs) -> None:
+        super().verify(*args, **kwargs)
+        version = self.payload.get(VERSION_CLAIM)
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if version is not None and user_id is not None and version != user_token_version(user_id):
+            raise TokenError(_('Token has been revoked'))
+
+
+class AccessToken(VersionedTokenMixin, BaseAccessToken):
+    pass
+
+
+class RefreshToken(VersionedTokenMixin, BaseRefreshToken):
+    access_token_class = AccessToken
+
+    def check_blacklist(self) -> None:
+        if not token_blacklist.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            BLACKLIST_CHECKS.inc(result='filtered')
+            return
+        try:
+            super().check_blacklist()
+        except TokenError:
+            BLACKLIST_CHECKS.inc(result='blacklisted')
+            raise
+        BLACKLIST_CHECKS.inc(result='false_positive')
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        token_blacklist.added(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
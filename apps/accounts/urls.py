@@ -1,10 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     AccountRegistrationView,
     AccountLoginView,
     AccountLogoutView,
+    TokenRefreshView,
     UserViewSet,
 )
 
@@ -2,7 +2,9 @@ from rest_framework import status, permissions, viewsets, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -13,9 +15,15 @@ from .serializers import (
     UserProfileUpdateSerializer,
 )
 from .permissions import IsAdminRole
+from .services import user_change_password
+from .tokens import RefreshToken
+from apps.core import metrics
 
 User = get_user_model()
 
+LOGINS = metrics.Counter('eventhub_logins_total', 'Login attempts by result.', ['result'])
+TOKENS_ISSUED = metrics.Counter('eventhub_jwt_issued_total', 'JWT pairs or access tokens issued, by source.', ['source'])
+
 class AccountRegistrationView(APIView):
     permission_classes = [permissions.AllowAny]
     
@@ -24,6 +32,7 @@ class AccountRegistrationView(APIView):
         if serializer.is_valid():
             user = serializer.save()
             refresh = RefreshToken.for_user(user)
+            TOKENS_ISSUED.inc(source='register')
             return Response({
                 'message': 'User registered successfully',
                 'user': UserSerializer(user).data,
@@ -41,9 +50,11 @@ class AccountLoginView(APIView):
         serializer = UserLoginSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            user.last_login = timezone.now()
-            user.save(update_fields=['last_login'])
+            # One UPDATE, without the post_save handlers
+            User.objects.filter(pk=user.pk).update(last_login=timezone.now())
             refresh = RefreshToken.for_user(user)
+            LOGINS.inc(result='success')
+            TOKENS_ISSUED.inc(source='login')
             return Response({
                 'message': 'Login successful',
                 'user': UserSerializer(user).data,
@@ -52,26 +63,37 @@ class AccountLoginView(APIView):
                     'access': str(refresh.access_token),
                 }
             }, status=status.HTTP_200_OK)
+        LOGINS.inc(result='failure')
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class AccountLogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request):
-        try:
-            refresh_token = request.data.get("refresh_token")
-            if refresh_token:
+        refresh_token = request.data.get("refresh_token")
+        if refresh_token:
+            try:
                 token = RefreshToken(refresh_token)
-                token.blacklist()
-            return Response({"message": "Successfully logged out"}, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except TokenError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if token.get(api_settings.USER_ID_CLAIM) != request.user.pk:
+                return Response({"error": "Token belongs to another user"}, status=status.HTTP_400_BAD_REQUEST)
+            token.blacklist()
+        return Response({"message": "Successfully logged out"}, status=status.HTTP_200_OK)
+
+class TokenRefreshView(BaseTokenRefreshView):
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            TOKENS_ISSUED.inc(source='refresh')
+        return response
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['full_name', 'email', 'mobile_number']
+    keyset_ordering = ('-date_joined', '-id')
 
     def get_permissions(self):
         if self.action == 'create':
@@ -121,8 +143,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        user.set_password(new_password)
-        user.save()
+        user_change_password(user=user, new_password=new_password)
         
         return Response(
             {'message': 'Password changed successfully'},
@@ -0,0 +1,33 @@
+from django.contrib import admin, messages
+
+
+class SoftDeleteAdminMixin:
+    """
+    Admin for ``SoftDeleteModel`` subclasses: lists deleted rows too (filter
+    on "is deleted"), and deletes/restores selections in bulk with one
+    UPDATE each instead of one ``save()`` per row.
+    """
+    actions = ['soft_delete_selected', 'restore_selected']
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_list_filter(self, request):
+        return [*super().get_list_filter(request), 'is_deleted']
+
+    def delete_queryset(self, request, queryset):
+        queryset.soft_delete()
+
+    @admin.action(description='Soft delete selected %(verbose_name_plural)s', permissions=['delete'])
+    def soft_delete_selected(self, request, queryset):
+        count = queryset.soft_delete()
+        self.message_user(request, f'Soft-deleted {count} row(s).', messages.SUCCESS)
+
+    @admin.action(description='Restore selected %(verbose_name_plural)s', permissions=['change'])
+    def restore_selected(self, request, queryset):
+        count = queryset.restore()
+        self.message_user(request, f'Restored {count} row(s).', messages.SUCCESS)
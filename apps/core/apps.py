@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        from . import metrics
+        from .db.metrics import install_query_timer
+        connection_created.connect(install_query_timer, dispatch_uid='metrics')
+        metrics.start()
+
+        if settings.PROFILER_ENABLED:
+            from .profiling import install_query_hook, install_serializer_hook
+            connection_created.connect(install_query_hook, dispatch_uid='profiler')
+            install_serializer_hook()
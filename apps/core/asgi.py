@@ -0,0 +1,43 @@
+"""
+ASGI wrappers applied in config/asgi.py.
+"""
+import asyncio
+
+
+class FinishRequestMiddleware:
+    """
+    Make sure Django finishes every request it has answered.
+
+    Django 5.0's ASGIHandler listens for ``http.disconnect`` while a
+    request runs and cancels it when one arrives, including after the
+    body was sent but before ``response.close()`` fired
+    ``request_finished``. Servers such as uvicorn report a disconnect as
+    soon as the response is complete, so that signal, and with it
+    ``close_old_connections()``, was regularly skipped and database
+    connections leaked. A disconnect that arrives after the final body
+    is held back until Django has finished; earlier ones pass through.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.application(scope, receive, send)
+
+        response_sent = False
+
+        async def guarded_receive():
+            message = await receive()
+            if message['type'] == 'http.disconnect' and response_sent:
+                # Django cancels this listener once the request is done
+                await asyncio.Future()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_sent
+            if message['type'] == 'http.response.body' and not message.get('more_body'):
+                response_sent = True
+            await send(message)
+
+        return await self.application(scope, guarded_receive, tracking_send)
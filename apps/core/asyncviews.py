@@ -0,0 +1,159 @@
+"""
+Async GET for public read endpoints.
+
+``AsyncReadView`` serves a viewset's ``list`` or ``retrieve`` with the
+async ORM, so under an ASGI server a request waiting on the database
+does not hold a worker thread. It reuses the viewset for everything that
+is not I/O (queryset, filters, serializer, pagination links, cache keys
+and ETags), so bodies and headers match the DRF view, and the two share
+response cache entries.
+
+Anything else on the same URL is handed to the sync DRF view: other
+methods, the browsable API, keyset pagination (``?cursor=``,
+``?pagination=``), ``?count=false`` and any request the async path
+cannot answer with a 200 or 304 (validation errors, missing objects,
+out-of-range pages), so error responses are DRF's own.
+
+The async path never authenticates; use it for ``AllowAny`` reads only.
+Viewsets with ``ReplicaReadMixin`` read from a replica here too, pinned
+by the client's cookie only (no user to look up).
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+
+from .cache import _count
+from .conditional import set_validators
+from .db.routers import replica_reads
+
+
+class Fallback(Exception):
+    """The async path cannot serve this request; use the sync view."""
+
+
+class AsyncReadView(View):
+    viewset = None     # ConditionalGetMixin + CachedResponseMixin viewset
+    action = 'list'    # 'list' or 'retrieve'
+    sync_view = None   # DRF view for the same URL
+    sync_query_params = ('cursor', 'pagination', 'count', 'format')
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # DRF views are csrf-exempt (they check CSRF on session auth only)
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def get(self, request, *args, **kwargs):
+        if 'text/html' in request.headers.get('Accept', '') or any(
+            param in request.GET for param in self.sync_query_params
+        ):
+            return await self.fallback(request, *args, **kwargs)
+        try:
+            return await self.read(request, *args, **kwargs)
+        except Fallback:
+            return await self.fallback(request, *args, **kwargs)
+
+    async def fallback(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    post = put = patch = delete = options = fallback
+
+    def get_viewset(self, request, *args, **kwargs):
+        view = self.viewset(action_map={'get': self.action}, args=args, kwargs=kwargs, format_kwarg=None)
+        view.request = view.initialize_request(request, *args, **kwargs)
+        return view
+
+    def get_queryset(self, view):
+        """
+        The viewset's filtered queryset, built on a thread: filters may
+        validate values against the DB. Also returns whether to read it
+        from a replica.
+        """
+        try:
+            queryset = view.get_conditional_queryset()
+        except (APIException, Http404, TypeError, ValueError, ValidationError):
+            raise Fallback
+        should_read_replica = getattr(view, 'should_read_replica', None)
+        return queryset, bool(should_read_replica and should_read_replica(view.request))
+
+    async def read(self, request, *args, **kwargs):
+        view = self.get_viewset(request, *args, **kwargs)
+        queryset, replica = await sync_to_async(self.get_queryset)(view)
+        with replica_reads(enabled=replica):
+            return await self.read_queryset(request, view, queryset)
+
+    async def read_queryset(self, request, view, queryset):
+        state = await queryset.order_by().aaggregate(**view.get_conditional_aggregates())
+        if self.action == 'retrieve' and not state['count']:
+            raise Fallback
+
+        etag, last_modified, key, cached = await sync_to_async(self.get_cached)(view, state)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if cached is not None:
+            _count('hits')
+            data, x_cache = cached[1], 'HIT'
+        else:
+            _count('misses')
+            data, x_cache = await self.render(view, queryset, state), 'MISS'
+            if key is not None:
+                await cache.aset(key, (200, data), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+
+        response = HttpResponse(JSONRenderer().render(data), content_type='application/json')
+        response['X-Cache'] = x_cache
+        return set_validators(response, etag, last_modified)
+
+    def get_cached(self, view, state):
+        """Validators, response cache key and cached entry; reads namespace versions from the cache."""
+        etag, last_modified = view.get_validators_from_state(view.request, state)
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return etag, last_modified, None, None
+        key = view.get_response_cache_key(view.request, view.get_response_namespaces())
+        return etag, last_modified, key, cache.get(key)
+
+    async def render(self, view, queryset, state):
+        if self.action == 'retrieve':
+            instance = await queryset.afirst()
+            if instance is None:
+                raise Fallback
+            return view.get_serializer(instance).data
+
+        # The aggregate already counted the rows; the page is one more query
+        paginator = view.paginator.get_paginator(view.request, view)
+        page_size = paginator.get_page_size(view.request)
+        try:
+            number = int(view.request.query_params.get(paginator.page_query_param, 1))
+        except ValueError:
+            raise Fallback
+        pages = Paginator([], page_size)
+        pages.count = state['count']  # cached_property
+        if number < 1 or (number > 1 and number > pages.num_pages):
+            raise Fallback
+        offset = (number - 1) * page_size
+        rows = [row async for row in queryset[offset:offset + page_size]]
+
+        paginator.request = view.request
+        paginator.page = Page(rows, number, pages)
+        paginator.count_skipped = False
+        return paginator.get_paginated_response(view.get_serializer(rows, many=True).data).data
+
+
+def read_view(viewset, actions: dict):
+    """
+    ``viewset.as_view(actions)``, with its GET action served by
+    ``AsyncReadView`` when ``ASYNC_READ_VIEWS`` is on (ASGI deployments).
+    Under WSGI an async view only adds an event loop per request.
+    """
+    view = viewset.as_view(actions)
+    if not settings.ASYNC_READ_VIEWS:
+        return view
+    return AsyncReadView.as_view(viewset=viewset, action=actions['get'], sync_view=view)
@@ -0,0 +1,188 @@
+"""
+Response cache for public read endpoints.
+
+Cached responses are keyed on the view, the normalized query string and
+the current version of every namespace the response depends on. Writers
+never delete entries; they bump namespace versions (see
+``invalidate_on_commit``) so every dependent key changes at once and old
+entries simply age out.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from . import metrics
+
+VERSION_KEY = 'respcache:ns:{}'
+RESPONSE_KEY = 'respcache:resp:{}'
+LOCK_KEY = 'respcache:lock:{}'
+BUMPED_AT_KEY = 'respcache:bumped:{}'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stampede_waits': 0}
+
+RESPONSE_CACHE_REQUESTS = metrics.Counter(
+    'eventhub_response_cache_total', 'Response cache lookups by result.', ['result'],
+)
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+    RESPONSE_CACHE_REQUESTS.inc(result=name)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _new_version() -> int:
+    # Time-based so that a version key lost to eviction never comes back
+    # with a value that matches entries cached under the old one.
+    return time.time_ns() // 1000
+
+
+def namespace_versions(namespaces) -> list:
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, _new_version(), timeout=None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def namespace_bumped_at(namespaces) -> float:
+    """
+    Unix time of the latest bump among ``namespaces``. A namespace whose
+    timestamp was evicted counts as changed now.
+    """
+    keys = [BUMPED_AT_KEY.format(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    now = time.time()
+    for key in keys:
+        if key not in found:
+            cache.add(key, now, timeout=None)
+            found[key] = cache.get(key, now)
+    return max(found.values(), default=0)
+
+
+def bump_namespaces(*namespaces) -> None:
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+    now = time.time()
+    cache.set_many({BUMPED_AT_KEY.format(namespace): now for namespace in namespaces}, timeout=None)
+
+
+def invalidate_on_commit(*namespaces) -> None:
+    """
+    Bump ``namespaces`` once the current transaction commits, so readers
+    can never re-cache data that is about to be replaced.
+    """
+    transaction.on_commit(lambda: bump_namespaces(*namespaces))
+
+
+def normalized_query(request) -> str:
+    """Query string with keys and values sorted and empty values dropped."""
+    pairs = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values if value != ''
+    )
+    return '&'.join(f'{key}={value}' for key, value in pairs)
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list``/``retrieve`` from the response cache.
+
+    ``cache_collection`` names the namespace bumped by writes to this
+    view's model: list responses depend on it, detail responses on
+    ``<cache_collection>:<pk>``. ``cache_namespaces`` lists namespaces of
+    other models embedded in the responses. Concurrent misses for the same
+    key are collapsed: one request renders, the others wait for it.
+    """
+    cache_collection = None
+    cache_namespaces = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, self.get_response_namespaces(), super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, self.get_response_namespaces(), super().retrieve, *args, **kwargs)
+
+    def get_response_namespaces(self) -> tuple:
+        """Namespaces whose bumps invalidate the current action's response."""
+        if self.action == 'retrieve':
+            pk = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+            return (f'{self.cache_collection}:{pk}', *self.cache_namespaces)
+        return (self.cache_collection, *self.cache_namespaces)
+
+    def get_response_cache_key(self, request, namespaces) -> str:
+        versions = namespace_versions(namespaces)
+        raw = '|'.join([
+            type(self).__name__,
+            self.action,
+            request.scheme,
+            request.get_host(),
+            request.path,
+            normalized_query(request),
+            *(f'{namespace}={version}' for namespace, version in zip(namespaces, versions)),
+        ])
+        return RESPONSE_KEY.format(hashlib.sha1(raw.encode()).hexdigest())
+
+    def cached_response(self, request, namespaces, render, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return render(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request, namespaces)
+        cached = cache.get(key)
+        if cached is None:
+            cached = self._render_once(key, request, render, *args, **kwargs)
+            if isinstance(cached, Response):
+                return cached
+        else:
+            _count('hits')
+
+        status, data = cached
+        response = Response(data, status=status)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def _render_once(self, key, request, render, *args, **kwargs):
+        lock = LOCK_KEY.format(key)
+        locked = cache.add(lock, 1, timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            # Another request is rendering this key: wait for its result
+            _count('stampede_waits')
+            deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                cached = cache.get(key)
+                if cached is not None:
+                    _count('hits')
+                    return cached
+
+        _count('misses')
+        try:
+            response = render(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, (response.status_code, response.data), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        finally:
+            if locked:
+                cache.delete(lock)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,8 @@
+"""MySQL backend drawing connections from the process pool (see ``apps.core.db.pool``)."""
+from django.db.backends.mysql import base
+
+from apps.core.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,13 @@
+"""SQLite backend drawing connections from the process pool, for local runs and benchmarks."""
+from django.db.backends.sqlite3 import base
+
+from apps.core.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            # Every in-memory connection is its own database; nothing to share
+            return base.DatabaseWrapper.get_new_connection(self, conn_params)
+        return super().get_new_connection(conn_params)
@@ -0,0 +1,51 @@
+"""Database metrics: query latency per alias and connection pool state."""
+import time
+
+from .. import metrics
+from .pool import pool_stats
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+DB_QUERY_SECONDS = metrics.Histogram(
+    'eventhub_db_query_seconds', 'SQL statement latency.', ['database'], buckets=QUERY_BUCKETS,
+)
+
+
+def _pool_values(*fields):
+    return {
+        (database, field): stats[field]
+        for database, stats in pool_stats().items()
+        for field in fields
+    }
+
+
+DB_POOL_CONNECTIONS = metrics.Gauge(
+    'eventhub_db_pool_connections', 'Pooled connections by state.', ['database', 'state'],
+    collect=lambda: _pool_values('in_use', 'idle'),
+)
+DB_POOL_EVENTS = metrics.Counter(
+    'eventhub_db_pool_events_total', 'Pool checkouts and failures by kind.', ['database', 'event'],
+    collect=lambda: _pool_values('created', 'reused', 'discarded', 'reclaimed', 'waits', 'timeouts'),
+)
+DB_POOL_WAIT_SECONDS = metrics.Counter(
+    'eventhub_db_pool_wait_seconds_total', 'Time spent waiting for a free pooled connection.', ['database'],
+    collect=lambda: {(database,): stats['wait_seconds'] for database, stats in pool_stats().items()},
+)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver; wrappers survive reconnects, so add ours once."""
+    if not any(isinstance(wrapper, QueryTimer) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryTimer(connection.alias))
+
+
+class QueryTimer:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, database=self.alias)
@@ -0,0 +1,247 @@
+"""
+In-process database connection pool.
+
+Django keeps at most one connection per thread (``CONN_MAX_AGE``), which
+works for a fixed set of WSGI threads. Under ASGI every request runs its
+sync code on a fresh thread, so thread-bound connections are never
+reused. The pooled backends in ``apps.core.db.backends`` instead take
+connections from a pool shared by all threads of the process, and
+Django's "close" hands them back.
+
+Pool options go in the database settings under ``POOL``:
+
+- ``SIZE``: connections per process, idle plus in use (default 10).
+- ``TIMEOUT``: seconds to wait for a free connection before raising
+  ``OperationalError`` (default 10).
+- ``RECYCLE``: seconds after which a connection is closed instead of
+  reused (default 3600). Keep it below the server's ``wait_timeout``.
+- ``PING_AFTER``: seconds a connection may sit idle before it is pinged
+  on checkout (default 30). Dead connections are replaced transparently.
+"""
+import threading
+import time
+import weakref
+from collections import deque
+
+from django.db import OperationalError
+
+DEFAULTS = {'SIZE': 10, 'TIMEOUT': 10, 'RECYCLE': 3600, 'PING_AFTER': 30}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, *, size, timeout, recycle, ping_after):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._idle = deque()  # (connection, created_at, returned_at); newest on the right
+        self._created_at = {}  # id(connection) -> created_at, for connections in use
+        self._open = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'created': 0, 'reused': 0, 'discarded': 0,
+            'reclaimed': 0, 'waits': 0, 'timeouts': 0, 'wait_seconds': 0.0, 'peak_in_use': 0,
+        }
+
+    def acquire(self, connect, ping):
+        """
+        Return an idle connection, or one made by ``connect()`` while the
+        pool has room. ``ping(connection)`` checks connections that were
+        idle longer than ``ping_after``.
+        """
+        while True:
+            entry = self._checkout()
+            if entry is None:
+                return self._create(connect)
+            connection, created_at, returned_at = entry
+            if time.monotonic() - returned_at < self.ping_after or ping(connection):
+                with self._condition:
+                    self._stats['reused'] += 1
+                    self._created_at[id(connection)] = created_at
+                return connection
+            self._close(connection)
+
+    def release(self, connection):
+        """Return a healthy connection with no open transaction."""
+        with self._condition:
+            created_at = self._created_at.pop(id(connection), None)
+        if created_at is None or time.monotonic() - created_at >= self.recycle:
+            self._close(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._condition.notify()
+
+    def reclaim(self, connection):
+        """Take back a connection whose wrapper was garbage-collected without closing it."""
+        with self._condition:
+            self._stats['reclaimed'] += 1
+        try:
+            connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        self.release(connection)
+
+    def discard(self, connection):
+        """Close a connection that must not be reused."""
+        with self._condition:
+            self._created_at.pop(id(connection), None)
+        self._close(connection)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                **self._stats,
+                'wait_seconds': round(self._stats['wait_seconds'], 3),
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+            }
+
+    def close_idle(self):
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def _checkout(self):
+        """Pop a reusable idle connection, or reserve room for a new one (None)."""
+        deadline = None
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    # Most recently used first: it is the least likely to have timed out
+                    entry = self._idle.pop()
+                    if now - entry[1] < self.recycle:
+                        self._note_in_use()
+                        return entry
+                    self._open -= 1
+                    self._stats['discarded'] += 1
+                    self._close_quietly(entry[0])
+                if self._open < self.size:
+                    self._open += 1
+                    self._note_in_use()
+                    return None
+
+                if deadline is None:
+                    deadline = now + self.timeout
+                    self._stats['waits'] += 1
+                if now >= deadline:
+                    self._stats['timeouts'] += 1
+                    raise OperationalError(
+                        f'No database connection available after {self.timeout}s (pool size {self.size})'
+                    )
+                self._condition.wait(deadline - now)
+                self._stats['wait_seconds'] += time.monotonic() - now
+
+    def _create(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats['created'] += 1
+            self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def _close(self, connection):
+        with self._condition:
+            self._open -= 1
+            self._stats['discarded'] += 1
+            self._condition.notify()
+        self._close_quietly(connection)
+
+    def _note_in_use(self):
+        in_use = self._open - len(self._idle)
+        self._stats['peak_in_use'] = max(self._stats['peak_in_use'], in_use)
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def get_pool(settings_dict) -> ConnectionPool:
+    """The process-wide pool for a database's connection settings."""
+    key = tuple(str(settings_dict.get(name)) for name in ('ENGINE', 'NAME', 'HOST', 'PORT', 'USER'))
+    with _pools_lock:
+        if key not in _pools:
+            options = {**DEFAULTS, **settings_dict.get('POOL', {})}
+            _pools[key] = ConnectionPool(
+                size=options['SIZE'],
+                timeout=options['TIMEOUT'],
+                recycle=options['RECYCLE'],
+                ping_after=options['PING_AFTER'],
+            )
+        return _pools[key]
+
+
+def pool_stats() -> dict:
+    """Counters of every pool in this process, keyed by database name."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {f'{key[1]}@{key[2] or "local"}': pool.stats() for key, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix into a backend's ``DatabaseWrapper`` to draw connections from the
+    process pool. Closing returns the connection, rolled back, unless it
+    is broken or being closed inside an atomic block.
+
+    A wrapper dropped without being closed gives its connection back when
+    it is garbage-collected. Under ASGI that is the normal case whenever
+    ``request_finished`` is skipped: Django 5.0's ASGIHandler cancels
+    ``response.close()`` if the server reports the client gone as soon as
+    the body is sent, which uvicorn does.
+    """
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return get_pool(self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        connection = pool.acquire(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params), self._ping)
+        self._pool_finalizer = weakref.finalize(self, pool.reclaim, connection)
+        return connection
+
+    def _ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _close(self):
+        connection = self.connection
+        if connection is None:
+            return
+        self._pool_finalizer.detach()
+        if self.in_atomic_block:
+            # Django keeps pointing at the connection until the block exits
+            self.pool.discard(connection)
+            return
+        try:
+            if not self.get_autocommit() or self.errors_occurred:
+                connection.rollback()
+        except Exception:
+            self.pool.discard(connection)
+            return
+        if self.errors_occurred and not self._ping(connection):
+            self.pool.discard(connection)
+            return
+        self.pool.release(connection)
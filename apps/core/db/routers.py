@@ -0,0 +1,220 @@
+"""
+Read replicas for the public catalog reads.
+
+Replicas are the ``replica_*`` databases built from ``DB_REPLICAS`` in
+settings. Nothing reads from them unless it asks to: ``ReplicaReadMixin``
+opens a replica scope for a viewset's ``list``/``retrieve``, and the
+router sends that scope's reads to one replica. Writes, and every read
+outside a scope, go to ``default``.
+
+Read-your-writes: a request that wrote to the database gets a cookie and
+a per-user cache entry (``ReplicaPinMiddleware``), and the client reads
+from the primary while either is alive. A catalog namespace bumped within
+the same window is read from the primary by everyone, so replicas never
+fill the response cache with rows older than the namespace version.
+
+Lag: replicas more than ``DB_REPLICA_MAX_LAG`` seconds behind are skipped,
+checked at most every ``DB_REPLICA_CHECK_INTERVAL`` seconds per process.
+The pin window is the sum of the two, so a pinned client never reads a
+replica older than its write. With no healthy replica, reads fall back to
+the primary.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from ..cache import namespace_bumped_at
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica_'
+PIN_COOKIE = 'db_primary'
+PIN_KEY = 'dbpin:user:{}'
+
+# Mutable dicts so that changes made on sync_to_async threads are seen
+# by the request that opened them.
+_reads = ContextVar('replica_reads', default=None)
+_writes = ContextVar('replica_writes', default=None)
+
+_health = {}  # alias -> (checked_at, lag)
+_health_lock = threading.Lock()
+
+
+def replica_aliases() -> list:
+    return [alias for alias in connections.settings if alias.startswith(REPLICA_PREFIX)]
+
+
+def pin_seconds() -> int:
+    return settings.DB_REPLICA_MAX_LAG + settings.DB_REPLICA_CHECK_INTERVAL
+
+
+def replica_lag(alias: str):
+    """Seconds ``alias`` is behind the primary, or None when replication is not running."""
+    connection = connections[alias]
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW REPLICA STATUS')  # MySQL 8.0.22+
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            status = dict(zip((column[0] for column in cursor.description), row))
+        lag = status.get('Seconds_Behind_Source')
+        return None if lag is None else float(lag)
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())')
+            lag = cursor.fetchone()[0]
+        return None if lag is None else float(lag)
+
+    if connection.vendor == 'sqlite':
+        # Local stand-in refreshed by ``replicate_sqlite``: as old as its last copy
+        return time.time() - os.path.getmtime(connection.settings_dict['NAME'])
+
+    return None
+
+
+def _check(alias: str):
+    try:
+        return replica_lag(alias)
+    except (DatabaseError, OSError) as exc:
+        logger.warning('Replica %s lag check failed: %s', alias, exc)
+        return None
+
+
+def healthy_replicas() -> list:
+    """Replicas within ``DB_REPLICA_MAX_LAG``; lags older than the check interval are re-measured."""
+    now = time.monotonic()
+    healthy = []
+    for alias in replica_aliases():
+        with _health_lock:
+            checked_at, lag = _health.get(alias, (None, None))
+            due = checked_at is None or now - checked_at >= settings.DB_REPLICA_CHECK_INTERVAL
+            if due:
+                # Claim the check; concurrent requests keep using the old result
+                _health[alias] = (now, lag)
+        if due:
+            lag = _check(alias)
+            with _health_lock:
+                _health[alias] = (now, lag)
+        if lag is not None and lag <= settings.DB_REPLICA_MAX_LAG:
+            healthy.append(alias)
+    return healthy
+
+
+def replica_status() -> dict:
+    """Last measured lag of every replica in this process."""
+    with _health_lock:
+        health = dict(_health)
+    status = {}
+    for alias in replica_aliases():
+        checked_at, lag = health.get(alias, (None, None))
+        status[alias] = {
+            'lag': None if lag is None else round(lag, 3),
+            'healthy': lag is not None and lag <= settings.DB_REPLICA_MAX_LAG,
+            'checked_ago': None if checked_at is None else round(time.monotonic() - checked_at, 3),
+        }
+    return status
+
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """
+    Scope whose reads may go to a replica. Yields the scope's state; set
+    ``state['enabled']`` to switch it once the request is authenticated.
+    """
+    state = {'enabled': enabled}
+    token = _reads.set(state)
+    try:
+        yield state
+    finally:
+        _reads.reset(token)
+
+
+@contextmanager
+def track_writes():
+    """Yield a dict whose ``'wrote'`` is set once anything is routed for writing."""
+    state = {'wrote': False}
+    token = _writes.set(state)
+    try:
+        yield state
+    finally:
+        _writes.reset(token)
+
+
+def is_pinned(request, user=None) -> bool:
+    """Whether the client wrote recently and must read from the primary."""
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    return bool(user is not None and user.is_authenticated and cache.get(PIN_KEY.format(user.pk)))
+
+
+def pin(request, response) -> None:
+    seconds = pin_seconds()
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(PIN_KEY.format(user.pk), 1, timeout=seconds)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _reads.get()
+        if not state or not state['enabled']:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a write transaction must see its rows
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if 'alias' not in state:
+            # One replica per scope, so related queries see one snapshot
+            replicas = healthy_replicas()
+            state['alias'] = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+        return state['alias']
+
+    def db_for_write(self, model, **hints):
+        state = _writes.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db.startswith(REPLICA_PREFIX):
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve ``replica_actions`` from a read replica unless the client is
+    pinned to the primary or the response's cache namespaces
+    (``CachedResponseMixin``) changed within the pin window.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(enabled=False) as self.replica_state:
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.replica_state['enabled'] = self.should_read_replica(request, request.user)
+
+    def should_read_replica(self, request, user=None) -> bool:
+        if request.method not in SAFE_METHODS or self.action not in self.replica_actions:
+            return False
+        if not replica_aliases() or is_pinned(request, user):
+            return False
+        return time.time() - namespace_bumped_at(self.get_response_namespaces()) >= pin_seconds()
@@ -0,0 +1,73 @@
+"""
+Resized WebP renditions of uploaded images.
+
+Originals are stored as uploaded. A background task builds WebP copies
+bounded by each size in ``IMAGE_RENDITIONS`` (longest side, never
+upscaled), and list pages link to those instead of the original. The
+copies are stored under the SHA-256 of the original bytes, so a picture
+uploaded for many events is resized and stored only once.
+"""
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITIONS_DIR = 'renditions'
+
+
+def validate_image_upload(file):
+    """Reject images over ``IMAGE_MAX_UPLOAD_BYTES`` or ``IMAGE_MAX_PIXELS``."""
+    limit = settings.IMAGE_MAX_UPLOAD_BYTES
+    if file.size > limit:
+        raise ValidationError(f'Image files may not be larger than {limit / (1024 * 1024):g} MB.')
+    width, height = get_image_dimensions(file)
+    if width and height and width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(f'Image is too large ({width}x{height} pixels).')
+
+
+def renditions_build(file, *, storage=default_storage) -> dict:
+    """
+    Build the renditions of an image ``file`` (a ``FieldFile``) and return
+    the description stored in ``image_renditions``. Renditions that already
+    exist for the same content are reused.
+    """
+    with file.open('rb'):
+        data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+    prefix = f'{RENDITIONS_DIR}/{digest[:2]}/{digest}'
+
+    renditions = {}
+    with Image.open(io.BytesIO(data)) as original:
+        image = None
+        for name, size in settings.IMAGE_RENDITIONS.items():
+            path = f'{prefix}/{name}.webp'
+            if storage.exists(path):
+                width, height = get_image_dimensions(storage.open(path))
+            else:
+                if image is None:
+                    # Decode once; phone photos carry their rotation in EXIF
+                    image = ImageOps.exif_transpose(original)
+                    image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+                resized = image.copy()
+                resized.thumbnail((size, size), Image.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, 'WEBP', quality=settings.IMAGE_WEBP_QUALITY, method=4)
+                path = storage.save(path, ContentFile(buffer.getvalue()))
+                width, height = resized.size
+            renditions[name] = {'name': path, 'width': width, 'height': height}
+
+    return {'source': file.name, 'sha256': digest, 'renditions': renditions}
+
+
+def renditions_current(instance, field: str = 'image') -> dict:
+    """The renditions of ``instance.<field>``, or {} when missing or stale."""
+    file = getattr(instance, field)
+    built = getattr(instance, f'{field}_renditions') or {}
+    if not file or built.get('source') != file.name:
+        return {}
+    return built['renditions']
@@ -0,0 +1,61 @@
+"""
+Named locks for jobs that must not run concurrently (cron sweepers,
+rebuilds).
+
+MySQL and PostgreSQL use the database's own advisory locks, which are
+released automatically if the holder's connection dies. Other backends
+fall back to ``cache.add``, which is only as shared as the configured
+cache (use Redis or memcached when workers run on several hosts).
+"""
+import hashlib
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection
+
+LOCK_KEY = 'lock:{}'
+
+
+@contextmanager
+def advisory_lock(name: str, *, timeout: int = 0, ttl: int = 3600):
+    """
+    Try to take the lock ``name`` and yield whether it was acquired. MySQL
+    waits up to ``timeout`` seconds for it; the other backends only try
+    once. ``ttl`` bounds how long a cache-based lock outlives a crashed
+    holder.
+    """
+    vendor = connection.vendor
+    if vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT GET_LOCK(%s, %s)', [name, timeout])
+            acquired = cursor.fetchone()[0] == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT RELEASE_LOCK(%s)', [name])
+        return
+
+    if vendor == 'postgresql':
+        key = int.from_bytes(hashlib.sha1(name.encode()).digest()[:8], 'big', signed=True)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+            acquired = cursor.fetchone()[0]
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+        return
+
+    key, token = LOCK_KEY.format(name), uuid.uuid4().hex
+    acquired = cache.add(key, token, timeout=ttl)
+    try:
+        yield acquired
+    finally:
+        # Only release a lock we still own
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
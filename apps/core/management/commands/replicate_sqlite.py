@@ -0,0 +1,59 @@
+"""
+Copy a SQLite primary into its SQLite replicas, for testing replica
+routing locally.
+
+    export DB_ENGINE=django.db.backends.sqlite3 DB_NAME=primary.sqlite3 DB_REPLICAS=replica.sqlite3
+    python manage.py migrate
+    python manage.py replicate_sqlite --every 2
+
+Each copy is a consistent snapshot (SQLite's online backup), and the
+replica's lag is the age of its last copy, so stopping this command makes
+the replica fall behind and the router stop using it after
+``DB_REPLICA_MAX_LAG`` seconds.
+"""
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.core.db.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Replicate the SQLite primary database into the SQLite replicas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=0, help='Seconds between copies (0 = copy once and exit)')
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError('No replicas configured; set DB_REPLICAS.')
+        for alias in (DEFAULT_DB_ALIAS, *aliases):
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias} is not a SQLite database.')
+
+        primary = connections.settings[DEFAULT_DB_ALIAS]['NAME']
+        try:
+            while True:
+                for alias in aliases:
+                    started = time.monotonic()
+                    self.copy(primary, connections.settings[alias]['NAME'])
+                    self.stdout.write(f'{alias}: copied in {(time.monotonic() - started) * 1000:.0f} ms')
+                if not options['every']:
+                    return
+                time.sleep(options['every'])
+        except KeyboardInterrupt:
+            pass
+
+    def copy(self, source, target):
+        src, dst = sqlite3.connect(source), sqlite3.connect(target)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
+        # A copy with no changed pages may leave the mtime alone
+        os.utime(target)
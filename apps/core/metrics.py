@@ -0,0 +1,367 @@
+"""
+In-process metrics, served in the Prometheus text format at ``/metrics``.
+
+Counters, gauges and histograms are module-level objects, created once in
+the module that updates them:
+
+    BOOKINGS = metrics.Counter('eventhub_bookings_total', 'Bookings by result.', ['result'])
+    BOOKINGS.inc(result='confirmed')
+
+Every metric takes its own lock on update, so they are safe across
+threads. A metric built with ``collect=`` reads its samples from that
+callable at flush/scrape time instead (e.g. pool counters).
+
+Each worker process keeps its own values. With ``METRICS_DIR`` set to a
+directory shared by the workers of a host, every process writes its
+values to its own file there every ``METRICS_FLUSH_INTERVAL`` seconds and
+``/metrics`` adds the files up, so any worker can answer a scrape.
+Counters and histograms of processes that exited are folded into an
+archive file and keep counting; gauges only count processes that are
+still writing. Empty the directory when the server (re)starts.
+"""
+import atexit
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development servers only
+    fcntl = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric) -> None:
+        with self._lock:
+            if metric.name in self.metrics:
+                raise ValueError(f'Metric {metric.name} is already registered.')
+            self.metrics[metric.name] = metric
+
+    def reset(self) -> None:
+        """Drop every value; a forked child starts counting from zero."""
+        # The parent's locks may have been held by threads the child does not have
+        self._lock = threading.Lock()
+        with self._lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            metric._lock = threading.Lock()
+            metric._values = {}
+
+    def collect(self) -> dict:
+        """This process's families: ``{name: {kind, documentation, labelnames, ..., samples}}``."""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.family() for metric in metrics}
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=(), *, collect=None, registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._values = {}  # label values tuple -> value
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}.')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> dict:
+        if self.collect is not None:
+            return {tuple(map(str, key)): value for key, value in self.collect().items()}
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def family(self) -> dict:
+        return {
+            'kind': self.kind,
+            'documentation': self.documentation,
+            'labelnames': list(self.labelnames),
+            'samples': self.samples(),
+        }
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """``mode`` says how processes combine: ``'sum'`` or ``'max'``."""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), *, mode='sum', **kwargs):
+        if mode not in ('sum', 'max'):
+            raise ValueError(f'Unknown gauge mode {mode!r}.')
+        self.mode = mode
+        super().__init__(name, documentation, labelnames, **kwargs)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def family(self) -> dict:
+        return {**super().family(), 'mode': self.mode}
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), *, buckets=DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, **kwargs)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            entry['buckets'][index] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def family(self) -> dict:
+        return {**super().family(), 'buckets': list(self.buckets)}
+
+    def _copy(self, value):
+        return {**value, 'buckets': list(value['buckets'])}
+
+
+# Multi-process files
+
+class _ProcessFile:
+    """This process's file in ``METRICS_DIR`` and the thread that rewrites it."""
+
+    def __init__(self):
+        self.path = None
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.thread is not None or not settings.METRICS_DIR:
+                return
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            # Unique per process, so a recycled pid never takes over a dead worker's counters
+            self.path = os.path.join(settings.METRICS_DIR, f'{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+            self.thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self.thread.start()
+
+    def after_fork(self) -> None:
+        self.path = self.thread = None
+        self._lock = threading.Lock()
+        REGISTRY.reset()
+        self.start()
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        _write_json(self.path, _encode(REGISTRY.collect()))
+
+    def flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            self.flush_quietly()
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+
+
+_process_file = _ProcessFile()
+start = _process_file.start
+os.register_at_fork(after_in_child=_process_file.after_fork)
+atexit.register(_process_file.flush_quietly)
+
+
+def _encode(families: dict) -> dict:
+    return {
+        name: {**family, 'samples': [[list(key), value] for key, value in family['samples'].items()]}
+        for name, family in families.items()
+    }
+
+
+def _decode(families: dict) -> dict:
+    return {
+        name: {**family, 'samples': {tuple(key): value for key, value in family['samples']}}
+        for name, family in families.items()
+    }
+
+
+def _write_json(path: str, data) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as file:
+            return _decode(json.load(file))
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(target: dict, families: dict, *, gauges: bool = True) -> dict:
+    for name, family in families.items():
+        if family['kind'] == 'gauge' and not gauges:
+            continue
+        merged = target.setdefault(name, {**family, 'samples': {}})
+        samples = merged['samples']
+        for key, value in family['samples'].items():
+            if key not in samples:
+                samples[key] = {**value, 'buckets': list(value['buckets'])} if isinstance(value, dict) else value
+            elif family['kind'] == 'histogram':
+                current = samples[key]
+                current['buckets'] = [mine + theirs for mine, theirs in zip(current['buckets'], value['buckets'])]
+                current['sum'] += value['sum']
+                current['count'] += value['count']
+            elif family['kind'] == 'gauge' and family.get('mode') == 'max':
+                samples[key] = max(samples[key], value)
+            else:
+                samples[key] += value
+    return target
+
+
+@contextmanager
+def _directory_lock(directory: str):
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), 'w') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def collect_processes(directory: str) -> dict:
+    """
+    Families of every process writing to ``directory``. Files not rewritten
+    for a while belong to exited processes: their counters and histograms
+    move into the archive and the file is deleted.
+    """
+    stale_after = max(30, 10 * settings.METRICS_FLUSH_INTERVAL)
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    with _directory_lock(directory):
+        archive = _read_json(archive_path) or {}
+        live, archived = [], False
+        for entry in os.scandir(directory):
+            if not entry.name.endswith('.json') or entry.name == ARCHIVE_FILE:
+                continue
+            families = _read_json(entry.path)
+            if families is None:
+                continue
+            if time.time() - entry.stat().st_mtime > stale_after:
+                _merge(archive, families, gauges=False)
+                os.unlink(entry.path)
+                archived = True
+            else:
+                live.append(families)
+        if archived:
+            _write_json(archive_path, _encode(archive))
+
+    merged = _merge({}, archive)
+    for families in live:
+        _merge(merged, families)
+    return merged
+
+
+def collect() -> dict:
+    """Families to expose: every process's when ``METRICS_DIR`` is set, else this one's."""
+    if not settings.METRICS_DIR or _process_file.path is None:
+        return REGISTRY.collect()
+    _process_file.flush()
+    return collect_processes(settings.METRICS_DIR)
+
+
+# Text format
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def render(families: dict) -> str:
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        names = family['labelnames']
+        lines.append(f'# HELP {name} {_escape(family["documentation"])}')
+        lines.append(f'# TYPE {name} {family["kind"]}')
+        for key, value in sorted(family['samples'].items()):
+            if family['kind'] != 'histogram':
+                lines.append(f'{name}{_labels(names, key)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip([*family['buckets'], float('inf')], value['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(names, key, [("le", _number(bound))])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(names, key)} {_number(value["sum"])}')
+            lines.append(f'{name}_count{_labels(names, key)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,105 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics, profiling
+from .db.routers import pin, replica_aliases, track_writes
+
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+HTTP_REQUESTS = metrics.Counter(
+    'eventhub_http_requests_total', 'Requests by view, method and status.', ['view', 'method', 'status'],
+)
+HTTP_REQUEST_SECONDS = metrics.Histogram('eventhub_http_request_seconds', 'Request latency by view.', ['view'])
+
+
+class MetricsMiddleware:
+    """Count and time every request, labelled like the profiler (``<ViewSet>.<action>``)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - started)
+
+    def observe(self, request, response, seconds):
+        view = profiling.view_label(request)
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        HTTP_REQUESTS.inc(view=view, method=method, status=response.status_code)
+        HTTP_REQUEST_SECONDS.observe(seconds, view=view)
+        return response
+
+
+class ProfilerMiddleware:
+    """Profile a sample of the requests (see ``apps.core.profiling``)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not profiling.sampled():
+            return self.get_response(request)
+        started = time.perf_counter()
+        with profiling.profiling() as profile:
+            response = self.get_response(request)
+        profiling.record(request, response, profile, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not profiling.sampled():
+            return await self.get_response(request)
+        started = time.perf_counter()
+        with profiling.profiling() as profile:
+            response = await self.get_response(request)
+        profiling.record(request, response, profile, time.perf_counter() - started)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Pin clients whose request wrote to the database to the primary (see ``apps.core.db.routers``)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with track_writes() as writes:
+            response = self.get_response(request)
+        return self.process_writes(request, response, writes)
+
+    async def __acall__(self, request):
+        with track_writes() as writes:
+            response = await self.get_response(request)
+        return self.process_writes(request, response, writes)
+
+    def process_writes(self, request, response, writes):
+        if writes['wrote'] and replica_aliases():
+            pin(request, response)
+        return response
@@ -1,6 +1,59 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
-class SoftDeleteManager(models.Manager):
+from .signals import restored, soft_deleted
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Soft deletes in bulk: ``soft_delete()`` and ``restore()`` flip the flag
+    on every matched row with one UPDATE and send ``soft_deleted`` /
+    ``restored`` with the affected primary keys. ``delete()`` soft-deletes
+    too; ``hard_delete()`` removes the rows.
+    """
+
+    @transaction.atomic
+    def soft_delete(self) -> int:
+        pks = self._flip(is_deleted=True)
+        if pks:
+            soft_deleted.send(sender=self.model, pks=pks)
+            # Cascade to relations listed on the model, e.g. Event -> tickets
+            for relation in getattr(self.model, 'soft_delete_cascade', ()):
+                field = self.model._meta.get_field(relation)
+                related = field.related_model.all_objects.filter(**{f'{field.field.name}__in': pks})
+                related.soft_delete()
+        return len(pks)
+
+    @transaction.atomic
+    def restore(self) -> int:
+        # Does not cascade: children deleted on their own stay deleted
+        pks = self._flip(is_deleted=False)
+        if pks:
+            restored.send(sender=self.model, pks=pks)
+        return len(pks)
+
+    def delete(self):
+        return self.soft_delete()
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        return super().delete()
+    hard_delete.alters_data = True
+
+    def _flip(self, *, is_deleted: bool) -> list:
+        # Lock the rows that actually change so concurrent calls never
+        # report (and cascade) the same rows twice.
+        pks = list(
+            self.filter(is_deleted=not is_deleted).select_for_update().order_by('pk').values_list('pk', flat=True)
+        )
+        if pks:
+            changes = {'is_deleted': is_deleted}
+            if any(field.name == 'updated_at' for field in self.model._meta.concrete_fields):
+                changes['updated_at'] = timezone.now()
+            self.model.all_objects.filter(pk__in=pks).update(**changes)
+        return pks
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
 
@@ -15,14 +68,21 @@ class SoftDeleteModel(models.Model):
     is_deleted = models.BooleanField(default=False)
 
     objects = SoftDeleteManager()  # Custom manager (filtered)
-    all_objects = models.Manager()  # To access all including deleted ones
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()  # To access all including deleted ones
+
+    # Reverse relations soft-deleted together with this row
+    soft_delete_cascade = ()
 
     class Meta:
         abstract = True
 
     def delete(self, *args, **kwargs):
+        type(self).all_objects.filter(pk=self.pk).soft_delete()
         self.is_deleted = True
-        self.save()
+
+    def restore(self):
+        type(self).all_objects.filter(pk=self.pk).restore()
+        self.is_deleted = False
 
     def hard_delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
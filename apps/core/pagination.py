@@ -0,0 +1,207 @@
+"""
+Pagination for list endpoints.
+
+``HybridPagination`` is the project-wide default. It serves classic page
+numbers unless the request (``?pagination=cursor`` or a ``?cursor=``
+token) or the view (``pagination_mode = 'cursor'``) asks for keyset
+pagination, which the view enables by declaring ``keyset_ordering``.
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CountOptionalPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination where ``?count=false`` skips the ``COUNT(*)``
+    query. The response keeps its shape with ``count`` set to null, and
+    ``next`` is derived by fetching one row beyond the page.
+    """
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.count_query_param, '').lower() not in ('0', 'false', 'no'):
+            self.count_skipped = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.count_skipped = True
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.page_number, message='Invalid page.'))
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.page_number, message='That page contains no results'))
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.count_skipped:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.count_skipped:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.count_skipped:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a unique compound key such as ``('event_date', 'id')``.
+
+    Each page is fetched with ``WHERE (key) > (last key seen)`` instead of
+    an OFFSET, so latency stays flat however deep the client pages and rows
+    inserted concurrently never shift page boundaries. No count is issued.
+    The view's ``keyset_ordering`` wins over any other ordering.
+    """
+    cursor_query_param = 'cursor'
+    page_size = PageNumberPagination.page_size
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        position, reverse = self.decode_cursor(request, queryset.model)
+        self.has_cursor = position is not None
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1], False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[0], True))
+
+    def _after(self, ordering, position):
+        """``(f1, f2, ...) > (v1, v2, ...)`` honouring each field's direction."""
+        clauses = []
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {name: value for name, value in zip(self.fields[:index], position)}
+            clauses.append(Q(**equal, **{f'{self.fields[index]}__{lookup}': position[index]}))
+        return reduce(or_, clauses)
+
+    def encode_cursor(self, row, reverse):
+        values = []
+        for field in self.fields:
+            value = row[field] if isinstance(row, dict) else getattr(row, field)
+            if isinstance(value, (datetime.date, datetime.datetime)):
+                value = value.isoformat()  # keeps microseconds, unlike DjangoJSONEncoder
+            values.append(value)
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values = payload['v']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class HybridPagination(BasePagination):
+    """
+    Picks keyset or page-number pagination per request.
+
+    Views opt into keyset pagination by declaring ``keyset_ordering``;
+    clients then select it with ``?pagination=cursor`` (follow-up pages
+    carry ``?cursor=``). ``pagination_mode = 'cursor'`` on the view makes
+    it the default for that endpoint.
+    """
+    mode_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request, view)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginator(self, request, view):
+        ordering = getattr(view, 'keyset_ordering', None)
+        mode = request.query_params.get(self.mode_query_param) or getattr(view, 'pagination_mode', 'page')
+        if ordering and (mode == 'cursor' or KeysetPagination.cursor_query_param in request.query_params):
+            return KeysetPagination(ordering)
+        return CountOptionalPageNumberPagination()
+
+    def get_schema_operation_parameters(self, view):
+        return CountOptionalPageNumberPagination().get_schema_operation_parameters(view)
@@ -0,0 +1,225 @@
+"""
+Per-request profiler.
+
+``ProfilerMiddleware`` profiles a ``PROFILER_SAMPLE_RATE`` share of the
+requests. A profiled request counts its SQL queries and their time (on
+every database alias, from whichever thread runs them) and the time spent
+in serializers' ``.data``, which includes any queries the serializers
+trigger, so N+1s show up as a high query count next to a high serialize
+time. Unsampled requests cost one ``random()`` call.
+
+Results are tagged ``<ViewSet>.<action>`` (or the URL name for plain
+views) and kept in rolling per-process histograms covering the last
+``PROFILER_WINDOW_SECONDS``, served at ``/api/ops/profile/``. With
+``PROFILER_SERVER_TIMING`` the numbers also go out in a ``Server-Timing``
+header, and requests slower than ``PROFILER_SLOW_MS`` are logged.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SLOTS = 10  # the window is kept as this many slots, dropped whole as they expire
+
+_current = ContextVar('profile', default=None)
+
+
+class Profile:
+    # Mutated from sync_to_async threads as well as the request's own
+    __slots__ = ('queries', 'db', 'serialize', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+
+
+def sampled() -> bool:
+    return settings.PROFILER_ENABLED and random.random() < settings.PROFILER_SAMPLE_RATE
+
+
+@contextmanager
+def profiling():
+    profile = Profile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def profile_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db += time.perf_counter() - started
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """``connection_created`` receiver; wrappers survive reconnects, so add ours once."""
+    if profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_query)
+
+
+def install_serializer_hook():
+    """Time ``BaseSerializer.data``; nested and list serializers count once."""
+    data = BaseSerializer.data.fget
+    if getattr(data, 'profiled', False):
+        return
+
+    def timed_data(self):
+        profile = _current.get()
+        if profile is None or profile.serializing:
+            return data(self)
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return data(self)
+        finally:
+            profile.serialize += time.perf_counter() - started
+            profile.serializing = False
+
+    timed_data.profiled = True
+    BaseSerializer.data = property(timed_data)
+
+
+def view_label(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    func = match.func
+    cls = getattr(func, 'cls', None)
+    if cls is not None:
+        # DRF view; viewsets map the method to an action
+        actions = getattr(func, 'actions', None) or {}
+        return f'{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}'
+    initkwargs = getattr(func, 'view_initkwargs', {})
+    if initkwargs.get('viewset') is not None:
+        # AsyncReadView serving a viewset action
+        return f'{initkwargs["viewset"].__name__}.{initkwargs["action"]}'
+    return match.view_name or func.__name__
+
+
+def server_timing(profile, total: float) -> str:
+    return ', '.join([
+        f'db;dur={profile.db * 1000:.1f};desc="{profile.queries} queries"',
+        f'serialize;dur={profile.serialize * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+class RollingStats:
+    """Per-label histograms of the last ``window`` seconds, in ``SLOTS`` slots."""
+
+    def __init__(self, window: int):
+        self.slot_seconds = max(1, window // SLOTS)
+        self._slots = {}  # slot number -> {label: totals}
+        self._lock = threading.Lock()
+
+    def add(self, label: str, total: float, profile: Profile) -> None:
+        total_ms = total * 1000
+        bucket = next((index for index, bound in enumerate(BUCKETS_MS) if total_ms <= bound), len(BUCKETS_MS))
+        slot = int(time.time() // self.slot_seconds)
+        with self._lock:
+            if slot not in self._slots:
+                self._slots = {number: labels for number, labels in self._slots.items() if number > slot - SLOTS}
+                self._slots[slot] = {}
+            totals = self._slots[slot].setdefault(label, _new_totals())
+            _merge(totals, {
+                'count': 1,
+                'buckets': [int(index == bucket) for index in range(len(BUCKETS_MS) + 1)],
+                'total_ms': total_ms,
+                'db_ms': profile.db * 1000,
+                'serialize_ms': profile.serialize * 1000,
+                'queries': profile.queries,
+                'max_ms': total_ms,
+                'max_queries': profile.queries,
+            })
+
+    def reset(self) -> None:
+        with self._lock:
+            self._slots = {}
+
+    def snapshot(self) -> dict:
+        """Per-label summary of the window, slowest p95 first."""
+        oldest = int(time.time() // self.slot_seconds) - SLOTS + 1
+        merged = {}
+        with self._lock:
+            for number, labels in self._slots.items():
+                if number < oldest:
+                    continue
+                for label, totals in labels.items():
+                    _merge(merged.setdefault(label, _new_totals()), totals)
+
+        summary = {}
+        for label, totals in merged.items():
+            count = totals['count']
+            summary[label] = {
+                'count': count,
+                'p50_ms': _percentile(totals, 0.50),
+                'p95_ms': _percentile(totals, 0.95),
+                'p99_ms': _percentile(totals, 0.99),
+                'max_ms': round(totals['max_ms'], 1),
+                'avg_ms': round(totals['total_ms'] / count, 1),
+                'avg_db_ms': round(totals['db_ms'] / count, 1),
+                'avg_serialize_ms': round(totals['serialize_ms'] / count, 1),
+                'avg_queries': round(totals['queries'] / count, 1),
+                'max_queries': totals['max_queries'],
+                'buckets_ms': dict(zip([*map(str, BUCKETS_MS), '+Inf'], totals['buckets'])),
+            }
+        return dict(sorted(summary.items(), key=lambda item: item[1]['p95_ms'], reverse=True))
+
+
+def _new_totals() -> dict:
+    return {
+        'count': 0, 'buckets': [0] * (len(BUCKETS_MS) + 1), 'total_ms': 0.0, 'db_ms': 0.0,
+        'serialize_ms': 0.0, 'queries': 0, 'max_ms': 0.0, 'max_queries': 0,
+    }
+
+
+def _merge(totals: dict, other: dict) -> None:
+    for key in ('count', 'total_ms', 'db_ms', 'serialize_ms', 'queries'):
+        totals[key] += other[key]
+    for key in ('max_ms', 'max_queries'):
+        totals[key] = max(totals[key], other[key])
+    totals['buckets'] = [mine + theirs for mine, theirs in zip(totals['buckets'], other['buckets'])]
+
+
+def _percentile(totals: dict, point: float) -> float:
+    """Upper bound of the bucket holding the percentile, capped at the slowest request."""
+    rank, seen = point * totals['count'], 0
+    for bound, count in zip(BUCKETS_MS, totals['buckets']):
+        seen += count
+        if seen >= rank:
+            return float(min(bound, round(totals['max_ms'], 1)))
+    return round(totals['max_ms'], 1)
+
+
+stats = RollingStats(settings.PROFILER_WINDOW_SECONDS)
+
+
+def record(request, response, profile: Profile, total: float) -> None:
+    label = view_label(request)
+    stats.add(label, total, profile)
+    if settings.PROFILER_SERVER_TIMING:
+        response['Server-Timing'] = server_timing(profile, total)
+    if total * 1000 >= settings.PROFILER_SLOW_MS:
+        logger.warning(
+            'Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, serialize %.0f ms',
+            request.method, request.path, label, total * 1000, profile.queries, profile.db * 1000,
+            profile.serialize * 1000,
+        )
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by SoftDeleteQuerySet with ``pks``, the primary keys whose flag
+# changed. The rows are written with UPDATE, so post_save does not fire.
+soft_deleted = Signal()
+restored = Signal()
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import OpsProfileView, OpsStatsView
+
+urlpatterns = [
+    path('stats/', OpsStatsView.as_view(), name='ops-stats'),
+    path('profile/', OpsProfileView.as_view(), name='ops-profile'),
+]
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.blacklist import token_blacklist
+from apps.accounts.permissions import IsAdminRole
+from . import metrics
+from .cache import cache_stats
+from .db.pool import pool_stats
+from .db.routers import replica_status
+from .profiling import stats as profile_stats
+
+
+class OpsStatsView(APIView):
+    """Runtime counters of this worker process: connection pools, replica lag, response cache and token blacklist filter."""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response({
+            'db_pools': pool_stats(),
+            'db_replicas': replica_status(),
+            'response_cache': cache_stats(),
+            'token_blacklist': token_blacklist.stats(),
+        })
+
+
+class OpsProfileView(APIView):
+    """Rolling request profiles of this worker process, slowest p95 first; DELETE clears them."""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response({
+            'window_seconds': settings.PROFILER_WINDOW_SECONDS,
+            'sample_rate': settings.PROFILER_SAMPLE_RATE,
+            'endpoints': profile_stats.snapshot(),
+        })
+
+    def delete(self, request):
+        profile_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; outside DEBUG it needs ``Authorization: Bearer <METRICS_TOKEN>``."""
+    if not settings.DEBUG or settings.METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '')
+        if not settings.METRICS_TOKEN or not constant_time_compare(supplied, f'Bearer {settings.METRICS_TOKEN}'):
+            return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    return HttpResponse(
+        metrics.render(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
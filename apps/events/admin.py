@@ -1,9 +1,10 @@
 from django.contrib import admin
+from apps.core.admin import SoftDeleteAdminMixin
 from .models import Category, Event, Ticket, Payment
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'category_name', 'created_at']
     search_fields = ['category_name']
 
@@ -14,7 +15,7 @@ class TicketInline(admin.TabularInline):
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ['title', 'category', 'auth_id', 'event_date', 'status', 'created_at']
     list_filter = ['category', 'status', 'event_date', 'created_at']
     search_fields = ['title', 'auth_id__email', 'location']
@@ -41,14 +42,14 @@ class EventAdmin(admin.ModelAdmin):
 
 
 @admin.register(Ticket)
-class TicketAdmin(admin.ModelAdmin):
+class TicketAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'event', 'price', 'total_seats', 'booked_seats', 'created_at']
     list_filter = ['event__category', 'created_at']
     search_fields = ['name', 'event__title']
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = ['transaction_id', 'full_name', 'ticket', 'amount', 'created_at']
     list_filter = ['created_at']
     search_fields = ['transaction_id', 'full_name', 'email']
@@ -0,0 +1,236 @@
+"""
+Shared helpers for the bench_* management commands.
+"""
+import asyncio
+import json
+import os
+import queue
+import resource
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, time as dt_time
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import RequestFactory
+from django.test.client import FakePayload
+
+from apps.core.asgi import FinishRequestMiddleware
+from .models import Category, Event, Ticket
+
+User = get_user_model()
+
+# Accounts created by seed_data: <role>-<n>@SEED_DOMAIN, all with SEED_PASSWORD
+SEED_DOMAIN = 'seed.local'
+SEED_PASSWORD = 'seed-password'
+
+
+def create_bench_event(*, seats: int, tickets: int = 1, tag: str = None) -> Event:
+    """Create a throwaway organizer, category and accepted event with ``tickets`` ticket types."""
+    tag = tag or uuid.uuid4().hex[:8]
+    organizer = User.objects.create_user(
+        email=f'bench-{tag}@bench.local', password=None, full_name='Bench Organizer'
+    )
+    category = Category.objects.create(category_name=f'bench-{tag}')
+    event = Event.objects.create(
+        title=f'Hot event {tag}',
+        category=category,
+        event_date=date.today(),
+        start_time=dt_time(18, 0),
+        end_time=dt_time(22, 0),
+        location='Bench Arena',
+        mobile_number='0000000000',
+        email='organizer@bench.local',
+        status='accepted',
+        total_seats=seats * tickets,
+        auth_id=organizer,
+    )
+    Ticket.objects.bulk_create(
+        Ticket(name=f'Tier {index}', price=10, total_seats=seats, event=event)
+        for index in range(tickets)
+    )
+    return event
+
+
+def delete_bench_event(event: Event) -> None:
+    """Hard-delete an event created by ``create_bench_event`` and its owners."""
+    event.hard_delete()
+    event.category.hard_delete()
+    event.auth_id.hard_delete()
+
+
+@contextmanager
+def timer():
+    """Yield a dict whose ``seconds`` key is filled in when the block exits."""
+    result = {}
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - started
+
+
+@contextmanager
+def count_queries():
+    """Yield a dict whose ``queries`` key counts SQL statements run in the block."""
+    result = {'queries': 0}
+
+    def counter(execute, sql, params, many, context):
+        result['queries'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        yield result
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentiles(samples, points=(50, 95, 99)) -> dict:
+    """Nearest-rank percentiles of ``samples``, keyed ``p50``, ``p95``..."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f'p{point}': None for point in points}
+    return {
+        f'p{point}': ordered[min(len(ordered) - 1, max(0, -(-point * len(ordered) // 100) - 1))]
+        for point in points
+    }
+
+
+def zipf_weights(count: int, exponent: float) -> list:
+    """Cumulative weights for ranks ``1..count`` ~ 1/rank**exponent (0 = uniform)."""
+    weights, total = [], 0.0
+    for rank in range(1, count + 1):
+        total += rank ** -exponent
+        weights.append(total)
+    return weights
+
+
+def wsgi_environ(factory, path, query, extra=None) -> dict:
+    extra = extra or {}
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'REQUEST_METHOD': extra.get('method', 'GET')}
+    environ.update(extra.get('headers', {}))
+    if 'body' in extra:
+        payload = json.dumps(extra['body']).encode()
+        environ.update({
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'wsgi.input': FakePayload(payload),
+        })
+    return factory._base_environ(**environ)
+
+
+def wsgi_load(requests, *, concurrency: int, workers: int):
+    """
+    Send ``requests`` (``(path, query)`` pairs, or ``(path, query, extra)``
+    where ``extra`` may give a ``method``, a JSON ``body`` and environ
+    ``headers``) through Django's WSGIHandler from ``concurrency``
+    clients, with at most ``workers`` running at once like a threaded WSGI
+    server. Latency includes the wait for a worker.
+    Returns ``(latencies, errors, seconds)``; errors are non-2xx responses.
+    """
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    requests = iter(requests)
+    next_request = threading.Lock()
+    backlog = queue.Queue()  # accepted connections, served first come first served
+    results = []
+
+    def worker():
+        while (item := backlog.get()) is not None:
+            request, started, done = item
+            environ = wsgi_environ(factory, *request)
+            statuses = []
+            body = handler(environ, lambda status, headers: statuses.append(status))
+            b''.join(body)
+            body.close()
+            results.append((time.perf_counter() - started, statuses[0].startswith('2')))
+            done.set()
+
+    def client():
+        while True:
+            with next_request:
+                request = next(requests, None)
+            if request is None:
+                return
+            done = threading.Event()
+            backlog.put((request, time.perf_counter(), done))
+            done.wait()
+
+    servers = [threading.Thread(target=worker) for _ in range(workers)]
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in servers + clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for thread in servers:
+        backlog.put(None)
+    for thread in servers:
+        thread.join()
+    return [latency for latency, ok in results], sum(not ok for _, ok in results), elapsed
+
+
+def asgi_load(requests, *, concurrency: int):
+    """
+    Send ``requests`` through Django's ASGIHandler, wrapped as in
+    config/asgi.py, from ``concurrency`` clients on one event loop. Like
+    uvicorn, the client reports a disconnect once the body is sent.
+    Returns ``(latencies, errors, seconds)``.
+    """
+    handler = FinishRequestMiddleware(ASGIHandler())
+    requests = iter(requests)
+    results = []
+
+    async def call(path, query):
+        started = time.perf_counter()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+        messages = []
+        body_sent = asyncio.Event()
+        pending = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            # Django listens for a disconnect while the view runs
+            await body_sent.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body'):
+                body_sent.set()
+
+        await handler(scope, receive, send)
+        status = next(message['status'] for message in messages if message['type'] == 'http.response.start')
+        results.append((time.perf_counter() - started, status == 200))
+
+    async def client():
+        for request in requests:  # shared iterator: each request is sent once
+            await call(*request)
+
+    async def main():
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    if not results:
+        raise RuntimeError('No ASGI requests completed')
+    return [latency for latency, ok in results], sum(not ok for _, ok in results), elapsed
@@ -0,0 +1,294 @@
+"""
+Benchmark the API routes of apps/events/urls.py and apps/accounts/urls.py
+end to end, against the data already in the database (run ``seed_data``
+first).
+
+Every route is measured twice:
+
+1. ``--sample`` requests one at a time through the Django test client,
+   to check the status and count SQL queries per request.
+2. ``--requests`` requests through Django's WSGIHandler from
+   ``--concurrency`` clients served by ``--workers`` threads, for
+   p50/p95/p99 latency and throughput.
+
+Then a weighted mix of all routes is run the same way. Ids in paths are
+drawn with the same popularity skew as ``seed_data`` (``--skew``), so hot
+events get most of the traffic. Routes that write (bookings,
+registrations) only run with ``--writes``; exports are left out of the
+mix.
+
+The report is JSON (``--output``, else stdout), with the git commit,
+settings and dataset size. ``--compare`` prints the change against an
+earlier report. Runs with DEBUG and the profiler off, like production;
+``--no-cache`` also turns the response cache off.
+"""
+import json
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F
+from django.test import Client, override_settings
+
+from apps.accounts.tokens import RefreshToken
+from apps.core.db.routers import replica_aliases
+from apps.events.benchmarks import SEED_DOMAIN, SEED_PASSWORD, count_queries, percentiles, wsgi_load, zipf_weights
+from apps.events.models import Category, Event, Payment, Ticket
+
+User = get_user_model()
+
+WORDS = ['festival', 'jazz', 'summit', 'night', 'workshop', 'rock', 'startup', 'marathon']
+
+
+class Dataset:
+    """Ids to put in request paths, hottest first, with Zipf pickers."""
+
+    def __init__(self, rng, skew):
+        self.rng = rng
+        events = list(
+            Event.objects.filter(status='accepted')
+            .annotate(sales=Count('tickets__payments'))
+            .order_by('-sales', 'id')
+            .values_list('id', flat=True)[:5000]
+        )
+        if not events:
+            raise CommandError('No accepted events; run seed_data first.')
+        self.events = events
+        self.event_weights = zipf_weights(len(events), skew)
+        self.categories = list(Category.objects.values_list('id', flat=True))
+        self.tickets = {}
+        for ticket_id, event_id in Ticket.objects.filter(event_id__in=events).values_list('id', 'event_id'):
+            self.tickets.setdefault(event_id, []).append(ticket_id)
+        self.open_tickets = list(
+            Ticket.objects.filter(event_id__in=events, booked_seats__lt=F('total_seats'))
+            .values_list('id', flat=True)[:1000]
+        )
+        self.payments = list(Payment.objects.order_by('-id').values_list('id', flat=True)[:1000])
+        self.users = list(User.objects.values_list('id', flat=True)[:1000])
+        self.admin = User.objects.filter(role='admin', is_active=True).order_by('id').first()
+        self.organizer = User.objects.filter(role='organizer', is_active=True, events__isnull=False).order_by('id').first()
+        self.login_email = (
+            User.objects.filter(email__endswith=f'@{SEED_DOMAIN}').values_list('email', flat=True).first()
+        )
+        if self.admin is None or self.organizer is None:
+            raise CommandError('Need an admin and an organizer with events; run seed_data first.')
+        self.admin_auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.admin).access_token}'}
+        self.organizer_auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.organizer).access_token}'}
+        self.refresh_token = str(RefreshToken.for_user(self.organizer))
+
+    def event(self):
+        return self.rng.choices(self.events, cum_weights=self.event_weights)[0]
+
+    def ticket(self):
+        return self.rng.choice(self.tickets.get(self.event()) or [ticket for tickets in self.tickets.values() for ticket in tickets])
+
+    def pick(self, ids):
+        return self.rng.choice(ids) if ids else 0
+
+
+def routes(data: Dataset, writes: bool) -> list:
+    """``(name, weight, make_request)``; ``make_request()`` returns ``(path, query, extra)``."""
+    anon, admin, organizer = {}, {'headers': data.admin_auth}, {'headers': data.organizer_auth}
+    rng = data.rng
+    table = [
+        ('categories.list', 5, lambda: ('/api/categories/', '', anon)),
+        ('categories.retrieve', 2, lambda: (f'/api/categories/{data.pick(data.categories)}/', '', anon)),
+        ('events.list', 20, lambda: ('/api/events/', f'status=accepted&page={rng.randint(1, 3)}', anon)),
+        ('events.list.category', 5, lambda: (
+            '/api/events/', f'category={data.pick(data.categories)}&ordering=event_date', anon,
+        )),
+        ('events.list.search', 5, lambda: ('/api/events/', f'search={rng.choice(WORDS)}', anon)),
+        ('events.retrieve', 25, lambda: (f'/api/events/{data.event()}/', '', anon)),
+        ('events.my_events', 2, lambda: ('/api/events/my-events/', '', organizer)),
+        ('events.stats', 1, lambda: (f'/api/events/{data.event()}/stats/', '', admin)),
+        ('events.export', 0, lambda: ('/api/events/export/', 'file_format=ndjson', admin)),
+        ('tickets.list', 10, lambda: ('/api/tickets/', f'event={data.event()}', anon)),
+        ('tickets.retrieve', 3, lambda: (f'/api/tickets/{data.ticket()}/', '', anon)),
+        ('payments.list', 2, lambda: ('/api/payments/', '', admin)),
+        ('payments.list.event', 1, lambda: ('/api/payments/', f'ticket__event={data.event()}', admin)),
+        ('payments.retrieve', 1, lambda: (f'/api/payments/{data.pick(data.payments)}/', '', admin)),
+        ('payments.summary', 1, lambda: ('/api/payments/summary/', '', admin)),
+        ('payments.export', 0, lambda: ('/api/payments/export/', 'file_format=ndjson', admin)),
+        ('auth.users.list', 1, lambda: ('/api/auth/users/', '', admin)),
+        ('auth.users.retrieve', 1, lambda: (f'/api/auth/users/{data.pick(data.users)}/', '', admin)),
+        ('auth.token_refresh', 1, lambda: (
+            '/api/auth/token/refresh/', '', {'method': 'POST', 'body': {'refresh': data.refresh_token}},
+        )),
+    ]
+    if data.login_email:
+        table.append(('auth.login', 1, lambda: (
+            '/api/auth/login/', '', {'method': 'POST', 'body': {'email': data.login_email, 'password': SEED_PASSWORD}},
+        )))
+    if writes:
+        table += [
+            ('payments.create', 3, lambda: ('/api/payments/', '', {'method': 'POST', 'body': {
+                'full_name': 'Bench Buyer', 'mobile_number': '0700000000', 'email': f'bench@{SEED_DOMAIN}',
+                'ticket_count': 1, 'amount': '10.00', 'ticket': data.pick(data.open_tickets),
+                'transaction_id': f'bench-{uuid.uuid4().hex}',
+            }})),
+            ('auth.register', 1, lambda: ('/api/auth/register/', '', {'method': 'POST', 'body': {
+                'email': f'bench-{uuid.uuid4().hex[:12]}@{SEED_DOMAIN}', 'full_name': 'Bench User',
+                'password': SEED_PASSWORD, 'password2': SEED_PASSWORD,
+            }})),
+        ]
+    return table
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API route (latency percentiles, queries, throughput) and write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Load requests per route')
+        parser.add_argument('--mix-requests', type=int, default=2000, help='Requests in the mixed run')
+        parser.add_argument('--sample', type=int, default=5, help='Test-client requests per route for query counts')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients')
+        parser.add_argument('--workers', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent for picking events')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the request streams')
+        parser.add_argument('--routes', help='Comma-separated route names to run (default: all)')
+        parser.add_argument('--no-cache', action='store_true', help='Turn the response cache off')
+        parser.add_argument('--writes', action='store_true', help='Also run routes that write (bookings, registrations)')
+        parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+        parser.add_argument('--compare', help='Earlier JSON report to compare with')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        overrides = {
+            'DEBUG': False,
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            'PROFILER_ENABLED': False,  # its logging and bookkeeping would be measured too
+        }
+        if options['no_cache']:
+            overrides['RESPONSE_CACHE_ENABLED'] = False
+        with override_settings(**overrides):
+            data = Dataset(rng, options['skew'])
+            table = routes(data, options['writes'])
+            if options['routes']:
+                wanted = set(options['routes'].split(','))
+                unknown = wanted - {name for name, _, _ in table}
+                if unknown:
+                    raise CommandError(f'Unknown route(s): {", ".join(sorted(unknown))}')
+                table = [route for route in table if route[0] in wanted]
+
+            report = {'meta': self._meta(options), 'routes': {}}
+            for name, _, make_request in table:
+                result = self._sample(make_request, options['sample'])
+                result.update(self._load([make_request() for _ in range(options['requests'])], options))
+                report['routes'][name] = result
+                self.stderr.write(
+                    f'{name:<24}{result["p50_ms"]:>8.1f}{result["p95_ms"]:>8.1f}{result["p99_ms"]:>8.1f} ms'
+                    f'{result["rps"]:>9.1f} req/s{result["queries"]:>5} queries{result["errors"]:>5} errors'
+                )
+
+            mix = [(make_request, weight) for name, weight, make_request in table if weight]
+            if mix:
+                makers, weights = zip(*mix)
+                requests = [maker() for maker in rng.choices(makers, weights=weights, k=options['mix_requests'])]
+                report['mix'] = self._load(requests, options)
+                self.stderr.write(
+                    f'{"mix":<24}{report["mix"]["p50_ms"]:>8.1f}{report["mix"]["p95_ms"]:>8.1f}'
+                    f'{report["mix"]["p99_ms"]:>8.1f} ms{report["mix"]["rps"]:>9.1f} req/s'
+                )
+
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(text + '\n')
+        else:
+            self.stdout.write(text)
+        if options['compare']:
+            with open(options['compare']) as file:
+                self._compare(json.load(file), report)
+
+    def _meta(self, options) -> dict:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        return {
+            'started_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'commit': commit,
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'settings': {
+                name: getattr(settings, name, None)
+                for name in ('RESPONSE_CACHE_ENABLED', 'ASYNC_READ_VIEWS', 'EVENT_SEARCH_BACKEND')
+            },
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'replicas': len(replica_aliases()),
+            'dataset': {
+                'users': User.objects.count(),
+                'events': Event.objects.count(),
+                'tickets': Ticket.objects.count(),
+                'payments': Payment.objects.count(),
+            },
+            'options': {
+                name: options[name]
+                for name in ('requests', 'mix_requests', 'concurrency', 'workers', 'skew', 'seed', 'writes')
+            },
+        }
+
+    def _sample(self, make_request, count) -> dict:
+        """Median queries per request and the status codes seen, one request at a time."""
+        client = Client()
+        queries, statuses = [], {}
+        for _ in range(max(1, count)):
+            path, query, extra = make_request()
+            method = extra.get('method', 'GET').lower()
+            kwargs = dict(extra.get('headers', {}))
+            if 'body' in extra:
+                kwargs.update(data=json.dumps(extra['body']), content_type='application/json')
+            url = f'{path}?{query}' if query else path
+            with count_queries() as counter:
+                response = getattr(client, method)(url, **kwargs)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            queries.append(counter['queries'])
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        return {'queries': int(statistics.median(queries)), 'statuses': statuses}
+
+    def _load(self, requests, options) -> dict:
+        latencies, errors, seconds = wsgi_load(
+            requests, concurrency=options['concurrency'], workers=options['workers'],
+        )
+        points = percentiles(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'seconds': round(seconds, 3),
+            'rps': round(len(latencies) / seconds, 1) if seconds else None,
+            **{f'{name}_ms': None if value is None else round(value * 1000, 2) for name, value in points.items()},
+        }
+
+    def _compare(self, before, after) -> None:
+        self.stderr.write(f'\nvs {before["meta"].get("commit")} ({before["meta"].get("started_at")})')
+        self.stderr.write(f'{"route":<24}{"p95 ms":>20}{"req/s":>22}{"queries":>12}')
+        rows = [(name, before['routes'].get(name), result) for name, result in after['routes'].items()]
+        if 'mix' in after and 'mix' in before:
+            rows.append(('mix', before['mix'], after['mix']))
+        for name, old, new in rows:
+            if old is None:
+                continue
+            self.stderr.write(
+                f'{name:<24}{_change(old["p95_ms"], new["p95_ms"]):>20}{_change(old["rps"], new["rps"]):>22}'
+                f'{_change(old.get("queries"), new.get("queries"), percent=False):>12}'
+            )
+
+
+def _change(old, new, percent=True) -> str:
+    if old is None or new is None:
+        return '-'
+    if not percent:
+        return f'{old}->{new}'
+    delta = f' ({(new - old) / old * 100:+.0f}%)' if old else ''
+    return f'{old:g}->{new:g}{delta}'
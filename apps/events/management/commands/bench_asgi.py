@@ -0,0 +1,124 @@
+"""
+Compare the sync WSGI catalog views with the async views under ASGI.
+
+Drives Django's own WSGIHandler and ASGIHandler in-process, with no
+network or server in between, so the numbers isolate the request path:
+
+- WSGI: at most ``--workers`` requests run at once, like a gthread
+  worker; the other clients wait in the queue.
+- ASGI: one event loop with ``ASYNC_READ_VIEWS`` on. Database calls still
+  run on threads (Django's async ORM wraps the sync driver), but a request
+  only holds one while a query runs.
+
+``--concurrency`` clients each send requests back to back from a mix of
+category list, event list, event detail and ticket availability. The
+response cache is off unless ``--response-cache`` is given.
+``--db-latency`` adds a sleep to every query, to stand in for a database
+on another host. Seeded rows are committed and removed afterwards, since
+server threads use their own connections.
+"""
+import importlib
+import itertools
+import time
+from datetime import date, timedelta, time as dt_time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import clear_url_caches
+
+from apps.events.benchmarks import asgi_load, create_bench_event, delete_bench_event, percentiles, wsgi_load
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Benchmark p50/p95/p99 latency of the catalog reads: sync WSGI vs async ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=200, help='Number of events to seed')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode')
+        parser.add_argument('--concurrency', type=int, default=64, help='Concurrent clients')
+        parser.add_argument('--workers', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--db-latency', type=float, default=0.0, help='Extra milliseconds per query')
+        parser.add_argument('--response-cache', action='store_true', help='Keep the response cache enabled')
+
+    def handle(self, *args, **options):
+        template = create_bench_event(seats=100, tickets=3)
+        try:
+            Event.objects.bulk_create(
+                Event(
+                    title=f'Event {index}',
+                    category=template.category,
+                    event_date=date.today() + timedelta(days=index % 365),
+                    start_time=dt_time(18, 0),
+                    end_time=dt_time(22, 0),
+                    location='Bench Arena',
+                    mobile_number='0000000000',
+                    email='organizer@bench.local',
+                    status='accepted',
+                    auth_id=template.auth_id,
+                )
+                for index in range(options['events'])
+            )
+            paths = [
+                ('/api/categories/', ''),
+                ('/api/events/', f'category={template.category_id}&ordering=event_date'),
+                (f'/api/events/{template.id}/', ''),
+                ('/api/tickets/', f'event={template.id}'),
+            ]
+            delay = options['db_latency'] / 1000
+
+            def slow_query(execute, sql, params, many, context):
+                time.sleep(delay)
+                return execute(sql, params, many, context)
+
+            def add_latency(sender, connection, **kwargs):
+                # Fires on every reconnect of the same thread-local wrapper
+                if slow_query not in connection.execute_wrappers:
+                    connection.execute_wrappers.append(slow_query)
+
+            if delay:
+                connection_created.connect(add_latency)
+            self.stdout.write(
+                f'{options["requests"]} requests per mode, {options["concurrency"]} clients, '
+                f'{options["workers"]} WSGI threads, +{options["db_latency"]:g} ms per query'
+            )
+            self.stdout.write(f'{"mode":<12}{"req/s":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"errors":>8}')
+            try:
+                overrides = {
+                    'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],  # the Host asgi_load and wsgi_load send
+                    'RESPONSE_CACHE_ENABLED': options['response_cache'],
+                    'PROFILER_ENABLED': False,  # its logging and bookkeeping would be measured too
+                }
+                with override_settings(**overrides):
+                    for label, asynchronous in (('sync WSGI', False), ('async ASGI', True)):
+                        self._use_async_views(asynchronous)
+                        requests = itertools.islice(itertools.cycle(paths), options['requests'])
+                        if asynchronous:
+                            latencies, errors, elapsed = asgi_load(requests, concurrency=options['concurrency'])
+                        else:
+                            latencies, errors, elapsed = wsgi_load(
+                                requests, concurrency=options['concurrency'], workers=options['workers'],
+                            )
+                        stats = percentiles(latencies)
+                        self.stdout.write(
+                            f'{label:<12}{len(latencies) / elapsed:>8.0f}'
+                            + ''.join(f'{stats[key] * 1000:>9.1f}' for key in ('p50', 'p95', 'p99'))
+                            + f'{errors:>8}'
+                        )
+                        if errors:
+                            raise CommandError(f'{errors} of {len(latencies)} {label} requests failed')
+            finally:
+                connection_created.disconnect(add_latency)
+                self._use_async_views(False)
+        finally:
+            Event.all_objects.filter(auth_id=template.auth_id).exclude(pk=template.pk).hard_delete()
+            delete_bench_event(template)
+
+    def _use_async_views(self, enabled):
+        """Rebuild the URLconf with ``ASYNC_READ_VIEWS`` on or off."""
+        with override_settings(ASYNC_READ_VIEWS=enabled):
+            importlib.reload(importlib.import_module('apps.events.urls'))
+            importlib.reload(importlib.import_module('config.urls'))
+        clear_url_caches()
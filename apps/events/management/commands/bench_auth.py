@@ -0,0 +1,88 @@
+"""
+Measure what authenticating from token claims saves per request.
+
+Sends authenticated requests through Django's WSGIHandler with two
+kinds of access token for the same organizer:
+
+- ``user row``: a plain token with only the user id, so
+  ``StatelessJWTAuthentication`` falls back to loading the user, as
+  ``JWTAuthentication`` did for every request.
+- ``claims``: a token from ``apps.accounts.tokens`` with role, active
+  flag and version; the user is built from the claims and only the
+  cached token version is looked up.
+
+DRF authenticates every request that sends a token, including public
+reads, so the saving applies across the API. The response cache is left
+on: cached reads are where one query per request matters most.
+"""
+import itertools
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken as PlainRefreshToken
+
+from apps.accounts.tokens import RefreshToken
+from apps.events.benchmarks import count_queries, create_bench_event, delete_bench_event, percentiles, wsgi_load
+
+
+class Command(BaseCommand):
+    help = 'Benchmark authenticated requests/sec with user-row and claim-based JWT authentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients')
+        parser.add_argument('--workers', type=int, default=8, help='WSGI worker threads')
+
+    def handle(self, *args, **options):
+        event = create_bench_event(seats=100, tickets=2)
+        organizer = event.auth_id
+        tokens = [
+            ('user row', str(PlainRefreshToken.for_user(organizer).access_token)),
+            ('claims', str(RefreshToken.for_user(organizer).access_token)),
+        ]
+        paths = [('/api/categories/', ''), (f'/api/events/{event.id}/', ''), ('/api/events/my-events/', '')]
+
+        self.stdout.write(
+            f'{options["requests"]} requests per run, {options["concurrency"]} clients, '
+            f'{options["workers"]} WSGI threads'
+        )
+        self.stdout.write(f'{"auth":<10}{"req/s":>8}{"p50 ms":>9}{"p99 ms":>9}{"queries/req":>13}{"errors":>8}')
+        try:
+            overrides = {
+                'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+                'DEBUG': False,
+                'PROFILER_ENABLED': False,  # its logging and bookkeeping would be measured too
+            }
+            with override_settings(**overrides):
+                for label, token in tokens:
+                    headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+                    queries = self._queries(paths, headers)
+                    requests = itertools.islice(
+                        itertools.cycle([(path, query, {'headers': headers}) for path, query in paths]),
+                        options['requests'],
+                    )
+                    latencies, errors, elapsed = wsgi_load(
+                        requests, concurrency=options['concurrency'], workers=options['workers'],
+                    )
+                    stats = percentiles(latencies, points=(50, 99))
+                    self.stdout.write(
+                        f'{label:<10}{len(latencies) / elapsed:>8.0f}{stats["p50"] * 1000:>9.1f}'
+                        f'{stats["p99"] * 1000:>9.1f}{queries:>13.1f}{errors:>8}'
+                    )
+                    if errors:
+                        raise CommandError(f'{errors} of {len(latencies)} {label} requests failed')
+        finally:
+            delete_bench_event(event)
+
+    def _queries(self, paths, headers) -> float:
+        """Average queries per request over ``paths``, after one warm-up round."""
+        client = Client()
+        for path, query in paths:
+            response = client.get(path, query, **headers)
+            if response.status_code != 200:
+                raise CommandError(f'GET {path} returned {response.status_code}')
+        with count_queries() as counter:
+            for path, query in paths:
+                client.get(path, query, **headers)
+        return counter['queries'] / len(paths)
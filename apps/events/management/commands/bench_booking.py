@@ -0,0 +1,103 @@
+"""
+Concurrent load test for the seat booking engine.
+
+Spawns N parallel buyers against a single hot ticket until it sells out,
+then checks that no seat was oversold and reports bookings/sec. Pass
+``--shards`` to run the same load against the sharded inventory path.
+"""
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from rest_framework.exceptions import ValidationError
+
+from apps.events import services
+from apps.events.benchmarks import create_bench_event, delete_bench_event
+from apps.events.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Load-test concurrent bookings against one hot ticket and verify there is no oversell'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=50, help='Number of parallel buyer threads')
+        parser.add_argument('--seats', type=int, default=500, help='Capacity of the hot ticket')
+        parser.add_argument('--ticket-count', type=int, default=1, help='Seats requested per booking')
+        parser.add_argument('--shards', type=int, default=0, help='Inventory slots per ticket (0 = single-row counters)')
+
+    def handle(self, *args, **options):
+        buyers = options['buyers']
+        seats = options['seats']
+        ticket_count = options['ticket_count']
+
+        event = create_bench_event(seats=seats)
+        ticket = event.tickets.get()
+        if options['shards']:
+            services.inventory_rebalance(event=event, shards=options['shards'])
+        results = {'booked': 0, 'sold_out': 0, 'contention': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(buyers)
+
+        def buyer():
+            barrier.wait()
+            try:
+                while True:
+                    try:
+                        services.event_registration_create(
+                            ticket_id=ticket.id,
+                            ticket_count=ticket_count,
+                            full_name='Bench Buyer',
+                            mobile_number='0000000000',
+                            email='buyer@bench.local',
+                            amount=ticket.price * ticket_count,
+                            transaction_id=uuid.uuid4().hex,
+                        )
+                        outcome = 'booked'
+                    except ValidationError:
+                        outcome = 'sold_out'
+                    except OperationalError:
+                        outcome = 'contention'
+                    with lock:
+                        results[outcome] += 1
+                    if outcome == 'sold_out':
+                        return
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buyer) for _ in range(buyers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            self._report(event, ticket, results, elapsed, buyers, options['shards'])
+        finally:
+            delete_bench_event(event)
+
+    def _report(self, event, ticket, results, elapsed, buyers, shards):
+        # Fold slot bookings back so the counters can be checked directly
+        services.inventory_rebalance(event=event, shards=0)
+        event.refresh_from_db()
+        ticket.refresh_from_db()
+        sold = sum(Payment.objects.filter(ticket=ticket).values_list('ticket_count', flat=True))
+
+        self.stdout.write(f'mode:              {f"{shards} shards" if shards else "single-row"}')
+        self.stdout.write(f'buyers:            {buyers}')
+        self.stdout.write(f'capacity:          {ticket.total_seats}')
+        self.stdout.write(f'bookings:          {results["booked"]}')
+        self.stdout.write(f'sold-out rejects:  {results["sold_out"]}')
+        self.stdout.write(f'contention aborts: {results["contention"]}')
+        self.stdout.write(f'elapsed:           {elapsed:.3f}s')
+        self.stdout.write(f'bookings/sec:      {results["booked"] / elapsed:.1f}')
+
+        if not (sold == ticket.booked_seats == event.booked_seats and sold <= ticket.total_seats):
+            raise CommandError(
+                f'Oversell detected: payments={sold} ticket.booked_seats={ticket.booked_seats} '
+                f'event.booked_seats={event.booked_seats} capacity={ticket.total_seats}'
+            )
+        self.stdout.write(self.style.SUCCESS('No oversell: seat counters match payments.'))
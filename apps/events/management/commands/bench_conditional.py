@@ -0,0 +1,96 @@
+"""
+Measure what conditional GET saves on a polling client.
+
+Seeds events inside a transaction that is rolled back afterwards, then
+polls /api/events/ through the real EventViewSet the way a mobile client
+does: once unconditionally every time, and once replaying the last ETag
+in If-None-Match. One event is edited every ``--change-every`` polls so
+part of the conditional polls still download a fresh body. The response
+cache is disabled unless ``--response-cache`` is given, so the
+unconditional numbers include serialization.
+"""
+import time
+from datetime import date, timedelta, time as dt_time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.events.benchmarks import count_queries, create_bench_event
+from apps.events.models import Event
+from apps.events.views import EventViewSet
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bytes and CPU saved by ETag/If-None-Match on a polling workload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=500, help='Number of events to seed')
+        parser.add_argument('--polls', type=int, default=200, help='Polls per mode')
+        parser.add_argument('--change-every', type=int, default=20, help='Edit one event every N polls (0 = never)')
+        parser.add_argument('--response-cache', action='store_true', help='Keep the response cache enabled')
+
+    def handle(self, *args, **options):
+        overrides = {
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            'RESPONSE_CACHE_ENABLED': options['response_cache'],
+        }
+        with override_settings(**overrides), transaction.atomic():
+            template = create_bench_event(seats=10, tickets=2)
+            Event.objects.bulk_create(
+                (
+                    Event(
+                        title=f'Event {index}',
+                        category=template.category,
+                        event_date=date.today() + timedelta(days=index % 365),
+                        start_time=dt_time(18, 0),
+                        end_time=dt_time(22, 0),
+                        location='Bench Arena',
+                        mobile_number='0000000000',
+                        email='organizer@bench.local',
+                        status='accepted',
+                        auth_id=template.auth_id,
+                    )
+                    for index in range(options['events'])
+                ),
+                batch_size=2000,
+            )
+            self.stdout.write(
+                f'{options["events"]} events, {options["polls"]} polls of the first page, '
+                f'one edit every {options["change_every"] or "never"} polls'
+            )
+            self.stdout.write(f'{"mode":<14}{"200s":>6}{"304s":>6}{"bytes":>12}{"CPU ms":>10}{"queries":>9}')
+            for label, conditional in (('unconditional', False), ('If-None-Match', True)):
+                stats = self._poll(template, conditional, options)
+                self.stdout.write(
+                    f'{label:<14}{stats[200]:>6}{stats[304]:>6}{stats["bytes"]:>12}'
+                    f'{stats["cpu"] * 1000:>10.0f}{stats["queries"]:>9}'
+                )
+            transaction.set_rollback(True)
+
+    def _poll(self, event, conditional, options):
+        view = EventViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        params = {'ordering': 'event_date'}
+        stats = {200: 0, 304: 0, 'bytes': 0}
+        etag = None
+        started = time.process_time()
+        with count_queries() as queries:
+            for poll in range(options['polls']):
+                if options['change_every'] and poll and poll % options['change_every'] == 0:
+                    event.title = f'{event.title[:40]} #{poll}'
+                    event.save(update_fields=['title', 'updated_at'])
+                headers = {'HTTP_IF_NONE_MATCH': etag} if conditional and etag else {}
+                response = view(factory.get('/api/events/', params, **headers))
+                if response.status_code not in stats:
+                    raise CommandError(f'Unexpected status {response.status_code}')
+                if hasattr(response, 'render'):
+                    response.render()
+                stats[response.status_code] += 1
+                stats['bytes'] += len(response.content)
+                etag = response.get('ETag', etag)
+        stats['cpu'] = time.process_time() - started
+        stats['queries'] = queries['queries']
+        return stats
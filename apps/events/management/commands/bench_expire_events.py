@@ -0,0 +1,61 @@
+"""
+Time the expiry sweep on a large events table.
+
+Seeds ``--events`` events (default 1M), ``--past`` of them accepted and
+dated in the past, inside a transaction that is rolled back afterwards.
+Then runs ``services.events_expire`` twice: the first sweep does the work,
+the second shows the cost of an idempotent re-run with nothing to do.
+"""
+import random
+from datetime import date, timedelta, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.events import services
+from apps.events.benchmarks import count_queries, create_bench_event, timer
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the chunked expiry sweep on a large seeded events table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000000, help='Events to seed')
+        parser.add_argument('--past', type=float, default=0.3, help='Share of accepted events dated in the past')
+        parser.add_argument('--chunk-size', type=int, default=services.EVENT_EXPIRE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        rng = random.Random(1)
+        today = date.today()
+        with transaction.atomic():
+            template = create_bench_event(seats=10)
+            with timer() as seeded:
+                for start in range(0, options['events'], 20000):
+                    Event.objects.bulk_create(
+                        Event(
+                            title=f'Event {index}',
+                            category=template.category,
+                            event_date=today + timedelta(days=rng.randint(-365, -1) if rng.random() < options['past'] else rng.randint(0, 365)),
+                            start_time=dt_time(18, 0),
+                            end_time=dt_time(22, 0),
+                            location='Bench Arena',
+                            mobile_number='0000000000',
+                            email='organizer@bench.local',
+                            status=rng.choice(['accepted', 'accepted', 'accepted', 'pending', 'rejected']),
+                            auth_id=template.auth_id,
+                        )
+                        for index in range(start, min(start + 20000, options['events']))
+                    )
+            due = Event.objects.filter(status='accepted', event_date__lt=today).count()
+            self.stdout.write(f'seeded {options["events"]} events in {seeded["seconds"]:.0f} s, {due} due to expire')
+
+            for label in ('first sweep', 're-run'):
+                with timer() as elapsed, count_queries() as queries:
+                    expired = services.events_expire(before=today, chunk_size=options['chunk_size'])
+                self.stdout.write(
+                    f'{label:<12} expired {expired:>8} in {elapsed["seconds"]:7.2f} s, {queries["queries"]} queries'
+                )
+            if Event.objects.filter(status='accepted', event_date__lt=today).exists():
+                raise CommandError('Accepted past events left after the sweep')
+            transaction.set_rollback(True)
@@ -0,0 +1,80 @@
+"""
+Check that the payments export streams in constant memory.
+
+Seeds payments inside a transaction that is rolled back afterwards, then
+downloads GET /api/payments/export/ through the real PaymentViewSet as an
+admin, sampling the process RSS after every chunk of output. Fails when
+RSS grows by more than ``--max-rss-mb`` during the download. For
+contrast, also measures loading the same rows into one list.
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.events import selectors
+from apps.events.benchmarks import count_queries, create_bench_event, rss_bytes, timer
+from apps.events.models import Payment
+from apps.events.views import PaymentViewSet
+
+User = get_user_model()
+MB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = 'Export seeded payments through the API and fail if memory grows past a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=200000, help='Number of payments to seed')
+        parser.add_argument('--file-format', choices=['csv', 'ndjson'], default='csv')
+        parser.add_argument('--max-rss-mb', type=float, default=64, help='Allowed RSS growth while exporting')
+        parser.add_argument('--skip-list', action='store_true', help='Skip the in-memory list comparison')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            event = create_bench_event(seats=options['payments'], tickets=3)
+            tickets = list(event.tickets.all())
+            admin = User(email='bench-admin@bench.local', role='admin')
+            for start in range(0, options['payments'], 5000):
+                Payment.objects.bulk_create(
+                    Payment(
+                        full_name=f'Buyer {index}',
+                        mobile_number='0000000000',
+                        email=f'buyer{index}@bench.local',
+                        ticket_count=1,
+                        amount=10,
+                        ticket=tickets[index % len(tickets)],
+                        transaction_id=uuid.uuid4().hex,
+                    )
+                    for index in range(start, min(start + 5000, options['payments']))
+                )
+
+            request = APIRequestFactory().get('/api/payments/export/', {'file_format': options['file_format']})
+            force_authenticate(request, user=admin)
+            baseline = peak = rss_bytes()
+            size = lines = 0
+            with timer() as elapsed, count_queries() as queries:
+                response = PaymentViewSet.as_view({'get': 'export'})(request)
+                if response.status_code != 200:
+                    raise CommandError(f'Export returned {response.status_code}')
+                for chunk in response.streaming_content:
+                    size += len(chunk)
+                    lines += chunk.count(b'\n')
+                    peak = max(peak, rss_bytes())
+            growth = (peak - baseline) / MB
+            self.stdout.write(
+                f'streamed {lines} lines / {size / MB:.1f} MB in {elapsed["seconds"]:.1f} s, '
+                f'{queries["queries"]} queries, RSS growth {growth:.1f} MB'
+            )
+
+            if not options['skip_list']:
+                baseline = rss_bytes()
+                rows = list(selectors.payment_list_values(Payment.objects.all()))
+                self.stdout.write(f'list() of the same {len(rows)} rows: RSS growth {(rss_bytes() - baseline) / MB:.1f} MB')
+                del rows
+            transaction.set_rollback(True)
+
+        if growth > options['max_rss_mb']:
+            raise CommandError(f'RSS grew {growth:.1f} MB, over the {options["max_rss_mb"]} MB budget')
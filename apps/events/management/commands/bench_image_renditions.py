@@ -0,0 +1,107 @@
+"""
+Measure the image bytes a client downloads per catalog page.
+
+Seeds events whose posters are large camera-style JPEGs (several events
+share a picture, uploaded as separate files) under a temporary
+MEDIA_ROOT, builds their renditions with the background task, then
+fetches the first /api/events/ page through the real EventViewSet and
+adds up the bytes behind the image URLs each card would load: the
+original ``image`` before, and the ``card`` or ``thumb`` rendition after.
+"""
+import io
+import tempfile
+import time
+from datetime import date, timedelta, time as dt_time
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from apps.events.benchmarks import create_bench_event
+from apps.events.models import Event
+from apps.events.tasks import image_renditions_build
+from apps.events.views import EventViewSet
+
+
+class Command(BaseCommand):
+    help = 'Benchmark image bytes per catalog page with and without renditions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=30, help='Number of events to seed')
+        parser.add_argument('--pictures', type=int, default=6, help='Distinct pictures shared by the events')
+        parser.add_argument('--size', default='3000x2000', help='Original picture size, WxH')
+
+    def handle(self, *args, **options):
+        width, height = (int(part) for part in options['size'].split('x'))
+        pictures = [self._picture(width, height, seed) for seed in range(options['pictures'])]
+
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root, RESPONSE_CACHE_ENABLED=False), \
+                transaction.atomic():
+            template = create_bench_event(seats=10)
+            Event.objects.bulk_create(
+                Event(
+                    title=f'Event {index}',
+                    category=template.category,
+                    event_date=date.today() + timedelta(days=index + 1),
+                    start_time=dt_time(18, 0),
+                    end_time=dt_time(22, 0),
+                    location='Bench Arena',
+                    mobile_number='0000000000',
+                    email='organizer@bench.local',
+                    status='accepted',
+                    auth_id=template.auth_id,
+                )
+                for index in range(options['events'])
+            )
+            events = Event.objects.filter(title__startswith='Event ', auth_id=template.auth_id).order_by('id')
+            for index, event in enumerate(events):
+                name = default_storage.save(f'events/poster-{index}.jpg', ContentFile(pictures[index % len(pictures)]))
+                Event.objects.filter(pk=event.pk).update(image=name)
+
+            started = time.perf_counter()
+            for event in events:
+                image_renditions_build(model='events.event', pk=event.pk)
+            elapsed = time.perf_counter() - started
+            built = len(set(events.values_list('image_renditions__sha256', flat=True)))
+            self.stdout.write(
+                f'{options["events"]} events, {options["pictures"]} distinct {width}x{height} pictures: '
+                f'renditions built in {elapsed:.1f} s, {built} rendition set(s) stored'
+            )
+
+            view = EventViewSet.as_view({'get': 'list'})
+            request = APIRequestFactory().get('/api/events/', {'category': template.category_id, 'ordering': 'event_date'})
+            response = view(request)
+            response.render()
+            cards = [item for item in response.data['results'] if item['image']]
+
+            json_bytes = len(response.content)
+            self.stdout.write(f'First page: {len(cards)} cards with images, JSON body {json_bytes} bytes')
+            self.stdout.write(f'{"images loaded":<16}{"image bytes":>14}{"page total":>14}')
+            rows = [
+                ('original', [item['image'] for item in cards]),
+                ('card (640px)', [item['image_renditions']['card']['url'] for item in cards]),
+                ('thumb (320px)', [item['image_renditions']['thumb']['url'] for item in cards]),
+            ]
+            for label, urls in rows:
+                image_bytes = sum(default_storage.size(self._storage_name(url)) for url in urls)
+                self.stdout.write(f'{label:<16}{image_bytes:>14}{image_bytes + json_bytes:>14}')
+            transaction.set_rollback(True)
+
+    def _storage_name(self, url):
+        return urlparse(url).path.removeprefix('/').removeprefix(settings.MEDIA_URL.strip('/') + '/')
+
+    def _picture(self, width, height, seed):
+        """A noisy gradient JPEG, about as hard to compress as a photo."""
+        gradient = Image.linear_gradient('L').rotate(seed * 40).resize((width, height))
+        noise = Image.effect_noise((width, height), 24 + seed)
+        image = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=92)
+        return buffer.getvalue()
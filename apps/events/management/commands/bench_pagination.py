@@ -0,0 +1,81 @@
+"""
+Compare page-number and keyset pagination latency on /api/events/.
+
+Seeds events inside a transaction that is rolled back afterwards, then
+times the first page and a deep page (default page 10,000) through the
+real EventViewSet for OFFSET paging with and without COUNT(*), and for
+keyset cursors.
+"""
+from datetime import date, timedelta, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from apps.core.pagination import KeysetPagination
+from apps.events.benchmarks import create_bench_event, timer
+from apps.events.models import Event
+from apps.events.views import EventViewSet
+
+
+class Command(BaseCommand):
+    help = 'Benchmark page-number vs keyset pagination at shallow and deep pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100010, help='Number of events to seed')
+        parser.add_argument('--page', type=int, default=10000, help='Deep page number to measure')
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per measurement')
+
+    def handle(self, *args, **options):
+        page_size = KeysetPagination.page_size
+        deep = options['page']
+        if deep * page_size > options['events']:
+            raise CommandError(f'--events must be at least {deep * page_size} to reach page {deep}')
+
+        with transaction.atomic():
+            template = create_bench_event(seats=10)
+            Event.objects.bulk_create(
+                (
+                    Event(
+                        title=f'Event {index}',
+                        category=template.category,
+                        event_date=date.today() + timedelta(days=index % 365),
+                        start_time=dt_time(18, 0),
+                        end_time=dt_time(22, 0),
+                        location='Bench Arena',
+                        mobile_number='0000000000',
+                        email='organizer@bench.local',
+                        status='accepted',
+                        auth_id=template.auth_id,
+                    )
+                    for index in range(options['events'])
+                ),
+                batch_size=2000,
+            )
+            ordered = Event.objects.order_by('event_date', 'id')
+            cursor = KeysetPagination(EventViewSet.keyset_ordering).encode_cursor(
+                ordered[(deep - 1) * page_size - 1], False
+            )
+
+            cases = [
+                ('page number', {'ordering': 'event_date'}, {'page': deep}),
+                ('page number, count=false', {'ordering': 'event_date', 'count': 'false'}, {'page': deep}),
+                ('keyset cursor', {'pagination': 'cursor'}, {'cursor': cursor}),
+            ]
+            self.stdout.write(f'{options["events"]} events, page size {page_size}')
+            self.stdout.write(f'{"mode":<26}{"page 1":>12}{f"page {deep}":>14}')
+            for label, params, deep_params in cases:
+                first = self._time(params, options['repeat'])
+                deeper = self._time({**params, **deep_params}, options['repeat'])
+                self.stdout.write(f'{label:<26}{first:9.1f} ms{deeper:11.1f} ms')
+            transaction.set_rollback(True)
+
+    def _time(self, params, repeat):
+        view = EventViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        with timer() as elapsed:
+            for _ in range(repeat):
+                response = view(factory.get('/api/events/', params))
+                if response.status_code != 200:
+                    raise CommandError(f'{params} returned {response.status_code}: {response.data}')
+        return elapsed['seconds'] * 1000 / repeat
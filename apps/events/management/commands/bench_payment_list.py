@@ -0,0 +1,62 @@
+"""
+Compare payment listing strategies for an organizer dashboard.
+
+Seeds payments inside a transaction that is rolled back afterwards, then
+times serializing all of them through the lazy FK path, select_related,
+and the flat ``payment_list_values`` projection.
+"""
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.events import selectors
+from apps.events.benchmarks import count_queries, create_bench_event, timer
+from apps.events.models import Payment
+from apps.events.serializers import PaymentSerializer, PaymentListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the payment listing read paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=10000, help='Number of payments to seed')
+        parser.add_argument('--tickets', type=int, default=5, help='Ticket types the payments are spread over')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            event = create_bench_event(seats=options['payments'], tickets=options['tickets'])
+            tickets = list(event.tickets.all())
+            Payment.objects.bulk_create(
+                (
+                    Payment(
+                        full_name=f'Buyer {index}',
+                        mobile_number='0000000000',
+                        email=f'buyer{index}@bench.local',
+                        ticket_count=1,
+                        amount=10,
+                        ticket=tickets[index % len(tickets)],
+                        transaction_id=uuid.uuid4().hex,
+                    )
+                    for index in range(options['payments'])
+                ),
+                batch_size=1000,
+            )
+            payments = Payment.objects.filter(ticket__event=event)
+
+            strategies = [
+                ('lazy FK hops', lambda: PaymentSerializer(payments.all(), many=True).data),
+                ('select_related', lambda: PaymentSerializer(
+                    payments.select_related('ticket__event'), many=True).data),
+                ('values projection', lambda: PaymentListSerializer(
+                    selectors.payment_list_values(payments), many=True).data),
+            ]
+            self.stdout.write(f'{options["payments"]} payments')
+            for label, run in strategies:
+                with count_queries() as queries, timer() as elapsed:
+                    rows = len(run())
+                self.stdout.write(
+                    f'{label:<18} {elapsed["seconds"] * 1000:9.1f} ms  '
+                    f'{queries["queries"]:6d} queries  {rows} rows'
+                )
+            transaction.set_rollback(True)
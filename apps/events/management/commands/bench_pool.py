@@ -0,0 +1,103 @@
+"""
+Measure what persistent and pooled connections save per request.
+
+Serves light catalog reads through Django's WSGIHandler (``--workers``
+threads) and ASGIHandler (sync views, so every request runs on a new
+thread) with three connection setups:
+
+- ``per request``: CONN_MAX_AGE=0 with the stock backend, a new
+  connection for every request.
+- ``persistent``: CONN_MAX_AGE=60, one connection kept per thread.
+- ``pooled``: CONN_MAX_AGE=0 with the pooled backend from apps.core.db.
+
+``--connect-latency`` adds a sleep to every new physical connection, to
+stand in for the TCP and auth handshake with a database server (about
+2 ms for MySQL on a LAN, more with TLS). The response cache is off so
+every request reaches the database.
+"""
+import itertools
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.mysql import base as mysql_base
+from django.db.backends.sqlite3 import base as sqlite_base
+from django.test import override_settings
+
+from apps.core.db.pool import get_pool
+from apps.events.benchmarks import asgi_load, create_bench_event, delete_bench_event, percentiles, wsgi_load
+
+BACKENDS = {
+    'sqlite': (sqlite_base, 'django.db.backends.sqlite3', 'apps.core.db.backends.sqlite3'),
+    'mysql': (mysql_base, 'django.db.backends.mysql', 'apps.core.db.backends.mysql'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark requests/sec with per-request, persistent and pooled database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+        parser.add_argument('--workers', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--connect-latency', type=float, default=2.0, help='Extra milliseconds per new connection')
+
+    def handle(self, *args, **options):
+        vendor = connections['default'].vendor
+        if vendor not in BACKENDS:
+            raise CommandError(f'No pooled backend for {vendor}')
+        module, stock, pooled = BACKENDS[vendor]
+        db = connections.settings['default']
+        saved = {key: db[key] for key in ('ENGINE', 'CONN_MAX_AGE')}
+        setups = [
+            ('per request', stock, 0),
+            ('persistent', stock, 60),
+            ('pooled', pooled, 0),
+        ]
+
+        event = create_bench_event(seats=100, tickets=2)
+        paths = [('/api/categories/', ''), (f'/api/events/{event.id}/', ''), ('/api/tickets/', f'event={event.id}')]
+        connects = {'count': 0}
+        original_connect = module.DatabaseWrapper.get_new_connection
+        delay = options['connect_latency'] / 1000
+
+        def slow_connect(wrapper, conn_params):
+            connects['count'] += 1
+            time.sleep(delay)
+            return original_connect(wrapper, conn_params)
+
+        self.stdout.write(
+            f'{options["requests"]} requests per run, {options["concurrency"]} clients, '
+            f'{options["workers"]} WSGI threads, +{options["connect_latency"]:g} ms per new connection'
+        )
+        self.stdout.write(f'{"server":<8}{"connections":<14}{"req/s":>8}{"p50 ms":>9}{"p99 ms":>9}{"connects":>10}{"errors":>8}')
+        try:
+            with override_settings(RESPONSE_CACHE_ENABLED=False), \
+                    mock.patch.object(module.DatabaseWrapper, 'get_new_connection', slow_connect):
+                for server, (label, engine, max_age) in itertools.product(('WSGI', 'ASGI'), setups):
+                    self._configure(engine=engine, max_age=max_age)
+                    connects['count'] = 0
+                    requests = itertools.islice(itertools.cycle(paths), options['requests'])
+                    if server == 'WSGI':
+                        latencies, errors, elapsed = wsgi_load(
+                            requests, concurrency=options['concurrency'], workers=options['workers'],
+                        )
+                    else:
+                        latencies, errors, elapsed = asgi_load(requests, concurrency=options['concurrency'])
+                    stats = percentiles(latencies, points=(50, 99))
+                    self.stdout.write(
+                        f'{server:<8}{label:<14}{len(latencies) / elapsed:>8.0f}'
+                        f'{stats["p50"] * 1000:>9.1f}{stats["p99"] * 1000:>9.1f}{connects["count"]:>10}{errors:>8}'
+                    )
+            self.stdout.write(f'Pool: {get_pool(db).stats()}')
+        finally:
+            self._configure(engine=saved['ENGINE'], max_age=saved['CONN_MAX_AGE'])
+            get_pool(db).close_idle()
+            delete_bench_event(event)
+
+    def _configure(self, *, engine, max_age):
+        """Switch the default database; threads started afterwards get a wrapper for it."""
+        connections['default'].close()
+        del connections['default']
+        connections.settings['default'].update(ENGINE=engine, CONN_MAX_AGE=max_age)
@@ -0,0 +1,102 @@
+"""
+Check the sales rollups against raw aggregates on a randomized dataset
+and compare the cost of both ways of answering stats/summary.
+
+Inside a transaction that is rolled back afterwards, books random
+payments through the same services as the API (random events, tickets,
+counts and amounts), then edits and deletes a random share of them, and
+verifies every rollup row against the payments table. Finally times
+``event_get_stats`` and the payment summary read from the rollups and
+aggregated from payments.
+"""
+import random
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.events import selectors, services
+from apps.events.benchmarks import count_queries, create_bench_event, timer
+from apps.events.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Verify sales rollups on random bookings and time rollup vs raw stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20, help='Number of events to seed')
+        parser.add_argument('--payments', type=int, default=5000, help='Number of bookings to make')
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible runs')
+        parser.add_argument('--repeat', type=int, default=20, help='Calls per timing')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            events = [
+                create_bench_event(seats=options['payments'], tickets=rng.randint(1, 4))
+                for _ in range(options['events'])
+            ]
+            tickets = [ticket for event in events for ticket in event.tickets.all()]
+
+            for _ in range(options['payments']):
+                services.event_registration_create(
+                    ticket_id=rng.choice(tickets).id,
+                    ticket_count=rng.randint(1, 5),
+                    full_name='Bench Buyer',
+                    mobile_number='0000000000',
+                    email=f'buyer{rng.randint(1, 500)}@bench.local',
+                    amount=Decimal(rng.randint(100, 50000)) / 100,
+                    transaction_id=uuid.uuid4().hex,
+                )
+
+            payments = list(Payment.objects.filter(ticket__event__in=events).select_related('ticket'))
+            for payment in rng.sample(payments, len(payments) // 10):
+                services.payment_delete(payment=payment)
+            payments = list(Payment.objects.filter(ticket__event__in=events).select_related('ticket'))
+            for payment in rng.sample(payments, len(payments) // 10):
+                services.payment_update(payment=payment, data={
+                    'ticket': rng.choice(tickets),
+                    'ticket_count': rng.randint(1, 5),
+                    'amount': Decimal(rng.randint(100, 50000)) / 100,
+                })
+
+            problems = [problem for event in events for problem in selectors.sales_rollups_diff(event_id=event.id)]
+            for problem in problems[:20]:
+                self.stdout.write(problem)
+            if problems:
+                transaction.set_rollback(True)
+                raise CommandError(f'{len(problems)} rollup row(s) disagree with the payments table')
+            self.stdout.write(
+                f'{options["payments"]} bookings over {len(events)} events / {len(tickets)} tickets, '
+                f'10% deleted and 10% edited: rollups match payments'
+            )
+
+            hot = events[0]
+            scoped = Payment.objects.filter(ticket__event__in=events)
+            cases = [
+                ('event stats, rollup', lambda: selectors.event_get_stats(hot)),
+                ('event stats, raw', lambda: self._raw_stats(hot)),
+                ('summary, rollup', lambda: selectors.payment_get_summary(organizer=None)),
+                ('summary, raw', lambda: selectors.payment_get_summary_raw(scoped)),
+            ]
+            self.stdout.write(f'{"call":<22}{"ms/call":>10}{"queries":>9}')
+            for label, call in cases:
+                with timer() as elapsed, count_queries() as queries:
+                    for _ in range(options['repeat']):
+                        call()
+                self.stdout.write(
+                    f'{label:<22}{elapsed["seconds"] * 1000 / options["repeat"]:>10.2f}'
+                    f'{queries["queries"] / options["repeat"]:>9.0f}'
+                )
+            transaction.set_rollback(True)
+
+    def _raw_stats(self, event):
+        # What event_get_stats did before the rollups: two counts plus a Python sum
+        payments = Payment.objects.filter(ticket__event=event)
+        return {
+            'total_registrations': payments.count(),
+            'confirmed_registrations': payments.count(),
+            'total_tickets_sold': sum(p.ticket_count for p in payments),
+            'total_revenue': sum(p.amount for p in payments),
+        }
@@ -0,0 +1,88 @@
+"""
+Benchmark event search latency: LIKE '%term%' versus the search engines.
+
+Seeds synthetic events inside a transaction that is rolled back
+afterwards, then times a first-page search (ranked page of 10 plus the
+total count) for a few representative queries.
+"""
+import random
+from datetime import date, time as dt_time
+from functools import reduce
+from operator import and_, or_
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.events import search
+from apps.events.benchmarks import create_bench_event, timer
+from apps.events.models import Event
+
+WORDS = (
+    'rock jazz tech summit festival workshop marathon comedy night gala expo '
+    'startup design music food wine film poetry yoga chess robotics data cloud '
+    'summer winter spring autumn charity youth city open live grand annual'
+).split()
+CITIES = 'Colombo Kandy Galle Jaffna Negombo Matara Trincomalee Batticaloa Ella Kurunegala'.split()
+QUERIES = ['jazz', 'fest', 'tech summit', 'kan', 'robotics colombo']
+
+
+class Command(BaseCommand):
+    help = 'Compare event search latency across search backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100000, help='Number of events to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            template = create_bench_event(seats=10)
+            Event.objects.bulk_create(
+                (
+                    Event(
+                        title=' '.join(rng.sample(WORDS, 3)).title(),
+                        category=template.category,
+                        event_date=date.today(),
+                        start_time=dt_time(18, 0),
+                        end_time=dt_time(22, 0),
+                        location=rng.choice(CITIES),
+                        mobile_number='0000000000',
+                        email=f'{rng.choice(WORDS)}{index}@bench.local',
+                        status='accepted',
+                        auth_id=template.auth_id,
+                    )
+                    for index in range(options['events'])
+                ),
+                batch_size=2000,
+            )
+
+            backends = [('like', self._like_search)]
+            if connection.vendor == 'mysql':
+                backends.append(('mysql', search.SEARCH_BACKENDS['mysql'].search))
+            with timer() as build:
+                search.token_index.build()
+            self.stdout.write(f'memory index build: {build["seconds"] * 1000:.1f} ms for {options["events"]} events')
+            backends.append(('memory', search.token_index.search))
+
+            self.stdout.write(f'{"query":<20}' + ''.join(f'{name:>14}' for name, _ in backends))
+            for query in QUERIES:
+                row = f'{query:<20}'
+                for _, run in backends:
+                    with timer() as elapsed:
+                        for _ in range(options['repeat']):
+                            queryset = run(Event.objects.all(), query.split())
+                            list(queryset[:10])
+                            queryset.count()
+                    row += f'{elapsed["seconds"] * 1000 / options["repeat"]:11.1f} ms'
+                self.stdout.write(row)
+
+            search.token_index.reset()
+            transaction.set_rollback(True)
+
+    def _like_search(self, queryset, terms):
+        fields = search.SEARCH_FIELD_WEIGHTS
+        return queryset.filter(reduce(and_, (
+            reduce(or_, (Q(**{f'{field}__icontains': term}) for field in fields))
+            for term in terms
+        )))
@@ -0,0 +1,73 @@
+"""
+Compare soft-deleting events one instance at a time with the bulk
+``SoftDeleteQuerySet.soft_delete()``.
+
+Seeds events with tickets inside a transaction that is rolled back
+afterwards. The loop is the old ``SoftDeleteModel.delete`` path (set the
+flag, full ``save()``, tickets handled one by one); the bulk path flags
+the events and cascades to their tickets with one UPDATE each.
+"""
+from datetime import date, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.events.benchmarks import count_queries, create_bench_event, timer
+from apps.events.models import Event, Ticket
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-instance vs bulk soft delete of events and their tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000, help='Events per run')
+        parser.add_argument('--tickets', type=int, default=3, help='Tickets per event')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{options["events"]} events x {options["tickets"]} tickets')
+        self.stdout.write(f'{"mode":<22}{"ms":>10}{"queries":>9}')
+        for label, delete in (('per-instance save()', self._loop), ('queryset soft_delete', self._bulk)):
+            with transaction.atomic():
+                events = self._seed(options)
+                with timer() as elapsed, count_queries() as queries:
+                    delete(events)
+                left = Ticket.objects.filter(event__in=events).count() + Event.objects.filter(id__in=events).count()
+                if left:
+                    raise CommandError(f'{label}: {left} rows still live')
+                self.stdout.write(f'{label:<22}{elapsed["seconds"] * 1000:>10.0f}{queries["queries"]:>9}')
+                transaction.set_rollback(True)
+
+    def _seed(self, options):
+        template = create_bench_event(seats=10)
+        events = Event.objects.bulk_create(
+            Event(
+                title=f'Event {index}',
+                category=template.category,
+                event_date=date.today(),
+                start_time=dt_time(18, 0),
+                end_time=dt_time(22, 0),
+                location='Bench Arena',
+                mobile_number='0000000000',
+                email='organizer@bench.local',
+                status='expired',
+                auth_id=template.auth_id,
+            )
+            for index in range(options['events'])
+        )
+        Ticket.objects.bulk_create(
+            Ticket(name=f'Tier {index}', price=10, total_seats=10, event=event)
+            for event in events
+            for index in range(options['tickets'])
+        )
+        return [event.id for event in events]
+
+    def _loop(self, event_ids):
+        for event in Event.objects.filter(id__in=event_ids):
+            event.is_deleted = True
+            event.save()
+            for ticket in event.tickets.all():
+                ticket.is_deleted = True
+                ticket.save()
+
+    def _bulk(self, event_ids):
+        Event.objects.filter(id__in=event_ids).soft_delete()
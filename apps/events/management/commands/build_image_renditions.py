@@ -0,0 +1,32 @@
+"""
+Queue rendition builds for event and category images that have none yet.
+
+New uploads are queued automatically on save; run this once after
+deploying the image pipeline, or after changing ``IMAGE_RENDITIONS``
+with ``--all``.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.images import renditions_current
+from apps.events.models import Category, Event
+from apps.events.tasks import image_renditions_build
+from apps.tasks.services import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Queue WebP rendition builds for event and category images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild images that already have renditions')
+
+    def handle(self, *args, **options):
+        for model in (Category, Event):
+            queued = 0
+            rows = model.all_objects.exclude(image='').exclude(image=None).only('id', 'image', 'image_renditions')
+            for instance in rows.iterator(chunk_size=2000):
+                if options['all'] or not renditions_current(instance):
+                    if options['all']:
+                        model.all_objects.filter(pk=instance.pk).update(image_renditions={})
+                    enqueue(image_renditions_build, model=model._meta.label_lower, pk=instance.pk)
+                    queued += 1
+            self.stdout.write(f'{model._meta.verbose_name_plural}: queued {queued} rendition build(s)')
@@ -0,0 +1,52 @@
+"""
+Mark accepted events whose date has passed as expired.
+
+Meant to run from cron (or with ``--every`` as a long-running worker).
+Concurrent runs are serialized by an advisory lock; a run that cannot
+take it exits without doing anything.
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.locks import advisory_lock
+from apps.events import services
+from apps.events.models import Event
+
+LOCK_NAME = 'eventhub.expire_events'
+
+
+class Command(BaseCommand):
+    help = 'Move past-dated accepted events to expired in chunked bulk UPDATEs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=services.EVENT_EXPIRE_CHUNK_SIZE, help='Events per UPDATE')
+        parser.add_argument('--grace-days', type=int, default=0, help='Keep events this many days past their date')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the events that would expire')
+        parser.add_argument('--every', type=int, help='Keep running, sweeping every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            self.sweep(options)
+            if not options['every']:
+                return
+            time.sleep(options['every'])
+
+    def sweep(self, options):
+        before = timezone.localdate() - timedelta(days=options['grace_days'])
+        if options['dry_run']:
+            count = Event.objects.filter(status='accepted', event_date__lt=before).count()
+            self.stdout.write(f'{count} event(s) dated before {before} would expire')
+            return
+
+        with advisory_lock(LOCK_NAME) as acquired:
+            if not acquired:
+                self.stdout.write('Another expiry sweep is running; skipping')
+                return
+            started = time.perf_counter()
+            expired = services.events_expire(before=before, chunk_size=options['chunk_size'])
+            self.stdout.write(
+                f'Expired {expired} event(s) dated before {before} in {time.perf_counter() - started:.1f} s'
+            )
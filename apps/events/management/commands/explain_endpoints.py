@@ -0,0 +1,117 @@
+"""
+Run EXPLAIN on the SQL each list endpoint generates and flag full table scans.
+
+Querysets are built through the real viewsets (get_queryset +
+filter_queryset) with representative filter, search and ordering
+parameters, so the plans match what production requests execute. Note
+that on near-empty tables the planner may prefer a scan regardless of
+indexes; run this against realistic data.
+"""
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.events.models import Category, Event, Ticket
+from apps.events.views import CategoryViewSet, EventViewSet, TicketViewSet, PaymentViewSet
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the queries behind each list endpoint and report full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan for every endpoint')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit non-zero if any full scan is found')
+
+    def handle(self, *args, **options):
+        flagged = 0
+        for label, queryset in self._cases():
+            if queryset is None:
+                self.stdout.write(self.style.WARNING(f'SKIP  {label} (no sample row to filter on)'))
+                continue
+            if queryset.query.is_empty():
+                self.stdout.write(self.style.SUCCESS(f'OK    {label} (answered without SQL)'))
+                continue
+            plan = self._explain(queryset)
+            scans = self._full_scans(plan)
+            if scans:
+                flagged += 1
+                self.stdout.write(self.style.ERROR(f'SCAN  {label}: full scan of {", ".join(sorted(scans))}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'OK    {label}'))
+            if options['verbose_plans'] or scans:
+                self.stdout.write('      ' + plan.replace('\n', '\n      '))
+
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f'{flagged} endpoint(s) use a full table scan')
+
+    def _cases(self):
+        admin = User(id=0, role='admin')
+        organizer = User.objects.filter(role='organizer').first() or User(id=0, role='organizer')
+        category_id = Category.objects.values_list('id', flat=True).first()
+        event_id = Event.objects.values_list('id', flat=True).first()
+        ticket_id = Ticket.objects.values_list('id', flat=True).first()
+        title = Event.objects.values_list('title', flat=True).first() or 'music'
+
+        yield 'GET /api/categories/', self._queryset(CategoryViewSet, '/api/categories/', {}, admin)
+        yield 'GET /api/events/', self._queryset(EventViewSet, '/api/events/', {}, admin)
+        yield 'GET /api/events/?status=accepted&ordering=event_date', self._queryset(
+            EventViewSet, '/api/events/', {'status': 'accepted', 'ordering': 'event_date'}, admin)
+        yield 'GET /api/events/?ordering=-created_at', self._queryset(
+            EventViewSet, '/api/events/', {'ordering': '-created_at'}, admin)
+        yield 'GET /api/events/?category=<id>&ordering=event_date', category_id and self._queryset(
+            EventViewSet, '/api/events/', {'category': category_id, 'ordering': 'event_date'}, admin)
+        yield 'GET /api/events/?search=<term>', self._queryset(
+            EventViewSet, '/api/events/', {'search': title.split()[0]}, admin)
+        yield 'GET /api/events/my-events/', self._queryset(
+            EventViewSet, '/api/events/my-events/', {}, organizer, action='my_events'
+        ).filter(auth_id=organizer).order_by('-created_at')
+        yield 'GET /api/tickets/?event=<id>', event_id and self._queryset(
+            TicketViewSet, '/api/tickets/', {'event': event_id}, admin)
+        yield 'GET /api/payments/ (organizer)', self._queryset(PaymentViewSet, '/api/payments/', {}, organizer)
+        yield 'GET /api/payments/?email=<email>', self._queryset(
+            PaymentViewSet, '/api/payments/', {'email': 'buyer@example.com'}, admin)
+        yield 'GET /api/payments/?ticket=<id>', ticket_id and self._queryset(
+            PaymentViewSet, '/api/payments/', {'ticket': ticket_id}, admin)
+        yield 'GET /api/payments/?ticket__event=<id>', event_id and self._queryset(
+            PaymentViewSet, '/api/payments/', {'ticket__event': event_id}, admin)
+
+    def _queryset(self, viewset_class, path, params, user, action='list'):
+        request = Request(APIRequestFactory().get(path, params))
+        request.user = user
+        view = viewset_class(request=request, action=action, args=(), kwargs={}, format_kwarg=None)
+        return view.filter_queryset(view.get_queryset())
+
+    def _explain(self, queryset):
+        if connection.vendor == 'mysql':
+            return queryset.explain(format='json')
+        return queryset.explain()
+
+    def _full_scans(self, plan):
+        """Return the set of tables the plan reads with a full scan."""
+        if connection.vendor == 'mysql':
+            return {
+                node.get('table_name', '?')
+                for node in self._walk(json.loads(plan))
+                if node.get('access_type') == 'ALL'
+            }
+        if connection.vendor == 'postgresql':
+            return set(re.findall(r'Seq Scan on (\w+)', plan))
+        if connection.vendor == 'sqlite':
+            return set(re.findall(r'\bSCAN (\w+)$', plan, re.MULTILINE))
+        return set()
+
+    def _walk(self, node):
+        if isinstance(node, dict):
+            yield node
+            for value in node.values():
+                yield from self._walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                yield from self._walk(value)
@@ -0,0 +1,41 @@
+"""
+Stream events to a CSV or NDJSON file in the import format.
+
+Events are read in id-ordered chunks, so exports of any size run in
+constant memory.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+
+from apps.core.streaming import FORMATS, detect_format, write_records
+from apps.events import selectors
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Export events as CSV or NDJSON ("-" writes stdout)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file, or - for stdout')
+        parser.add_argument('--file-format', choices=list(FORMATS), help='Defaults to the file extension, else ndjson')
+        parser.add_argument('--organizer', help='Only events owned by this email')
+        parser.add_argument('--status', help='Only events with this status')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Events read per query')
+
+    def handle(self, *args, **options):
+        fmt = options['file_format'] or detect_format(options['path'])
+        queryset = Event.objects.all()
+        if options['organizer']:
+            queryset = queryset.filter(auth_id__email=options['organizer'])
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        rows = selectors.event_export_rows(queryset, chunk_size=options['chunk_size'])
+        chunks = write_records(rows, fmt, selectors.EVENT_EXPORT_FIELDS)
+        if options['path'] == '-':
+            sys.stdout.writelines(chunks)
+        else:
+            with open(options['path'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+                self.stderr.write(f"Wrote {options['path']}")
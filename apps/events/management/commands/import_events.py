@@ -0,0 +1,54 @@
+"""
+Bulk-create events from a CSV or NDJSON file.
+
+Rows are validated like ``POST /api/events/`` and written in batches with
+bulk inserts, one transaction per batch. Invalid rows are listed with
+their line number and skipped; the rest of the file is still imported.
+"""
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.streaming import FORMATS, detect_format, read_records
+from apps.events import services
+from apps.events.models import Event
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import events from a CSV or NDJSON file ("-" reads stdin)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for stdin')
+        parser.add_argument('--organizer', required=True, help='Email of the user who will own the events')
+        parser.add_argument('--file-format', choices=list(FORMATS), help='Defaults to the file extension, else ndjson')
+        parser.add_argument('--batch-size', type=int, default=services.EVENT_IMPORT_BATCH_SIZE, help='Rows per transaction')
+        parser.add_argument('--status', choices=[choice for choice, _ in Event.STATUS_CHOICES], default='pending')
+
+    def handle(self, *args, **options):
+        try:
+            organizer = User.objects.get(email=options['organizer'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['organizer']}")
+        fmt = options['file_format'] or detect_format(options['path'])
+
+        if options['path'] == '-':
+            report = self._import(sys.stdin, fmt, organizer, options)
+        else:
+            with open(options['path'], 'rb') as stream:
+                report = self._import(stream, fmt, organizer, options)
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(f"Created {report['created']} event(s), {report['failed']} row(s) failed")
+
+    def _import(self, stream, fmt, organizer, options):
+        return services.events_import(
+            organizer=organizer,
+            records=read_records(stream, fmt),
+            batch_size=options['batch_size'],
+            status=options['status'],
+        )
@@ -0,0 +1,39 @@
+"""
+Periodic rebalance of sharded seat inventories.
+
+Folds slot bookings back into the event/ticket counters and spreads the
+remaining capacity evenly across slots again. Meant to run from cron.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.events import services
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Rebalance sharded seat inventories, or switch an event in or out of sharded mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, help='Only rebalance this event')
+        parser.add_argument('--shards', type=int, help='Set the shard count (requires --event; 0 disables sharding)')
+
+    def handle(self, *args, **options):
+        shards = options['shards']
+        if shards is not None and not options['event']:
+            raise CommandError('--shards requires --event')
+        if shards is not None and shards < 0:
+            raise CommandError('--shards must be zero or positive')
+
+        if options['event']:
+            events = Event.objects.filter(id=options['event'])
+            if not events.exists():
+                raise CommandError(f"Event {options['event']} does not exist")
+        else:
+            events = Event.objects.filter(inventory_shards__gt=0)
+
+        for event in events.only('id'):
+            event = services.inventory_rebalance(event=event, shards=shards)
+            self.stdout.write(
+                f'Event {event.id}: {event.inventory_shards} shard(s), '
+                f'{event.booked_seats} seats settled'
+            )
@@ -0,0 +1,34 @@
+"""
+Backfill or repair the event/ticket/daily sales rollups.
+
+Recomputes each event's rollup rows from the payments table. Run it after
+bulk payment imports or admin edits that bypass the booking services, or
+with ``--verify`` to only report rows that drifted.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.events import selectors, services
+from apps.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or with --verify, check) the sales rollups from the payments table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', help='Only this event (repeatable)')
+        parser.add_argument('--verify', action='store_true', help='Report mismatches without rewriting anything')
+
+    def handle(self, *args, **options):
+        event_ids = options['event'] or list(Event.all_objects.order_by('id').values_list('id', flat=True))
+
+        if options['verify']:
+            problems = [problem for event_id in event_ids for problem in selectors.sales_rollups_diff(event_id=event_id)]
+            for problem in problems:
+                self.stdout.write(problem)
+            if problems:
+                raise CommandError(f'{len(problems)} rollup row(s) out of date')
+            self.stdout.write(f'{len(event_ids)} event(s) checked, rollups match payments')
+            return
+
+        rebuilt = services.sales_rollups_rebuild(event_ids=event_ids)
+        self.stdout.write(f'Rebuilt sales rollups for {rebuilt} event(s)')
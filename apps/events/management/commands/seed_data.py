@@ -0,0 +1,224 @@
+"""
+Fill the database with synthetic users, categories, events, tickets and
+payments for benchmarks and load tests.
+
+The same ``--seed`` and options always produce the same rows (dates are
+relative to today). Demand is skewed: events are ranked by popularity
+and each payment picks an event with probability ~ 1/rank**``--skew``,
+so a few hot events take most of the bookings and sell out (a payment
+whose ticket is full picks again) while the long tail stays quiet.
+Categories are skewed the same way.
+
+Seeded accounts are ``admin-1@seed.local`` and
+``organizer-<n>@seed.local``, all with the password ``seed-password``.
+``--clear`` deletes them, and with them everything seeded.
+"""
+import json
+import random
+import uuid
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.cache import bump_namespaces
+from apps.events import services
+from apps.events.benchmarks import SEED_DOMAIN, SEED_PASSWORD, zipf_weights
+from apps.events.models import Category, Event, Payment, Ticket
+from apps.events.search import token_index
+from apps.events.signals import event_cache_namespaces
+
+User = get_user_model()
+
+CATEGORIES = [
+    'Music', 'Technology', 'Sports', 'Theatre', 'Food & Drink', 'Art', 'Business', 'Education',
+    'Health', 'Film', 'Comedy', 'Charity', 'Gaming', 'Travel', 'Science', 'Fashion',
+]
+WORDS = [
+    'Summer', 'Night', 'Live', 'Festival', 'Summit', 'Workshop', 'Open', 'Grand', 'City', 'Harbour',
+    'Jazz', 'Rock', 'Startup', 'Cloud', 'Marathon', 'Classic', 'Street', 'Kids', 'Annual', 'Global',
+]
+CITIES = ['Colombo', 'Kandy', 'Galle', 'Jaffna', 'Negombo', 'Matara', 'Trincomalee', 'Anuradhapura']
+TICKET_TYPES = [('General', 1), ('VIP', 3), ('Early bird', Decimal('0.7')), ('Student', Decimal('0.5'))]
+STATUSES = [('accepted', 85), ('pending', 10), ('rejected', 5)]
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic users, events, tickets and payments with skewed demand'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Organizer accounts (plus one admin)')
+        parser.add_argument('--events', type=int, default=2000)
+        parser.add_argument('--max-tickets', type=int, default=3, help='Ticket types per event, 1 to this many')
+        parser.add_argument('--payments', type=int, default=20000)
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of event popularity (0 = uniform)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk insert')
+        parser.add_argument('--clear', action='store_true', help='Delete previously seeded data first')
+
+    def handle(self, *args, **options):
+        if options['events'] < 1 or options['users'] < 1 or not 1 <= options['max_tickets'] <= len(TICKET_TYPES):
+            raise CommandError(f'Need at least one user and event, and 1-{len(TICKET_TYPES)} ticket types.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        if options['clear']:
+            deleted = self._clear()
+            self.stdout.write(f'Deleted {deleted} seeded account(s) and their data')
+        if User.all_objects.filter(email__endswith=f'@{SEED_DOMAIN}').exists():
+            raise CommandError('Seeded data already exists; pass --clear to replace it.')
+
+        # Plan every row in memory first, so each table is written once
+        with transaction.atomic():
+            users = self._users(options['users'])
+            categories = self._categories()
+            events = self._plan_events(options['events'], users, categories, options['skew'])
+            tickets = self._plan_tickets(events, options['max_tickets'])
+            payments, days = self._plan_payments(options['payments'], events, tickets, options['skew'])
+            self._write(Event, events, key=('email',))
+            self._write(Ticket, tickets, key=('event_id', 'name'))
+            self._write_payments(payments, days)
+
+        sold = Counter(payment.ticket.event.pk for payment in payments)
+        services.sales_rollups_rebuild(event_ids=sorted(sold))
+        # Bulk writes skip the signals: refresh the search index and cached responses
+        token_index.reset()
+        bump_namespaces(*event_cache_namespaces(
+            event_ids=[event.pk for event in events],
+            ticket_ids=[ticket.pk for ticket in tickets],
+            category_ids=[category.pk for category in categories],
+        ), 'users')
+
+        top = sold.most_common(max(1, len(events) // 100))
+        summary = {
+            'users': len(users),
+            'categories': len(categories),
+            'events': len(events),
+            'tickets': len(tickets),
+            'payments': len(payments),
+            'hot_event_ids': [event_id for event_id, _ in top[:10]],
+            'top_1pct_share': round(sum(count for _, count in top) / max(1, len(payments)), 3),
+        }
+        self.stdout.write(json.dumps(summary, indent=2))
+
+    def _clear(self) -> int:
+        seeded = User.all_objects.filter(email__endswith=f'@{SEED_DOMAIN}')
+        count = seeded.count()
+        # Events, tickets and payments cascade from their organizers
+        Payment.all_objects.filter(ticket__event__auth_id__in=seeded).hard_delete()
+        seeded.hard_delete()
+        return count
+
+    def _users(self, count) -> list:
+        password = make_password(SEED_PASSWORD)  # one hash for everyone: hashing is the slow part
+        users = [User(email=f'admin-1@{SEED_DOMAIN}', full_name='Seed Admin', role='admin', is_staff=True, password=password)]
+        users += [
+            User(email=f'organizer-{index}@{SEED_DOMAIN}', full_name=f'Seed Organizer {index}', password=password)
+            for index in range(1, count + 1)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        # Reload: MySQL does not return ids from bulk inserts
+        return list(User.objects.filter(email__endswith=f'@{SEED_DOMAIN}', role='organizer').order_by('id'))
+
+    def _categories(self) -> list:
+        Category.objects.bulk_create([Category(category_name=name) for name in CATEGORIES], ignore_conflicts=True)
+        by_name = {category.category_name: category for category in Category.objects.filter(category_name__in=CATEGORIES)}
+        return [by_name[name] for name in CATEGORIES]
+
+    def _plan_events(self, count, users, categories, skew) -> list:
+        rng = self.rng
+        category_weights = zipf_weights(len(categories), skew)
+        status_names, status_weights = zip(*STATUSES)
+        today = date.today()
+        events = []
+        for index in range(1, count + 1):
+            category = rng.choices(categories, cum_weights=category_weights)[0]
+            events.append(Event(
+                title=f'{rng.choice(WORDS)} {category.category_name} {rng.choice(WORDS)} #{index}',
+                category=category,
+                event_date=today + timedelta(days=rng.randint(-30, 180)),
+                start_time=dt_time(rng.choice([9, 10, 14, 18, 19]), 0),
+                end_time=dt_time(rng.choice([12, 17, 21, 23]), 0),
+                location=f'{rng.choice(CITIES)} {rng.choice(["Hall", "Arena", "Centre", "Park"])}',
+                is_free=rng.random() < 0.1,
+                mobile_number=f'07{rng.randint(0, 99999999):08d}',
+                email=f'events-{index}@{SEED_DOMAIN}',  # unique, to find the row ids again
+                description=' '.join(rng.choices(WORDS, k=30)),
+                status=rng.choices(status_names, weights=status_weights)[0],
+                auth_id=rng.choice(users),
+            ))
+        return events
+
+    def _plan_tickets(self, events, max_tickets) -> list:
+        rng = self.rng
+        tickets = []
+        for event in events:
+            base = Decimal(0) if event.is_free else Decimal(rng.choice([500, 1000, 1500, 2500, 5000]))
+            event.seed_tickets = []
+            for name, factor in TICKET_TYPES[:rng.randint(1, max_tickets)]:
+                ticket = Ticket(event=event, name=name, price=base * factor, total_seats=rng.choice([50, 100, 200, 500]))
+                event.seed_tickets.append(ticket)
+                event.total_seats += ticket.total_seats
+            tickets += event.seed_tickets
+        return tickets
+
+    def _plan_payments(self, count, events, tickets, skew) -> tuple:
+        """Payments, and their transaction ids grouped by days ago. Updates booked seats."""
+        rng = self.rng
+        # Only accepted events sell; popularity rank is independent of creation order
+        ranked = [event for event in events if event.status == 'accepted']
+        if not ranked:
+            return [], {}
+        rng.shuffle(ranked)
+        weights = zipf_weights(len(ranked), skew)
+        payments, days = [], {}
+        for index in range(1, count + 1):
+            for _attempt in range(20):
+                event = rng.choices(ranked, cum_weights=weights)[0]
+                ticket = rng.choice(event.seed_tickets)
+                ticket_count = rng.choices([1, 2, 3, 4], weights=[60, 25, 10, 5])[0]
+                if ticket.booked_seats + ticket_count <= ticket.total_seats:
+                    break
+            else:
+                continue  # the hot end is sold out
+            ticket.booked_seats += ticket_count
+            event.booked_seats += ticket_count
+            transaction_id = f'seed-{uuid.UUID(int=rng.getrandbits(128)).hex}'
+            payments.append(Payment(
+                full_name=f'Buyer {index}',
+                mobile_number=f'07{rng.randint(0, 99999999):08d}',
+                email=f'buyer-{rng.randint(1, count // 3 + 1)}@{SEED_DOMAIN}',
+                ticket_count=ticket_count,
+                amount=max(ticket.price * ticket_count, Decimal('1.00')),
+                ticket=ticket,
+                transaction_id=transaction_id,
+            ))
+            days.setdefault(rng.randint(0, 59), []).append(transaction_id)
+        return payments, days
+
+    def _write(self, model, rows, *, key) -> None:
+        """Bulk insert ``rows`` and set their pks, found again by the unique ``key`` fields."""
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            model.objects.bulk_create(batch)
+            # MySQL does not return ids from bulk inserts
+            found = model.all_objects.filter(**{f'{key[0]}__in': {getattr(row, key[0]) for row in batch}})
+            pks = {tuple(values[:-1]): values[-1] for values in found.values_list(*key, 'pk')}
+            for row in batch:
+                row.pk = pks[tuple(getattr(row, field) for field in key)]
+
+    def _write_payments(self, payments, days) -> None:
+        Payment.objects.bulk_create(payments, batch_size=self.batch_size)
+        # created_at is set on insert; spread the sales over the last 60 days
+        now = timezone.now()
+        for days_ago, transaction_ids in sorted(days.items()):
+            created_at = datetime.combine(now.date() - timedelta(days=days_ago), now.timetz())
+            for start in range(0, len(transaction_ids), self.batch_size):
+                Payment.all_objects.filter(transaction_id__in=transaction_ids[start:start + self.batch_size]).update(
+                    created_at=created_at,
+                )
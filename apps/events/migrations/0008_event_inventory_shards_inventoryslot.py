@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_alter_event_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='inventory_shards',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='InventorySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('booked', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_slots', to='events.event')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_slots', to='events.ticket')),
+            ],
+            options={
+                'db_table': 'inventory_slots',
+                'unique_together': {('ticket', 'slot')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    # FULLTEXT indexes are MySQL-specific; other databases fall back to
+    # the in-process token index (see apps.events.search).
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE events ADD FULLTEXT INDEX events_search_ft (title, location, email)'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE events DROP INDEX events_search_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_sales_rollups(apps, schema_editor):
+    Payment = apps.get_model('events', 'Payment')
+    payments = Payment.objects.filter(is_deleted=False).order_by()
+    totals = {'registrations': Count('id'), 'tickets_sold': Sum('ticket_count'), 'revenue': Sum('amount')}
+
+    # model name -> {rollup field: grouping expression on Payment}
+    rollups = {
+        'EventSalesRollup': {'event_id': 'ticket__event'},
+        'TicketSalesRollup': {'ticket_id': 'ticket'},
+        'DailySalesRollup': {'event_id': 'ticket__event', 'day': 'day'},
+    }
+    for model_name, keys in rollups.items():
+        model = apps.get_model('events', model_name)
+        rows = payments.annotate(day=TruncDate('created_at')).values(*keys.values()).annotate(**totals)
+        model.objects.bulk_create(
+            (
+                model(**{field: row[source] for field, source in keys.items()}, **{name: row[name] for name in totals})
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_search_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSalesRollup',
+            fields=[
+                ('registrations', models.IntegerField(default=0)),
+                ('tickets_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales_rollup', serialize=False, to='events.event')),
+            ],
+            options={
+                'db_table': 'event_sales_rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketSalesRollup',
+            fields=[
+                ('registrations', models.IntegerField(default=0)),
+                ('tickets_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales_rollup', serialize=False, to='events.ticket')),
+            ],
+            options={
+                'db_table': 'ticket_sales_rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('registrations', models.IntegerField(default=0)),
+                ('tickets_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('day', models.DateField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales_rollups', to='events.event')),
+            ],
+            options={
+                'db_table': 'daily_sales_rollups',
+                'unique_together': {('event', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_sales_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='import_ref',
+            field=models.CharField(blank=True, editable=False, max_length=48, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['import_ref'], name='events_import_ref_idx'),
+        ),
+    ]
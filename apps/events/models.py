@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from apps.core.images import validate_image_upload
 from apps.core.models import BaseModel
 
 class Category(BaseModel):
@@ -7,7 +8,8 @@ class Category(BaseModel):
     Category model for grouping events.
     """
     category_name = models.CharField(max_length=100, unique=True)
-    image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    image = models.ImageField(upload_to='categories/', blank=True, null=True, validators=[validate_image_upload])
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         db_table = 'categories'
@@ -34,7 +36,8 @@ class Event(BaseModel):
     start_time = models.TimeField()
     end_time = models.TimeField()
     location = models.CharField(max_length=255)
-    image = models.ImageField(upload_to='events/', blank=True, null=True)
+    image = models.ImageField(upload_to='events/', blank=True, null=True, validators=[validate_image_upload])
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)  # see apps.core.images
     is_free = models.BooleanField(default=False)
     mobile_number = models.CharField(max_length=20)
     email = models.EmailField()
@@ -43,14 +46,35 @@ class Event(BaseModel):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     total_seats = models.PositiveIntegerField(default=0)
     booked_seats = models.PositiveIntegerField(default=0)
+    inventory_shards = models.PositiveSmallIntegerField(default=0)  # 0 = single-row counters
     auth_id = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='events')
+    import_ref = models.CharField(max_length=48, blank=True, null=True, editable=False)  # set by events_import
+
+    soft_delete_cascade = ('tickets',)
 
     class Meta:
         db_table = 'events'
+        # The soft-delete manager adds is_deleted=False to every query, so it
+        # leads the composite keys (MySQL has no partial indexes).
+        indexes = [
+            models.Index(fields=['is_deleted', 'status', 'event_date'], name='events_status_date_idx'),
+            models.Index(fields=['is_deleted', 'event_date'], name='events_date_idx'),
+            models.Index(fields=['is_deleted', 'created_at'], name='events_created_idx'),
+            models.Index(fields=['category', 'is_deleted', 'event_date'], name='events_category_date_idx'),
+            models.Index(fields=['auth_id', 'is_deleted', 'created_at'], name='events_owner_created_idx'),
+            models.Index(fields=['import_ref'], name='events_import_ref_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def booked_seats_total(self):
+        """Booked seats including bookings still held in inventory slots."""
+        if not self.inventory_shards:
+            return self.booked_seats
+        return self.booked_seats + sum(slot.booked for slot in self.inventory_slots.all())
+
 class Ticket(BaseModel):
     """
     Ticket model as specified.
@@ -64,10 +88,45 @@ class Ticket(BaseModel):
 
     class Meta:
         db_table = 'tickets'
+        indexes = [
+            models.Index(fields=['event', 'is_deleted'], name='tickets_event_live_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.event.title}"
 
+    @property
+    def booked_seats_total(self):
+        """Booked seats including bookings still held in inventory slots."""
+        # Only sharded events have slots, so the event row is only worth
+        # checking when it is already loaded: otherwise the slots (usually
+        # prefetched) answer on their own.
+        if Ticket.event.is_cached(self) and not self.event.inventory_shards:
+            return self.booked_seats
+        return self.booked_seats + sum(slot.booked for slot in self.inventory_slots.all())
+
+class InventorySlot(models.Model):
+    """
+    One counter slot of a sharded ticket inventory.
+
+    When ``Event.inventory_shards`` is set, each ticket's remaining capacity
+    is pre-allocated across that many slots and buyers claim seats from a
+    random slot, so concurrent bookings no longer contend on the event row.
+    Slot bookings are folded back into ``booked_seats`` on rebalance.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='inventory_slots')
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name='inventory_slots')
+    slot = models.PositiveSmallIntegerField()
+    capacity = models.PositiveIntegerField(default=0)
+    booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'inventory_slots'
+        unique_together = [('ticket', 'slot')]
+
+    def __str__(self):
+        return f"Slot {self.slot} of ticket {self.ticket_id} ({self.booked}/{self.capacity})"
+
 class Payment(BaseModel):
     """
     Payment model as specified.
@@ -82,6 +141,51 @@ class Payment(BaseModel):
 
     class Meta:
         db_table = 'payments'
+        indexes = [
+            models.Index(fields=['email'], name='payments_email_idx'),
+            models.Index(fields=['is_deleted', 'created_at'], name='payments_created_idx'),
+            models.Index(fields=['ticket', 'is_deleted', 'created_at'], name='payments_ticket_created_idx'),
+        ]
 
     def __str__(self):
         return f"Payment {self.transaction_id} by {self.full_name}"
+
+    def save(self, *args, **kwargs):
+        # The sales rollup receivers lock the stored row and write the
+        # totals: keep them in the transaction of the write
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+class SalesRollup(models.Model):
+    """
+    Running totals of non-deleted payments, kept up to date by the Payment
+    signal receivers in the transaction that writes the payment and
+    rebuilt by the ``rebuild_sales_rollups`` command (needed after
+    ``bulk_create()`` or ``update()`` on payments, which send no signals).
+    """
+    registrations = models.IntegerField(default=0)
+    tickets_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+class EventSalesRollup(SalesRollup):
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='sales_rollup')
+
+    class Meta:
+        db_table = 'event_sales_rollups'
+
+class TicketSalesRollup(SalesRollup):
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, primary_key=True, related_name='sales_rollup')
+
+    class Meta:
+        db_table = 'ticket_sales_rollups'
+
+class DailySalesRollup(SalesRollup):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='daily_sales_rollups')
+    day = models.DateField()
+
+    class Meta:
+        db_table = 'daily_sales_rollups'
+        unique_together = [('event', 'day')]
@@ -0,0 +1,210 @@
+"""
+Pluggable full-text search for events.
+
+``EventSearchFilter`` replaces DRF's ``SearchFilter`` (which issues
+``LIKE '%term%'`` per field) with a ranked, prefix-matching search engine
+chosen by ``settings.EVENT_SEARCH_BACKEND``:
+
+- ``mysql``: ``MATCH ... AGAINST`` on the ``events_search_ft`` FULLTEXT index.
+- ``memory``: an in-process inverted index kept in sync by signals. Each
+  worker holds its own copy and misses the others' writes, so it is only
+  for single-process setups (development, benchmarks) and must be chosen
+  explicitly.
+- ``like``: the original ``SearchFilter`` behaviour.
+- ``auto`` (default): ``mysql`` on MySQL, ``like`` elsewhere.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Event
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Fields indexed for search and how much a match in each counts
+SEARCH_FIELD_WEIGHTS = {'title': 3.0, 'location': 2.0, 'email': 1.0}
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class MySQLFullTextBackend:
+    """Ranked boolean-mode search on the FULLTEXT index from migration 0010."""
+
+    def search(self, queryset, terms):
+        tokens = [token for term in terms for token in tokenize(term)]
+        if not tokens:
+            return queryset.none()
+        # Every token is required and prefix-matched: "+rock* +fest*"
+        against = ' '.join(f'+{token}*' for token in tokens)
+        table = Event._meta.db_table
+        columns = ', '.join(f'{table}.{field}' for field in SEARCH_FIELD_WEIGHTS)
+        rank = RawSQL(f'MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)', [against])
+        return queryset.annotate(search_rank=rank).filter(search_rank__gt=0).order_by('-search_rank', 'id')
+
+
+class TokenIndexBackend:
+    """
+    In-process inverted index over the non-deleted events.
+
+    Built lazily on the first search and updated by the post_save and
+    post_delete signals of ``Event``. Each process holds its own copy, and
+    writes through ``QuerySet.update()`` bypass the signals, so call
+    ``reset()`` after such bulk changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._built = False
+            self._postings = {}   # token -> {event_id: weight}
+            self._documents = {}  # event_id -> set of tokens
+            self._sorted_tokens = []
+            self._dirty = False
+
+    def build(self):
+        with self._lock:
+            self.reset()
+            rows = Event.objects.values_list('id', *SEARCH_FIELD_WEIGHTS).iterator(chunk_size=2000)
+            for event_id, *values in rows:
+                self._add(event_id, dict(zip(SEARCH_FIELD_WEIGHTS, values)))
+            self._built = True
+
+    def update(self, event: Event):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(event.id)
+            if not event.is_deleted:
+                self._add(event.id, {field: getattr(event, field) for field in SEARCH_FIELD_WEIGHTS})
+
+    def remove(self, event_id):
+        with self._lock:
+            if self._built:
+                self._remove(event_id)
+
+    def search(self, queryset, terms):
+        tokens = [token for term in terms for token in tokenize(term)]
+        if not tokens:
+            return queryset.none()
+        scores = self.scores(tokens)
+        if not scores:
+            return queryset.none()
+        # Every match is returned so counts and pages are exact, but only the
+        # best EVENT_SEARCH_MAX_RESULTS are ordered by relevance; the rest
+        # follow by id. Ids come from the index, so they are safe to inline:
+        # literal IN and CASE lists are far cheaper to compile than one
+        # parameter or When() per result.
+        ranked = heapq.nsmallest(
+            settings.EVENT_SEARCH_MAX_RESULTS, scores, key=lambda event_id: (-scores[event_id], event_id)
+        )
+        table = Event._meta.db_table
+        matched = RawSQL(
+            f'{table}.id IN ({", ".join(str(int(event_id)) for event_id in scores)})', [],
+            output_field=BooleanField(),
+        )
+        whens = ' '.join(f'WHEN {int(event_id)} THEN {position}' for position, event_id in enumerate(ranked))
+        rank = RawSQL(f'CASE {table}.id {whens} ELSE {len(ranked)} END', [])
+        return queryset.filter(matched).annotate(search_rank=rank).order_by('search_rank', 'id')
+
+    def scores(self, tokens) -> dict:
+        """Map the id of every event matching all ``tokens`` as prefixes to its relevance."""
+        with self._lock:
+            if not self._built:
+                self.build()
+            if self._dirty:
+                self._sorted_tokens = sorted(self._postings)
+                self._dirty = False
+
+            total = max(len(self._documents), 1)
+            scores = None
+            for token in tokens:
+                term_scores = {}
+                for indexed in self._prefix_matches(token):
+                    postings = self._postings[indexed]
+                    idf = math.log(1 + total / len(postings))
+                    # Whole-word matches outrank prefix matches
+                    boost = idf if indexed == token else idf * 0.5
+                    for event_id, weight in postings.items():
+                        term_scores[event_id] = max(term_scores.get(event_id, 0), weight * boost)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        event_id: score + term_scores[event_id]
+                        for event_id, score in scores.items() if event_id in term_scores
+                    }
+                if not scores:
+                    return {}
+        return scores
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for indexed in self._sorted_tokens[start:]:
+            if not indexed.startswith(prefix):
+                break
+            yield indexed
+
+    def _add(self, event_id, values):
+        weights = {}
+        for field, text in values.items():
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0) + SEARCH_FIELD_WEIGHTS[field]
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._postings[token] = {}
+                self._dirty = True
+            self._postings[token][event_id] = weight
+        self._documents[event_id] = set(weights)
+
+    def _remove(self, event_id):
+        for token in self._documents.pop(event_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(event_id, None)
+            if not postings:
+                del self._postings[token]
+                self._dirty = True
+
+
+token_index = TokenIndexBackend()
+
+SEARCH_BACKENDS = {
+    'mysql': MySQLFullTextBackend(),
+    'memory': token_index,
+    'like': None,
+}
+
+
+def get_search_backend():
+    name = settings.EVENT_SEARCH_BACKEND
+    if name == 'auto':
+        name = 'mysql' if connection.vendor == 'mysql' else 'like'
+    return SEARCH_BACKENDS[name]
+
+
+class EventSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the configured search engine. Results come back
+    ranked by relevance unless an explicit ``?ordering=`` is given.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        backend = get_search_backend()
+        terms = self.get_search_terms(request)
+        if backend is None or not terms:
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, terms)
@@ -1,4 +1,21 @@
-from .models import Event, Payment
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, F, Prefetch, QuerySet, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from apps.core.streaming import keyset_chunks
+from .models import (
+    Event, Ticket, Payment,
+    EventSalesRollup, TicketSalesRollup, DailySalesRollup,
+)
+
+# EventSerializer fields backed by a forward FK, loaded with a JOIN
+EVENT_SELECT_RELATED = {
+    'category_name': 'category',
+    'organizer_name': 'auth_id',
+}
 
 def event_list_approved() -> QuerySet:
     return Event.objects.filter(status='approved', is_deleted=False)
@@ -9,13 +26,186 @@ def event_list_by_organizer(organizer) -> QuerySet:
 def event_list_pending() -> QuerySet:
     return Event.objects.filter(status='pending', is_deleted=False)
 
+# Columns of an event export; the file can be fed back to the importer
+EVENT_EXPORT_FIELDS = [
+    'id', 'title', 'category', 'category_name', 'event_date', 'start_time',
+    'end_time', 'location', 'is_free', 'total_seats', 'mobile_number', 'email',
+    'description', 'agenda', 'status', 'tickets', 'created_at',
+]
+EVENT_EXPORT_TICKET_FIELDS = ['name', 'price', 'total_seats']
+
+def event_export_rows(queryset: QuerySet, *, chunk_size: int = 2000):
+    """
+    Yield export dicts for ``queryset`` in id order. Events are read in
+    keyset chunks of ``chunk_size`` with one extra query per chunk for
+    their tickets, so memory stays flat however many events there are.
+    """
+    columns = [field for field in EVENT_EXPORT_FIELDS if field not in ('category_name', 'tickets')]
+    queryset = queryset.prefetch_related(None).values(*columns, category_name=F('category__category_name'))
+    for chunk in keyset_chunks(queryset, chunk_size=chunk_size):
+        tickets = defaultdict(list)
+        rows = Ticket.objects.filter(event_id__in=[row['id'] for row in chunk]).order_by('id')
+        for ticket in rows.values('event_id', *EVENT_EXPORT_TICKET_FIELDS):
+            tickets[ticket.pop('event_id')].append(ticket)
+        for row in chunk:
+            row['tickets'] = tickets[row['id']]
+            yield row
+
+def event_list_optimized(queryset: QuerySet, *, fields) -> QuerySet:
+    """
+    Attach the select_related/prefetch_related calls needed to serialize
+    ``fields`` of each event, so a page costs the same number of queries
+    whatever its size.
+    """
+    fields = set(fields)
+    related = [relation for field, relation in EVENT_SELECT_RELATED.items() if field in fields]
+    if related:
+        queryset = queryset.select_related(*related)
+    if 'tickets' in fields:
+        # Ticket.objects hides soft-deleted tickets
+        tickets = ticket_list_optimized(Ticket.objects.all())
+        queryset = queryset.prefetch_related(Prefetch('tickets', queryset=tickets))
+    if 'booked_seats' in fields:
+        queryset = queryset.prefetch_related('inventory_slots')
+    return queryset
+
+def ticket_list_optimized(queryset: QuerySet) -> QuerySet:
+    """Load what ``Ticket.booked_seats_total`` reads without touching the event rows."""
+    return queryset.prefetch_related('inventory_slots')
+
+def payment_list_values(queryset: QuerySet) -> QuerySet:
+    """
+    Flat projection of a payment listing: one joined query returning plain
+    dicts with the event and ticket columns PaymentSerializer would
+    otherwise fetch lazily per row.
+    """
+    return queryset.values(
+        'id', 'full_name', 'mobile_number', 'email', 'ticket_count', 'amount',
+        'ticket', 'transaction_id', 'created_at',
+        event_title=F('ticket__event__title'),
+        event_date=F('ticket__event__event_date'),
+        location=F('ticket__event__location'),
+        ticket_name=F('ticket__name'),
+    )
+
+PAYMENT_EXPORT_FIELDS = [
+    'id', 'transaction_id', 'created_at', 'full_name', 'email', 'mobile_number',
+    'ticket_count', 'amount', 'ticket', 'ticket_name', 'event_id', 'event_title',
+    'event_date', 'location',
+]
+
+def payment_list_filter(queryset: QuerySet, *, date_from=None, date_to=None, event_id=None, organizer_id=None) -> QuerySet:
+    """
+    Narrow payments to a creation date range (inclusive, in the current
+    time zone), an event and/or an organizer. Dates become datetime bounds
+    so the ``created_at`` indexes stay usable.
+    """
+    if date_from:
+        queryset = queryset.filter(created_at__gte=_start_of_day(date_from))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=_start_of_day(date_to + timedelta(days=1)))
+    if event_id:
+        queryset = queryset.filter(ticket__event_id=event_id)
+    if organizer_id:
+        queryset = queryset.filter(ticket__event__auth_id=organizer_id)
+    return queryset
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def payment_export_rows(queryset: QuerySet, *, chunk_size: int = 5000):
+    """Yield flat payment dicts for ``queryset`` in id order, ``chunk_size`` rows per query."""
+    rows = payment_list_values(queryset.select_related(None)).annotate(event_id=F('ticket__event_id'))
+    for chunk in keyset_chunks(rows, chunk_size=chunk_size):
+        yield from chunk
+
 def event_get_stats(event: Event) -> dict:
-    payments = Payment.objects.filter(ticket__event=event)
+    """Registration totals for ``event``, read from its sales rollup row."""
+    rollup = EventSalesRollup.objects.filter(event=event).first() or EventSalesRollup()
     return {
-        'total_registrations': payments.count(),
-        'confirmed_registrations': payments.count(), # Assuming all payments are confirmed for now
+        'total_registrations': rollup.registrations,
+        'confirmed_registrations': rollup.registrations, # Assuming all payments are confirmed for now
         'pending_registrations': 0,
         'cancelled_registrations': 0,
-        'total_tickets_sold': sum(p.ticket_count for p in payments),
-        'total_revenue': sum(p.amount for p in payments),
+        'total_tickets_sold': rollup.tickets_sold,
+        'total_revenue': rollup.revenue,
+    }
+
+def payment_get_summary(*, organizer=None, event_id=None, ticket_id=None) -> dict:
+    """
+    Revenue and transaction count from the sales rollups: one row for a
+    ticket or an event, otherwise one SUM over the per-event rows.
+    ``organizer`` limits the totals to that user's events.
+    """
+    if ticket_id is not None:
+        rollups = TicketSalesRollup.objects.filter(ticket_id=ticket_id)
+        owner = 'ticket__event__auth_id'
+        if event_id is not None:
+            rollups = rollups.filter(ticket__event_id=event_id)
+    else:
+        rollups = EventSalesRollup.objects.all()
+        owner = 'event__auth_id'
+        if event_id is not None:
+            rollups = rollups.filter(event_id=event_id)
+    if organizer is not None:
+        rollups = rollups.filter(**{owner: organizer})
+    totals = rollups.aggregate(total_revenue=Sum('revenue'), total_transactions=Sum('registrations'))
+    return {
+        'total_revenue': totals['total_revenue'] or 0,
+        'total_transactions': totals['total_transactions'] or 0,
+    }
+
+def payment_get_summary_raw(queryset: QuerySet) -> dict:
+    """Same totals aggregated straight from a (filtered) payment queryset."""
+    totals = queryset.aggregate(total_revenue=Sum('amount'), total_transactions=Count('id'))
+    return {
+        'total_revenue': totals['total_revenue'] or 0,
+        'total_transactions': totals['total_transactions'] or 0,
+    }
+
+def sales_totals_raw(*, event_id) -> dict:
+    """Aggregate one event's payments per event, ticket and day, straight from the payments table."""
+    payments = Payment.objects.filter(ticket__event_id=event_id).order_by()
+    totals = {'registrations': Count('id'), 'tickets_sold': Sum('ticket_count'), 'revenue': Sum('amount')}
+
+    def rows(group, key):
+        return {row.pop(key): {**row, 'revenue': _cents(row['revenue'])} for row in group.annotate(**totals)}
+
+    event = payments.aggregate(**totals)
+    return {
+        'event': {
+            'registrations': event['registrations'],
+            'tickets_sold': event['tickets_sold'] or 0,
+            'revenue': _cents(event['revenue']),
+        },
+        'tickets': rows(payments.values('ticket_id'), 'ticket_id'),
+        'days': rows(payments.annotate(day=TruncDate('created_at')).values('day'), 'day'),
+    }
+
+def _cents(value) -> Decimal:
+    # SQLite sums decimals as floats: 80367.49 can come back as 80367.4900000001
+    return Decimal(value or 0).quantize(Decimal('0.01'))
+
+def sales_rollups_diff(*, event_id) -> list:
+    """Describe every rollup row of ``event_id`` that disagrees with the payments table."""
+    expected = sales_totals_raw(event_id=event_id)
+    fields = ('registrations', 'tickets_sold', 'revenue')
+
+    def values(rows, key):
+        return {row.pop(key): row for row in rows.values(key, *fields)}
+
+    actual = {
+        'event': values(EventSalesRollup.objects.filter(event_id=event_id), 'event_id').get(event_id),
+        'tickets': values(TicketSalesRollup.objects.filter(ticket__event_id=event_id), 'ticket_id'),
+        'days': values(DailySalesRollup.objects.filter(event_id=event_id), 'day'),
     }
+    empty = dict.fromkeys(fields, 0)
+    problems = []
+    if (actual['event'] or empty) != expected['event']:
+        problems.append(f'event {event_id}: rollup {actual["event"]} != payments {expected["event"]}')
+    for scope in ('tickets', 'days'):
+        for key in sorted(set(expected[scope]) | set(actual[scope]), key=str):
+            found, wanted = actual[scope].get(key, empty), expected[scope].get(key, empty)
+            if found != wanted:
+                problems.append(f'event {event_id} {scope[:-1]} {key}: rollup {found} != payments {wanted}')
+    return problems
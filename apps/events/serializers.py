@@ -1,11 +1,39 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Category, Event, Ticket, Payment
 from apps.accounts.serializers import UserSerializer
+from apps.core.images import renditions_current
+
+class ImageRenditionsField(serializers.Field):
+    """
+    URLs and sizes of the resized WebP copies of ``image``, keyed by
+    rendition name; null until the background task has built them.
+    """
+    def __init__(self, **kwargs):
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        renditions = renditions_current(instance)
+        if not renditions:
+            return None
+        request = self.context.get('request')
+        data = {}
+        for name, rendition in renditions.items():
+            url = default_storage.url(rendition['name'])
+            data[name] = {
+                'url': request.build_absolute_uri(url) if request else url,
+                'width': rendition['width'],
+                'height': rendition['height'],
+            }
+        return data
 
 class CategorySerializer(serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
+
     class Meta:
         model = Category
-        fields = ['id', 'category_name', 'image']
+        fields = ['id', 'category_name', 'image', 'image_renditions']
 
 class TicketSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,19 +49,36 @@ class TicketSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Booked seats cannot exceed total seats.")
         return data
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Sharded inventories keep part of the count in inventory slots
+        data['booked_seats'] = instance.booked_seats_total
+        return data
+
+class EventTicketSerializer(TicketSerializer):
+    """
+    A ticket nested in an event payload. ``id`` is writable so updates can
+    address existing tickets; sold counts are managed by bookings only.
+    """
+    id = serializers.IntegerField(required=False)
+
+    class Meta(TicketSerializer.Meta):
+        read_only_fields = ['event', 'booked_seats']
+
 from django.db import transaction
 import json
 
 class EventSerializer(serializers.ModelSerializer):
     category_name = serializers.ReadOnlyField(source='category.category_name')
     organizer_name = serializers.ReadOnlyField(source='auth_id.full_name')
-    tickets = TicketSerializer(many=True, required=False)
+    tickets = EventTicketSerializer(many=True, required=False)
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'category', 'category_name', 'event_date', 
-            'start_time', 'end_time', 'location', 'image', 'is_free', 
+            'start_time', 'end_time', 'location', 'image', 'image_renditions', 'is_free', 
             'total_seats', 'booked_seats', 'mobile_number', 'email', 
             'description', 'agenda', 'status', 'auth_id', 
             'organizer_name', 'tickets', 'created_at', 'updated_at'
@@ -59,11 +104,18 @@ class EventSerializer(serializers.ModelSerializer):
         
         return super().to_internal_value(data)
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Sharded inventories keep part of the count in inventory slots
+        data['booked_seats'] = instance.booked_seats_total
+        return data
+
     def create(self, validated_data):
         tickets_data = validated_data.pop('tickets', [])
         with transaction.atomic():
             event = Event.objects.create(**validated_data)
             for ticket_data in tickets_data:
+                ticket_data.pop('id', None)  # new event: every ticket is new
                 Ticket.objects.create(event=event, **ticket_data)
             return event
 
@@ -77,12 +129,9 @@ class EventSerializer(serializers.ModelSerializer):
             instance.save()
 
             if tickets_data is not None:
-                # Optimized ticket update: Re-create only if needed, 
-                # but simple approach for now is atomic delete/create
-                instance.tickets.all().delete()
-                for ticket_data in tickets_data:
-                    Ticket.objects.create(event=instance, **ticket_data)
-            
+                from .services import event_tickets_sync  # services imports this module
+                event_tickets_sync(event=instance, tickets_data=tickets_data)
+
             return instance
 
     def validate(self, data):
@@ -126,3 +175,78 @@ class PaymentSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Amount must be greater than zero.")
         return value
+
+class PaymentListSerializer(serializers.Serializer):
+    """
+    Read-only serializer for rows from ``selectors.payment_list_values``.
+    Produces the same shape as PaymentSerializer without model instances.
+    """
+    id = serializers.IntegerField()
+    full_name = serializers.CharField()
+    mobile_number = serializers.CharField()
+    email = serializers.EmailField()
+    ticket_count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    ticket = serializers.IntegerField()
+    transaction_id = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    event_title = serializers.CharField()
+    event_date = serializers.DateField()
+    location = serializers.CharField()
+    ticket_name = serializers.CharField()
+
+class CachedCategoryField(serializers.PrimaryKeyRelatedField):
+    """Resolve category ids from ``context['categories']`` instead of one query per row."""
+
+    def to_internal_value(self, data):
+        categories = self.context.get('categories')
+        if categories is None:
+            return super().to_internal_value(data)
+        try:
+            return categories[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+class EventImportSerializer(EventSerializer):
+    """
+    Validates one imported event. Files cannot travel in CSV/NDJSON, so
+    ``image`` is dropped; sold counts are not imported and the status is
+    set by the importer.
+    """
+    category = CachedCategoryField(queryset=Category.objects.all())
+    tickets = TicketSerializer(many=True, required=False)
+
+    class Meta(EventSerializer.Meta):
+        fields = [field for field in EventSerializer.Meta.fields if field not in ('image', 'image_renditions')]
+        read_only_fields = EventSerializer.Meta.read_only_fields + ['status']
+
+    def to_internal_value(self, data):
+        data = dict(data)
+        tickets = data.get('tickets')
+        if isinstance(tickets, str):
+            try:
+                tickets = data['tickets'] = json.loads(tickets)
+            except json.JSONDecodeError:
+                pass
+        if isinstance(tickets, list):
+            data['tickets'] = [
+                {key: value for key, value in ticket.items() if key != 'booked_seats'}
+                if isinstance(ticket, dict) else ticket
+                for ticket in tickets
+            ]
+        return super().to_internal_value(data)
+
+class PaymentExportParamsSerializer(serializers.Serializer):
+    """Query parameters of the payments export."""
+    file_format = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    event = serializers.IntegerField(required=False, min_value=1)
+    organizer = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError("date_from must be on or before date_to.")
+        return data
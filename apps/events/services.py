@@ -1,26 +1,177 @@
-from django.db import transaction
+import contextvars
+import random
+import time
+import uuid
+
+from django.db import connection, transaction, DatabaseError, IntegrityError, OperationalError
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.lookups import LessThanOrEqual
 from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
-from .models import Event, Ticket, Payment, EventAgenda, TicketBenefit
+from django.utils import timezone
+from apps.core import metrics
+from apps.core.cache import invalidate_on_commit
+from apps.tasks.services import enqueue_on_commit
+from .models import (
+    Category, Event, Ticket, Payment, InventorySlot,
+    EventSalesRollup, TicketSalesRollup, DailySalesRollup,
+)
+from . import selectors, tasks
+from .search import token_index
+from .serializers import EventImportSerializer
+from .signals import event_cache_namespaces
+
+# Bounded retry for bookings that lose a lock race (deadlock, lock wait
+# timeout, SQLite "database is locked"). Backoff doubles per attempt.
+BOOKING_MAX_ATTEMPTS = 5
+BOOKING_RETRY_BACKOFF = 0.02
+
+BOOKINGS = metrics.Counter('eventhub_bookings_total', 'Booking attempts by result.', ['result'])
+BOOKING_REJECTIONS = metrics.Counter(
+    'eventhub_booking_rejections_total', 'Bookings refused for lack of seats (oversell guard).', ['reason'],
+)
+BOOKING_RETRIES = metrics.Counter('eventhub_booking_retries_total', 'Booking attempts retried after lock contention.')
+BOOKING_SECONDS = metrics.Histogram('eventhub_booking_seconds', 'Time to book seats, retries included.')
+
+# Events whose inventory the running booking has already rebalanced
+_BOOKING_REBALANCED = contextvars.ContextVar('booking_rebalanced', default=None)
+
+SOLD_OUT_MESSAGES = {
+    'event_sold_out': "Not enough seats available for this event.",
+    'ticket_sold_out': "Not enough slots available for this ticket type.",
+}
+
+# Bulk import: rows written per transaction, and per-row errors reported
+EVENT_IMPORT_BATCH_SIZE = 500
+EVENT_IMPORT_MAX_ERRORS = 1000
+
+# Fields a ticket added through event_tickets_sync must have
+TICKET_REQUIRED_FIELDS = ('name', 'price', 'total_seats')
+
+# Events moved to 'expired' per UPDATE by the expiry sweeper
+EVENT_EXPIRE_CHUNK_SIZE = 1000
 
 @transaction.atomic
 def event_create(*, organizer, **data) -> Event:
-    agenda_data = data.pop('agenda_items', [])
     tickets_data = data.pop('tickets', [])
     
-    event = Event.objects.create(organizer=organizer, status='pending', **data)
-    
-    for item in agenda_data:
-        EventAgenda.objects.create(event=event, **item)
+    event = Event.objects.create(auth_id=organizer, status='pending', **data)
         
     for ticket_data in tickets_data:
-        benefits_data = ticket_data.pop('benefits', [])
-        ticket = Ticket.objects.create(event=event, **ticket_data)
-        for benefit in benefits_data:
-            TicketBenefit.objects.create(ticket=ticket, **benefit)
+        Ticket.objects.create(event=event, **ticket_data)
             
     return event
 
+def events_import(*, organizer, records, batch_size: int = EVENT_IMPORT_BATCH_SIZE, status: str = 'pending') -> dict:
+    """
+    Create events from ``records``, the ``(line, record, error)`` tuples of
+    ``apps.core.streaming.read_records``. Rows are validated and written
+    ``batch_size`` at a time, each batch in its own transaction, so a bad
+    row is reported without aborting the rest of the import.
+    """
+    report = {'created': 0, 'failed': 0, 'errors': []}
+    batch = []
+    for line, record, error in records:
+        if error is not None:
+            _import_error(report, line, error)
+            continue
+        batch.append((line, record))
+        if len(batch) >= batch_size:
+            _events_import_batch(
+                organizer=organizer, rows=_events_import_validate(batch, report), status=status, report=report,
+            )
+            batch = []
+    if batch:
+        _events_import_batch(
+            organizer=organizer, rows=_events_import_validate(batch, report), status=status, report=report,
+        )
+    return report
+
+def _events_import_validate(rows, report) -> list:
+    """
+    Validate a batch of ``(line, record)``: one category lookup and one
+    serializer for the whole batch (building a serializer per row cost
+    more than validating it). Failing rows are reported with the errors
+    the serializer gives them.
+    """
+    category_ids = set()
+    for _, record in rows:
+        try:
+            category_ids.add(int(record.get('category')))
+        except (TypeError, ValueError):
+            pass
+    validator = EventImportSerializer(context={'categories': Category.objects.in_bulk(category_ids)})
+    valid = []
+    for line, record in rows:
+        try:
+            valid.append((line, validator.run_validation(record)))
+        except ValidationError as exc:
+            _import_error(report, line, exc.detail)
+    return valid
+
+def _import_error(report, line, error) -> None:
+    report['failed'] += 1
+    if len(report['errors']) < EVENT_IMPORT_MAX_ERRORS:
+        report['errors'].append({'line': line, 'errors': error})
+
+def _events_import_batch(*, organizer, rows, status, report) -> None:
+    if not rows:
+        return
+    try:
+        with transaction.atomic():
+            _events_bulk_create(organizer=organizer, rows=[data for _, data in rows], status=status)
+        report['created'] += len(rows)
+        return
+    except DatabaseError as exc:
+        if len(rows) == 1:
+            _import_error(report, rows[0][0], str(exc))
+            return
+    # Something in the batch broke a constraint: retry row by row to find it
+    for line, data in rows:
+        try:
+            with transaction.atomic():
+                _events_bulk_create(organizer=organizer, rows=[data], status=status)
+            report['created'] += 1
+        except DatabaseError as exc:
+            _import_error(report, line, str(exc))
+
+def _events_bulk_create(*, organizer, rows, status) -> list:
+    tickets_data = [data.get('tickets', []) for data in rows]
+    batch_ref = uuid.uuid4().hex
+    events = [
+        Event(
+            auth_id=organizer, status=status, import_ref=f'{batch_ref}:{index}',
+            **{key: value for key, value in data.items() if key != 'tickets'},
+        )
+        for index, data in enumerate(rows)
+    ]
+    Event.objects.bulk_create(events)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # MySQL does not return ids from a multi-row INSERT: read them back
+        # by the import_ref each row was stamped with
+        ids = dict(
+            Event.all_objects.filter(import_ref__in=[event.import_ref for event in events])
+            .values_list('import_ref', 'id')
+        )
+        for event in events:
+            event.pk = ids[event.import_ref]
+
+    # bulk_create skips post_save: do what the Event receivers would
+    invalidate_on_commit('events')
+
+    def index_events():
+        for event in events:
+            token_index.update(event)
+
+    transaction.on_commit(index_events)
+    Ticket.objects.bulk_create(
+        Ticket(event=event, **ticket_data)
+        for event, tickets in zip(events, tickets_data)
+        for ticket_data in tickets
+    )
+    return events
+
 @transaction.atomic
 def event_update(*, event: Event, data) -> Event:
     # Basic logic for now, can be expanded to handle agenda/tickets updates
@@ -31,6 +182,106 @@ def event_update(*, event: Event, data) -> Event:
     event.save()
     return event
 
+@transaction.atomic
+def event_tickets_sync(*, event: Event, tickets_data) -> None:
+    """
+    Make ``event``'s live tickets match ``tickets_data``, keyed on ticket id:
+    entries with an id update that ticket, entries without one are new, and
+    tickets left out are soft-deleted. Runs in a constant number of queries
+    whatever the number of tickets. ``booked_seats`` is never written from
+    the payload, and tickets that have sales cannot be removed. Capacity
+    is checked against seats sold through inventory slots too; the slots
+    are locked so no booking lands in between. Everything is validated
+    before anything is written.
+    """
+    existing = {ticket.id: ticket for ticket in Ticket.objects.select_for_update().filter(event=event)}
+    # Seats claimed from inventory slots and not yet folded into booked_seats
+    held = {}
+    slots = InventorySlot.objects.select_for_update().filter(event=event).values_list('ticket_id', 'booked')
+    for ticket_id, booked in slots:
+        held[ticket_id] = held.get(ticket_id, 0) + booked
+    now = timezone.now()
+    seen, to_create, to_update, changed_fields = set(), [], [], set()
+
+    for data in tickets_data:
+        data = {field: value for field, value in data.items() if field != 'booked_seats'}
+        ticket_id = data.pop('id', None)
+        if ticket_id is None:
+            # PATCH validates the nested tickets partially
+            missing = [field for field in TICKET_REQUIRED_FIELDS if data.get(field) is None]
+            if missing:
+                raise ValidationError({'tickets': f'New tickets need {", ".join(missing)}.'})
+            to_create.append(Ticket(event=event, **data))
+            continue
+        ticket = existing.get(ticket_id)
+        if ticket is None:
+            raise ValidationError({'tickets': f'Ticket {ticket_id} does not belong to this event.'})
+        if ticket_id in seen:
+            raise ValidationError({'tickets': f'Ticket {ticket_id} is listed more than once.'})
+        seen.add(ticket_id)
+
+        changed = [field for field, value in data.items() if getattr(ticket, field) != value]
+        if not changed:
+            continue
+        for field in changed:
+            setattr(ticket, field, data[field])
+        booked = ticket.booked_seats + held.get(ticket.id, 0)
+        if ticket.total_seats < booked:
+            raise ValidationError({'tickets': f'"{ticket.name}" already has {booked} seats booked.'})
+        ticket.updated_at = now
+        changed_fields.update(changed)
+        to_update.append(ticket)
+
+    removed = [ticket_id for ticket_id in existing if ticket_id not in seen]
+    if removed:
+        sold = set(Payment.objects.filter(ticket_id__in=removed).values_list('ticket_id', flat=True).distinct())
+        sold.update(ticket_id for ticket_id in removed if existing[ticket_id].booked_seats or held.get(ticket_id))
+        if sold:
+            names = ', '.join(sorted(existing[ticket_id].name for ticket_id in sold))
+            raise ValidationError({
+                'tickets': f'Tickets with sales cannot be removed: {names}. Set is_deleted_field to stop selling them.'
+            })
+        Ticket.objects.filter(id__in=removed).update(is_deleted=True, updated_at=now)
+    if to_update:
+        Ticket.objects.bulk_update(to_update, [*changed_fields, 'updated_at'])
+    if to_create:
+        Ticket.objects.bulk_create(to_create)
+
+    # Neither update() nor the bulk calls send post_save
+    touched = [ticket.id for ticket in to_update] + removed
+    invalidate_on_commit('tickets', *event_cache_namespaces(event_ids=[event.id], ticket_ids=touched))
+    if event.inventory_shards and (to_create or removed or 'total_seats' in changed_fields):
+        # Re-split the changed capacity across the inventory slots
+        inventory_rebalance(event=event)
+
+def events_expire(*, before=None, chunk_size: int = EVENT_EXPIRE_CHUNK_SIZE) -> int:
+    """
+    Move accepted events dated before ``before`` (default: today) to
+    ``expired``. Candidates are walked in ``(event_date, id)`` order, the
+    order of ``events_status_date_idx``, one keyset chunk per transaction,
+    so no statement scans or locks more than ``chunk_size`` rows. The
+    UPDATE re-checks the status, which makes overlapping or repeated runs
+    harmless. Returns the number of events expired.
+    """
+    before = before or timezone.localdate()
+    candidates = Event.objects.filter(status='accepted', event_date__lt=before).order_by('event_date', 'id')
+    expired, position = 0, None
+    while True:
+        chunk = candidates
+        if position is not None:
+            last_date, last_id = position
+            chunk = chunk.filter(Q(event_date__gt=last_date) | Q(event_date=last_date, id__gt=last_id))
+        rows = list(chunk.values_list('event_date', 'id')[:chunk_size])
+        if not rows:
+            return expired
+        ids = [event_id for _, event_id in rows]
+        with transaction.atomic():
+            expired += Event.objects.filter(id__in=ids, status='accepted').update(
+                status='expired', updated_at=timezone.now()
+            )
+            invalidate_on_commit(*event_cache_namespaces(event_ids=ids))
+        position = rows[-1]
+
 def event_approve(*, event: Event) -> Event:
     event.status = 'accepted'
     event.save(update_fields=['status'])
@@ -41,29 +292,304 @@ def event_reject(*, event: Event) -> Event:
     event.save(update_fields=['status'])
     return event
 
-@transaction.atomic
-def event_registration_create(*, ticket_id, ticket_count=1, **data) -> Payment:
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    event = ticket.event
+def booking_run_with_retry(func, *args, **kwargs):
+    """
+    Run ``func`` in its own transaction, retrying it when the database
+    reports lock contention. Validation errors are never retried.
+    """
+    with BOOKING_SECONDS.time():
+        try:
+            result = _booking_attempts(func, *args, **kwargs)
+        except ValidationError:
+            BOOKINGS.inc(result='rejected')
+            raise
+        except Exception:
+            BOOKINGS.inc(result='failed')
+            raise
+    BOOKINGS.inc(result='confirmed')
+    return result
+
+class _InventoryFragmented(Exception):
+    """A booking found free seats only across several slots; see ``_booking_attempts``."""
+
+    def __init__(self, event_id):
+        super().__init__(event_id)
+        self.event_id = event_id
+
+def _booking_attempts(func, *args, **kwargs):
+    rebalanced = set()
+    context = _BOOKING_REBALANCED.set(rebalanced)
+    try:
+        attempt = 1
+        while True:
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except _InventoryFragmented as exc:
+                # Rebalancing locks every slot of the event: do it once the
+                # booking has rolled back and released its own slot locks,
+                # in a transaction of its own, then book again
+                inventory_rebalance(event=Event(id=exc.event_id))
+                rebalanced.add(exc.event_id)
+            except OperationalError:
+                # Inside an outer transaction the failed statement has already
+                # poisoned it, so only the outermost caller may retry.
+                if attempt == BOOKING_MAX_ATTEMPTS or transaction.get_connection().in_atomic_block:
+                    raise
+                BOOKING_RETRIES.inc()
+                time.sleep(BOOKING_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+                attempt += 1
+    finally:
+        _BOOKING_REBALANCED.reset(context)
 
+def seats_reserve(*, ticket_id, ticket_count: int = 1) -> Ticket:
+    """
+    Claim ``ticket_count`` seats on a ticket and its event.
+
+    Capacity is checked inside conditional ``UPDATE ... SET booked_seats =
+    booked_seats + n`` statements, so concurrent buyers can never oversell
+    and only the counter columns are written. The event row is always
+    updated before the ticket row to keep the lock order consistent.
+    Events in sharded inventory mode claim from an inventory slot instead.
+    Must be run through ``booking_run_with_retry``, which also rebalances
+    slots that are too fragmented to serve the booking.
+    """
+    if ticket_count < 1:
+        BOOKING_REJECTIONS.inc(reason='invalid_count')
+        raise ValidationError("Ticket count must be at least 1.")
+
+    ticket = get_object_or_404(
+        Ticket.objects.select_related('event').only('id', 'event_id', 'event__inventory_shards'),
+        id=ticket_id,
+    )
+    if ticket.event.inventory_shards:
+        _seats_reserve_sharded(ticket=ticket, ticket_count=ticket_count)
+    else:
+        _seats_reserve_counters(ticket=ticket, ticket_count=ticket_count)
+
+    # Counter UPDATEs bypass post_save, so invalidate cached listings here
+    invalidate_on_commit(*event_cache_namespaces(event_ids=[ticket.event_id], ticket_ids=[ticket.id]))
+    return ticket
+
+def _seats_reserve_counters(*, ticket: Ticket, ticket_count: int) -> None:
     # Check for generic event seat availability if applicable
-    if event.total_seats > 0 and (event.booked_seats + ticket_count) > event.total_seats:
-        raise ValidationError("Not enough seats available for this event.")
+    event_updated = Event.objects.filter(
+        Q(total_seats=0) | LessThanOrEqual(F('booked_seats') + ticket_count, F('total_seats')),
+        id=ticket.event_id,
+        inventory_shards=0,
+    ).update(booked_seats=F('booked_seats') + ticket_count)
+    if not event_updated:
+        if Event.objects.filter(id=ticket.event_id, inventory_shards__gt=0).exists():
+            # Sharding was switched on after the ticket was read
+            return _seats_reserve_sharded(ticket=ticket, ticket_count=ticket_count)
+        raise _sold_out('event_sold_out')
 
     # Check for specific ticket seat availability
-    if (ticket.booked_seats + ticket_count) > ticket.total_seats:
-        raise ValidationError("Not enough slots available for this ticket type.")
+    ticket_updated = Ticket.objects.filter(
+        LessThanOrEqual(F('booked_seats') + ticket_count, F('total_seats')),
+        id=ticket.id,
+    ).update(booked_seats=F('booked_seats') + ticket_count)
+    if not ticket_updated:
+        raise _sold_out('ticket_sold_out')
 
-    # Increment booked seats
-    ticket.booked_seats += ticket_count
-    ticket.save()
-    
-    event.booked_seats += ticket_count
-    event.save()
+def _sold_out(reason: str) -> ValidationError:
+    BOOKING_REJECTIONS.inc(reason=reason)
+    return ValidationError(SOLD_OUT_MESSAGES[reason])
 
-    registration = Payment.objects.create(
-        ticket=ticket,
-        ticket_count=ticket_count,
-        **data
+def _slot_claim(*, ticket_id, ticket_count: int) -> tuple:
+    """
+    Try to claim seats from a random slot that appears to have room.
+    Returns ``(claimed, free_seats_seen, slot_count)``.
+    """
+    slots = list(
+        InventorySlot.objects.filter(ticket_id=ticket_id).values_list('id', 'capacity', 'booked')
     )
-    return registration
+    candidates = [slot_id for slot_id, capacity, booked in slots if capacity - booked >= ticket_count]
+    random.shuffle(candidates)
+    for slot_id in candidates:
+        claimed = InventorySlot.objects.filter(
+            LessThanOrEqual(F('booked') + ticket_count, F('capacity')),
+            id=slot_id,
+        ).update(booked=F('booked') + ticket_count)
+        if claimed:
+            return True, 0, len(slots)
+    return False, sum(capacity - booked for _, capacity, booked in slots), len(slots)
+
+def _seats_reserve_sharded(*, ticket: Ticket, ticket_count: int) -> None:
+    claimed, free_seats, slot_count = _slot_claim(ticket_id=ticket.id, ticket_count=ticket_count)
+    if claimed:
+        return
+
+    # Seats are free but fragmented across slots, or the ticket was added
+    # after sharding and has no slots yet: have booking_run_with_retry
+    # rebalance once and run the booking again.
+    rebalanced = _BOOKING_REBALANCED.get()
+    if free_seats >= ticket_count or not slot_count:
+        if rebalanced is not None and ticket.event_id not in rebalanced:
+            raise _InventoryFragmented(ticket.event_id)
+
+    event = Event.objects.get(id=ticket.event_id)
+    if event.total_seats > 0 and event.booked_seats_total + ticket_count > event.total_seats:
+        raise _sold_out('event_sold_out')
+    raise _sold_out('ticket_sold_out')
+
+@transaction.atomic
+def inventory_rebalance(*, event: Event, shards: int = None) -> Event:
+    """
+    Fold slot bookings back into the ``booked_seats`` counters and
+    pre-allocate the remaining capacity evenly across ``shards`` slots per
+    ticket (defaults to the event's current shard count; 0 disables
+    sharding). Run periodically so exhausted slots get refilled.
+    """
+    event = Event.objects.select_for_update().get(id=event.id)
+    tickets = list(Ticket.objects.select_for_update().filter(event=event).order_by('id'))
+    if shards is None:
+        shards = event.inventory_shards
+
+    # Fold slot bookings into the ticket and event counters
+    held = {}
+    slots = InventorySlot.objects.select_for_update().filter(event=event).values_list('ticket_id', 'booked')
+    for ticket_id, booked in slots:
+        held[ticket_id] = held.get(ticket_id, 0) + booked
+    InventorySlot.objects.filter(event=event).delete()
+    for ticket in tickets:
+        ticket.booked_seats += held.get(ticket.id, 0)
+    Ticket.objects.bulk_update(tickets, ['booked_seats'])
+    invalidate_on_commit(*event_cache_namespaces(ticket_ids=[ticket.id for ticket in tickets]))
+    event.booked_seats += sum(held.values())
+    event.inventory_shards = shards
+    event.save(update_fields=['booked_seats', 'inventory_shards'])
+
+    if not shards:
+        return event
+
+    # Pre-allocate the remaining pool, scaled down if the event cap binds
+    remaining = {ticket.id: max(ticket.total_seats - ticket.booked_seats, 0) for ticket in tickets}
+    wanted = sum(remaining.values())
+    if event.total_seats > 0 and wanted > event.total_seats - event.booked_seats:
+        pool = max(event.total_seats - event.booked_seats, 0)
+        allotment = {ticket_id: seats * pool // wanted for ticket_id, seats in remaining.items()}
+        leftover = pool - sum(allotment.values())
+        for ticket_id, seats in remaining.items():
+            if leftover and allotment[ticket_id] < seats:
+                allotment[ticket_id] += 1
+                leftover -= 1
+    else:
+        allotment = remaining
+
+    slots = []
+    for ticket in tickets:
+        base, extra = divmod(allotment[ticket.id], shards)
+        slots.extend(
+            InventorySlot(event=event, ticket=ticket, slot=index, capacity=base + (index < extra))
+            for index in range(shards)
+        )
+    InventorySlot.objects.bulk_create(slots)
+    return event
+
+def _registration_create(*, ticket_id, ticket_count, **data) -> Payment:
+    ticket = seats_reserve(ticket_id=ticket_id, ticket_count=ticket_count)
+    payment = Payment.objects.create(ticket=ticket, ticket_count=ticket_count, **data)
+    enqueue_on_commit(tasks.send_booking_confirmation, payment_id=payment.id)
+    return payment
+
+def event_registration_create(*, ticket_id, ticket_count=1, **data) -> Payment:
+    return booking_run_with_retry(
+        _registration_create, ticket_id=ticket_id, ticket_count=ticket_count, **data
+    )
+
+def sales_rollups_apply(*, payment: Payment, sign: int = 1) -> None:
+    """
+    Add (``sign=1``) or take back (``sign=-1``) one payment in the event,
+    ticket and daily sales rollups. The Payment receivers call it in the
+    transaction that writes the payment, so the totals commit or roll back
+    with it.
+    """
+    deltas = {
+        'registrations': sign,
+        'tickets_sold': sign * payment.ticket_count,
+        'revenue': sign * payment.amount,
+    }
+    event_id = payment.ticket.event_id
+    # Same order as the booking locks: event, then ticket
+    _rollup_add(EventSalesRollup, {'event_id': event_id}, deltas)
+    _rollup_add(TicketSalesRollup, {'ticket_id': payment.ticket_id}, deltas)
+    _rollup_add(DailySalesRollup, {'event_id': event_id, 'day': timezone.localdate(payment.created_at)}, deltas)
+
+def sales_rollups_apply_many(*, payment_ids, sign: int = 1) -> None:
+    """
+    ``sales_rollups_apply`` for many payments at once: one grouped query
+    sums the payments per ticket and day, then each affected event, ticket
+    and day rollup row gets a single update.
+    """
+    groups = (
+        Payment.all_objects.filter(id__in=payment_ids).order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('ticket__event_id', 'ticket_id', 'day')
+        .annotate(registrations=Count('id'), tickets_sold=Sum('ticket_count'), revenue=Sum('amount'))
+    )
+    events, tickets, days = {}, {}, {}
+    for group in groups:
+        event_id = group['ticket__event_id']
+        for totals, key in ((events, event_id), (tickets, group['ticket_id']), (days, (event_id, group['day']))):
+            row = totals.setdefault(key, dict.fromkeys(('registrations', 'tickets_sold', 'revenue'), 0))
+            for field in row:
+                row[field] += sign * group[field]
+    # Same order as the booking locks: events, then tickets
+    for event_id, deltas in sorted(events.items()):
+        _rollup_add(EventSalesRollup, {'event_id': event_id}, deltas)
+    for ticket_id, deltas in sorted(tickets.items()):
+        _rollup_add(TicketSalesRollup, {'ticket_id': ticket_id}, deltas)
+    for (event_id, day), deltas in sorted(days.items()):
+        _rollup_add(DailySalesRollup, {'event_id': event_id, 'day': day}, deltas)
+
+def _rollup_add(model, key: dict, deltas: dict) -> None:
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # Another booking created the row first
+        model.objects.filter(**key).update(**changes)
+
+def payment_update(*, payment: Payment, data) -> Payment:
+    # The Payment receivers lock the row and move its totals between rollup rows
+    for field, value in data.items():
+        setattr(payment, field, value)
+    payment.save()
+    return payment
+
+def payment_delete(*, payment: Payment) -> None:
+    # The soft_deleted receiver takes the payment out of the sales rollups
+    payment.delete()
+
+def sales_rollups_rebuild(*, event_ids=None) -> int:
+    """
+    Recompute the sales rollups of ``event_ids`` (all events by default)
+    from the payments table. Each event is rebuilt in its own transaction
+    with its row locked, so counter bookings on it wait rather than
+    interleave. Returns the number of events rebuilt.
+    """
+    if event_ids is None:
+        event_ids = Event.all_objects.order_by('id').values_list('id', flat=True)
+    rebuilt = 0
+    for event_id in list(event_ids):
+        with transaction.atomic():
+            if not Event.all_objects.select_for_update().filter(id=event_id).values_list('id'):
+                continue
+            totals = selectors.sales_totals_raw(event_id=event_id)
+            EventSalesRollup.objects.filter(event_id=event_id).delete()
+            TicketSalesRollup.objects.filter(ticket__event_id=event_id).delete()
+            DailySalesRollup.objects.filter(event_id=event_id).delete()
+            if totals['event']['registrations']:
+                EventSalesRollup.objects.create(event_id=event_id, **totals['event'])
+            TicketSalesRollup.objects.bulk_create(
+                TicketSalesRollup(ticket_id=ticket_id, **row) for ticket_id, row in totals['tickets'].items()
+            )
+            DailySalesRollup.objects.bulk_create(
+                DailySalesRollup(event_id=event_id, day=day, **row) for day, row in totals['days'].items()
+            )
+        rebuilt += 1
+    return rebuilt
@@ -0,0 +1,135 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.cache import invalidate_on_commit
+from apps.core.signals import restored, soft_deleted
+from apps.tasks.services import enqueue_on_commit
+from .models import Category, Event, Payment, Ticket
+from .search import SEARCH_FIELD_WEIGHTS, token_index
+
+
+def event_cache_namespaces(*, event_ids=(), ticket_ids=(), category_ids=()) -> list:
+    """Response cache namespaces that embed the given rows."""
+    namespaces = []
+    if ticket_ids:
+        namespaces += ['tickets', *(f'tickets:{ticket_id}' for ticket_id in ticket_ids)]
+    if event_ids:
+        namespaces += ['events', *(f'events:{event_id}' for event_id in event_ids)]
+    if category_ids:
+        namespaces += ['categories', *(f'categories:{category_id}' for category_id in category_ids)]
+    return namespaces
+
+
+@receiver(post_save, sender=Event)
+def event_search_index_update(sender, instance, **kwargs):
+    token_index.update(instance)
+
+
+@receiver(post_delete, sender=Event)
+def event_search_index_remove(sender, instance, **kwargs):
+    token_index.remove(instance.id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_cache_invalidate(sender, instance, **kwargs):
+    invalidate_on_commit(*event_cache_namespaces(event_ids=[instance.id]))
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def ticket_cache_invalidate(sender, instance, **kwargs):
+    invalidate_on_commit(*event_cache_namespaces(event_ids=[instance.event_id], ticket_ids=[instance.id]))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Category)
+def image_renditions_queue(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if instance.image and instance.image_renditions.get('source') != instance.image.name:
+        from .tasks import image_renditions_build  # tasks imports this module
+
+        enqueue_on_commit(image_renditions_build, model=sender._meta.label_lower, pk=instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_cache_invalidate(sender, instance, **kwargs):
+    invalidate_on_commit(*event_cache_namespaces(category_ids=[instance.id]))
+
+
+# Bulk soft deletes and restores write with UPDATE, bypassing post_save
+@receiver(soft_deleted, sender=Event)
+@receiver(restored, sender=Event)
+def events_flag_changed(sender, pks, signal, **kwargs):
+    invalidate_on_commit(*event_cache_namespaces(event_ids=pks))
+    if signal is soft_deleted:
+        def update_index():
+            for event_id in pks:
+                token_index.remove(event_id)
+    else:
+        def update_index():
+            for event in Event.objects.filter(id__in=pks).only('id', 'is_deleted', *SEARCH_FIELD_WEIGHTS):
+                token_index.update(event)
+    transaction.on_commit(update_index)
+
+
+@receiver(soft_deleted, sender=Ticket)
+@receiver(restored, sender=Ticket)
+def tickets_flag_changed(sender, pks, **kwargs):
+    event_ids = Ticket.all_objects.filter(id__in=pks).values_list('event_id', flat=True).distinct()
+    invalidate_on_commit(*event_cache_namespaces(event_ids=list(event_ids), ticket_ids=pks))
+
+
+@receiver(soft_deleted, sender=Category)
+@receiver(restored, sender=Category)
+def categories_flag_changed(sender, pks, **kwargs):
+    invalidate_on_commit(*event_cache_namespaces(category_ids=pks))
+
+
+@receiver(soft_deleted, sender=Payment)
+@receiver(restored, sender=Payment)
+def payments_flag_changed(sender, pks, signal, **kwargs):
+    # Sales rollups count live payments only
+    from .services import sales_rollups_apply_many  # services imports this module
+
+    sales_rollups_apply_many(payment_ids=pks, sign=-1 if signal is soft_deleted else 1)
+
+
+# Payment fields the sales rollups are computed from
+PAYMENT_ROLLUP_FIELDS = {'ticket', 'ticket_count', 'amount', 'is_deleted', 'created_at'}
+
+
+def _payment_rollup_key(payment) -> tuple:
+    created = timezone.localdate(payment.created_at) if payment.created_at else None
+    return payment.ticket_id, payment.ticket_count, payment.amount, payment.is_deleted, created
+
+
+@receiver(pre_save, sender=Payment)
+def payment_rollups_lock(sender, instance, update_fields=None, **kwargs):
+    # Payment.save() runs in a transaction: lock the stored row so
+    # concurrent edits move the totals one after the other
+    instance._rollup_previous = None
+    if instance._state.adding or (update_fields is not None and not PAYMENT_ROLLUP_FIELDS & set(update_fields)):
+        return
+    instance._rollup_previous = Payment.all_objects.select_for_update().filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Payment)
+def payment_rollups_update(sender, instance, created, update_fields=None, **kwargs):
+    # Every save (API, admin, shell) keeps the sales rollups in step;
+    # bulk_create() and update() bypass this, see sales_rollups_rebuild
+    from .services import sales_rollups_apply  # services imports this module
+
+    previous = getattr(instance, '_rollup_previous', None)
+    if not created:
+        if previous is None or _payment_rollup_key(previous) == _payment_rollup_key(instance):
+            return
+        if not previous.is_deleted:
+            sales_rollups_apply(payment=previous, sign=-1)
+    if not instance.is_deleted:
+        sales_rollups_apply(payment=instance)
@@ -0,0 +1,74 @@
+"""
+Background tasks for events and bookings. Queue them with
+``apps.tasks.services.enqueue_on_commit`` so they only run for committed
+rows and keep mail delivery out of the request.
+"""
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+
+from apps.core.cache import invalidate_on_commit
+from apps.core.images import renditions_build
+from apps.tasks.registry import task
+from .models import Category, Event, Payment
+from .signals import event_cache_namespaces
+
+
+@task
+def send_booking_confirmation(*, payment_id):
+    """Email the buyer a confirmation of their booking."""
+    payment = Payment.objects.select_related('ticket__event').filter(id=payment_id).first()
+    if payment is None:
+        return  # Deleted before the job ran
+    ticket = payment.ticket
+    event = ticket.event
+    send_mail(
+        subject=f'Booking confirmed: {event.title}',
+        message=(
+            f'Hi {payment.full_name},\n\n'
+            f'Your booking of {payment.ticket_count} x {ticket.name} for {event.title} '
+            f'on {event.event_date:%d %b %Y} at {event.start_time:%H:%M}, {event.location} is confirmed.\n'
+            f'Amount paid: {payment.amount}\n'
+            f'Transaction: {payment.transaction_id}\n'
+        ),
+        from_email=None,
+        recipient_list=[payment.email],
+    )
+
+
+@task
+def notify_event_submitted(*, event_id):
+    """Tell the admins that an organizer submitted an event for review."""
+    event = Event.objects.select_related('auth_id').filter(id=event_id, status='pending').first()
+    if event is None:
+        return  # Already reviewed or deleted
+    admins = list(
+        get_user_model().objects.filter(role='admin', is_active=True).values_list('email', flat=True)
+    )
+    if not admins:
+        return
+    send_mail(
+        subject=f'New event awaiting review: {event.title}',
+        message=(
+            f'{event.auth_id.full_name} ({event.auth_id.email}) submitted "{event.title}" '
+            f'for {event.event_date:%d %b %Y}. Review it in the admin dashboard.\n'
+        ),
+        from_email=None,
+        recipient_list=admins,
+    )
+
+
+@task
+def image_renditions_build(*, model, pk):
+    """Build the WebP renditions of an event or category image."""
+    model = apps.get_model(model)
+    instance = model.all_objects.filter(pk=pk).only('id', 'image', 'image_renditions').first()
+    if instance is None or not instance.image:
+        return
+    if instance.image_renditions.get('source') == instance.image.name:
+        return  # Queued twice for the same upload
+    renditions = renditions_build(instance.image)
+    # A newer upload queued its own job; leave the row to it
+    if model.all_objects.filter(pk=pk, image=instance.image.name).update(image_renditions=renditions):
+        key = {Event: 'event_ids', Category: 'category_ids'}[model]
+        invalidate_on_commit(*event_cache_namespaces(**{key: [pk]}))
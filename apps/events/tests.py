@@ -0,0 +1,81 @@
+from datetime import date, time as dt_time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.accounts.tokens import RefreshToken
+from apps.core.pagination import CountOptionalPageNumberPagination, KeysetPagination
+from .models import Category, Event, InventorySlot, Ticket
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, PROFILER_ENABLED=False)
+class EventQueryCountTests(TestCase):
+    """
+    ``selectors.event_list_optimized`` loads every relation EventSerializer
+    reads, so a page of 50 events costs as many queries as a page of 5,
+    and an event with 50 ticket types as many as one with 5. A relation
+    added to the serializer without a matching selector change fails here.
+    """
+    SMALL, LARGE = 5, 50
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(email='organizer@example.com', full_name='Organizer')
+        cls.category = Category.objects.create(category_name='Music')
+        # Sharded, so serializing them reads their inventory slots too
+        for index in range(cls.LARGE + 1):
+            Event.objects.create(
+                title=f'Event {index}', category=cls.category, event_date=date(2030, 1, 1),
+                start_time=dt_time(18, 0), end_time=dt_time(22, 0), location='Arena',
+                mobile_number='0000000000', email='organizer@example.com', status='accepted',
+                total_seats=500, inventory_shards=1, auth_id=cls.organizer,
+            )
+        events = list(Event.objects.order_by('id'))
+        cls.small_event, cls.large_event = events[0], events[1]
+        Ticket.objects.bulk_create(
+            [Ticket(name=f'Tier {index}', price=10, total_seats=5, event=event)
+             for event, count in ((cls.small_event, cls.SMALL), (cls.large_event, cls.LARGE))
+             for index in range(count)]
+            + [Ticket(name='Tier 0', price=10, total_seats=5, event=event) for event in events[2:]]
+        )
+        InventorySlot.objects.bulk_create(
+            InventorySlot(event_id=ticket.event_id, ticket=ticket, slot=0, capacity=ticket.total_seats)
+            for ticket in Ticket.objects.all()
+        )
+
+    def setUp(self):
+        token = RefreshToken.for_user(self.organizer).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+    def assertQueriesAtPageSize(self, num, path, query=None, *, page_size):
+        with mock.patch.object(CountOptionalPageNumberPagination, 'page_size', page_size), \
+                mock.patch.object(KeysetPagination, 'page_size', page_size):
+            self.client.get(path, query)  # warm the token version cache
+            with self.assertNumQueries(num):
+                response = self.client.get(path, query)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list(self):
+        for page_size in (self.SMALL, self.LARGE):
+            response = self.assertQueriesAtPageSize(
+                8, '/api/events/', {'category': self.category.id}, page_size=page_size
+            )
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_list_cursor(self):
+        query = {'category': self.category.id, 'pagination': 'cursor'}
+        for page_size in (self.SMALL, self.LARGE):
+            response = self.assertQueriesAtPageSize(7, '/api/events/', query, page_size=page_size)
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_my_events(self):
+        for page_size in (self.SMALL, self.LARGE):
+            response = self.assertQueriesAtPageSize(5, '/api/events/my-events/', page_size=page_size)
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_retrieve(self):
+        for event, tickets in ((self.small_event, self.SMALL), (self.large_event, self.LARGE)):
+            response = self.assertQueriesAtPageSize(5, f'/api/events/{event.id}/', page_size=self.SMALL)
+            self.assertEqual(len(response.json()['tickets']), tickets)
@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from apps.core.asyncviews import read_view
 from .views import (
     CategoryViewSet,
     EventViewSet,
@@ -9,8 +10,8 @@ from .views import (
 
 urlpatterns = [
     # --- CATEGORY ENDPOINTS ---
-    path('categories/', CategoryViewSet.as_view({'get': 'list', 'post': 'create'}), name='category-list'),
-    path('categories/<int:pk>/', CategoryViewSet.as_view({
+    path('categories/', read_view(CategoryViewSet, {'get': 'list', 'post': 'create'}), name='category-list'),
+    path('categories/<int:pk>/', read_view(CategoryViewSet, {
         'get': 'retrieve', 
         'put': 'update', 
         'patch': 'partial_update', 
@@ -18,20 +19,23 @@ urlpatterns = [
     }), name='category-detail'),
 
     # --- EVENT ENDPOINTS ---
-    path('events/', EventViewSet.as_view({'get': 'list', 'post': 'create'}), name='event-list'),
+    path('events/', read_view(EventViewSet, {'get': 'list', 'post': 'create'}), name='event-list'),
+    path('events/import/', EventViewSet.as_view({'post': 'import_events'}), name='event-import'),
+    path('events/export/', EventViewSet.as_view({'get': 'export'}), name='event-export'),
     path('events/my-events/', EventViewSet.as_view({'get': 'my_events'}), name='event-my-events'),
-    path('events/<int:pk>/', EventViewSet.as_view({
+    path('events/<int:pk>/', read_view(EventViewSet, {
         'get': 'retrieve', 
         'put': 'update', 
         'patch': 'partial_update', 
         'delete': 'destroy'
     }), name='event-detail'),
+    path('events/<int:pk>/stats/', EventViewSet.as_view({'get': 'stats'}), name='event-stats'),
     path('events/<int:pk>/approve/', EventViewSet.as_view({'post': 'approve'}), name='event-approve'),
     path('events/<int:pk>/reject/', EventViewSet.as_view({'post': 'reject'}), name='event-reject'),
 
     # --- TICKET ENDPOINTS ---
-    path('tickets/', TicketViewSet.as_view({'get': 'list', 'post': 'create'}), name='ticket-list'),
-    path('tickets/<int:pk>/', TicketViewSet.as_view({
+    path('tickets/', read_view(TicketViewSet, {'get': 'list', 'post': 'create'}), name='ticket-list'),
+    path('tickets/<int:pk>/', read_view(TicketViewSet, {
         'get': 'retrieve', 
         'put': 'update', 
         'patch': 'partial_update', 
@@ -40,6 +44,7 @@ urlpatterns = [
 
     # --- PAYMENT ENDPOINTS ---
     path('payments/', PaymentViewSet.as_view({'get': 'list', 'post': 'create'}), name='payment-list'),
+    path('payments/export/', PaymentViewSet.as_view({'get': 'export'}), name='payment-export'),
     path('payments/summary/', PaymentViewSet.as_view({'get': 'summary'}), name='payment-summary'),
     path('payments/<int:pk>/', PaymentViewSet.as_view({
         'get': 'retrieve',
@@ -1,36 +1,61 @@
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 import json
 
+from . import selectors, services, tasks
 from .models import Category, Event, Ticket, Payment
-from .serializers import CategorySerializer, EventSerializer, TicketSerializer, PaymentSerializer
+from .search import EventSearchFilter
+from .serializers import (
+    CategorySerializer,
+    EventSerializer,
+    TicketSerializer,
+    PaymentSerializer,
+    PaymentListSerializer,
+    PaymentExportParamsSerializer,
+)
 from apps.accounts.permissions import IsAdminRole
+from apps.core.cache import CachedResponseMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.db.routers import ReplicaReadMixin
+from apps.core.streaming import FORMATS, detect_format, read_records, streaming_response
+from apps.tasks.services import enqueue_on_commit
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['category_name']
+    cache_collection = 'categories'
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
             return [permissions.AllowAny()]
         return [IsAdminRole()]
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'status', 'is_free', 'auth_id']
     search_fields = ['title', 'location', 'email']
     ordering_fields = ['event_date', 'created_at']
+    keyset_ordering = ('event_date', 'id')
+    cache_collection = 'events'
+    cache_namespaces = ('categories', 'users')
+
+    def get_queryset(self):
+        return selectors.event_list_optimized(
+            super().get_queryset(), fields=self.get_serializer_class().Meta.fields
+        )
 
     @action(detail=False, methods=['get'], url_path='my-events')
     def my_events(self, request):
         """Get events created by the current user"""
-        events = self.queryset.filter(auth_id=request.user)
+        events = self.get_queryset().filter(auth_id=request.user)
         page = self.paginate_queryset(events)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -106,10 +131,48 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance, data=data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+
+        if getattr(instance, '_prefetched_objects_cache', None):
+            # Tickets were prefetched by get_queryset() before the sync
+            instance._prefetched_objects_cache = {}
         return Response(serializer.data)
 
     def perform_create(self, serializer):
-        serializer.save(auth_id=self.request.user)
+        event = serializer.save(auth_id=self.request.user)
+        enqueue_on_commit(tasks.notify_event_submitted, event_id=event.id)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_events(self, request):
+        """Create events from an uploaded CSV or NDJSON file, reporting bad rows"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Upload a CSV or NDJSON file.'})
+        fmt = request.data.get('file_format') or detect_format(upload.name, upload.content_type)
+        if fmt not in FORMATS:
+            raise ValidationError({'file_format': f'Choose one of: {", ".join(FORMATS)}.'})
+
+        report = services.events_import(organizer=request.user, records=read_records(upload, fmt))
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the caller's events (all events for admins) as CSV or NDJSON"""
+        fmt = request.query_params.get('file_format', 'ndjson')
+        if fmt not in FORMATS:
+            raise ValidationError({'file_format': f'Choose one of: {", ".join(FORMATS)}.'})
+        queryset = self.filter_queryset(self.get_queryset())
+        if request.user.role != 'admin':
+            queryset = queryset.filter(auth_id=request.user)
+        rows = selectors.event_export_rows(queryset)
+        return streaming_response(rows, fmt, selectors.EVENT_EXPORT_FIELDS, 'events')
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Registration and revenue totals, for the organizer or an admin"""
+        event = self.get_object()
+        if request.user.role != 'admin' and event.auth_id_id != request.user.id:
+            raise PermissionDenied('You can only view stats for your own events.')
+        return Response(selectors.event_get_stats(event))
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminRole])
     def approve(self, request, pk=None):
@@ -125,11 +188,16 @@ class EventViewSet(viewsets.ModelViewSet):
         event.save()
         return Response({'status': 'event rejected'})
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['event', 'is_deleted_field']
+    cache_collection = 'tickets'
+    cache_namespaces = ('events',)
+
+    def get_queryset(self):
+        return selectors.ticket_list_optimized(super().get_queryset())
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -142,6 +210,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['ticket', 'email', 'ticket__event']
     search_fields = ['transaction_id', 'full_name', 'email']
+    keyset_ordering = ('-created_at', '-id')
 
     def get_permissions(self):
         if self.action == 'create':
@@ -150,49 +219,70 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = self.queryset.select_related('ticket__event')
         if user.role == 'admin':
-            return self.queryset
-        return self.queryset.filter(ticket__event__auth_id=user)
+            return queryset
+        return queryset.filter(ticket__event__auth_id=user)
+
+    def list(self, request, *args, **kwargs):
+        # Serialize flat rows instead of Payment -> Ticket -> Event instances
+        queryset = selectors.payment_list_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = PaymentListSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = PaymentListSerializer(queryset, many=True)
+        return Response(serializer.data)
 
     def perform_create(self, serializer):
-        from django.db import transaction
-        from django.shortcuts import get_object_or_404
-        
-        with transaction.atomic():
-            ticket_id = self.request.data.get('ticket')
-            ticket_count = int(self.request.data.get('ticket_count', 1))
-            ticket = get_object_or_404(Ticket, id=ticket_id)
-            event = ticket.event
-
-            # Check for generic event seat availability if applicable
-            if event.total_seats > 0 and (event.booked_seats + ticket_count) > event.total_seats:
-                from rest_framework.exceptions import ValidationError
-                raise ValidationError("Not enough seats available for this event.")
-
-            # Check for specific ticket seat availability
-            if (ticket.booked_seats + ticket_count) > ticket.total_seats:
-                from rest_framework.exceptions import ValidationError
-                raise ValidationError("Not enough slots available for this ticket type.")
-
-            # Increment booked seats
-            ticket.booked_seats += ticket_count
-            ticket.save()
-            
-            event.booked_seats += ticket_count
-            event.save()
-
-            serializer.save()
+        ticket = serializer.validated_data['ticket']
+        ticket_count = serializer.validated_data.get('ticket_count', 1)
+
+        def book():
+            # Each attempt creates its own row: serializer.save() would
+            # update the instance a rolled-back attempt left behind
+            services.seats_reserve(ticket_id=ticket.id, ticket_count=ticket_count)
+            payment = Payment.objects.create(**serializer.validated_data)
+            enqueue_on_commit(tasks.send_booking_confirmation, payment_id=payment.id)
+            return payment
+
+        serializer.instance = services.booking_run_with_retry(book)
+
+    def perform_update(self, serializer):
+        services.payment_update(payment=serializer.instance, data=serializer.validated_data)
+
+    def perform_destroy(self, instance):
+        services.payment_delete(payment=instance)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream payments as CSV or NDJSON for reconciliation"""
+        params = PaymentExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        queryset = selectors.payment_list_filter(
+            self.filter_queryset(self.get_queryset()),
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to'),
+            event_id=params.get('event'),
+            organizer_id=params.get('organizer'),
+        )
+        rows = selectors.payment_export_rows(queryset)
+        return streaming_response(rows, params['file_format'], selectors.PAYMENT_EXPORT_FIELDS, 'payments')
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get total revenue and transaction count"""
-        queryset = self.filter_queryset(self.get_queryset())
-        from django.db.models import Sum, Count
-        summary_data = queryset.aggregate(
-            total_revenue=Sum('amount'),
-            total_transactions=Count('id')
-        )
-        return Response({
-            'total_revenue': summary_data['total_revenue'] or 0,
-            'total_transactions': summary_data['total_transactions'] or 0
-        })
+        params = request.query_params
+        if any(params.get(name) for name in ('email', 'search')):
+            # Row-level filters the rollups cannot answer
+            return Response(selectors.payment_get_summary_raw(self.filter_queryset(self.get_queryset())))
+
+        self.filter_queryset(self.get_queryset())  # validates the filter values
+        user = request.user
+        return Response(selectors.payment_get_summary(
+            organizer=None if user.role == 'admin' else user,
+            event_id=params.get('ticket__event') or None,
+            ticket_id=params.get('ticket') or None,
+        ))
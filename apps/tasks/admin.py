@@ -0,0 +1,18 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_at', 'finished_at', 'locked_by']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error']
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_now(self, request, queryset):
+        count = queryset.exclude(status='running').update(status='queued', run_at=timezone.now(), attempts=0)
+        self.message_user(request, f'Re-queued {count} job(s).', messages.SUCCESS)
@@ -0,0 +1,34 @@
+"""
+Run background jobs from the task_jobs table.
+
+Start one or more of these next to the web processes; every process runs
+up to ``--concurrency`` jobs at a time on threads. Use ``--once`` from cron
+or tests to drain the due jobs and exit.
+"""
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Process queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Jobs run in parallel by this process')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options['concurrency'], poll_interval=options['poll_interval'])
+
+        def shutdown(signum, frame):
+            self.stdout.write('Stopping after the running jobs finish...')
+            worker.stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        self.stdout.write(f'Worker {worker.worker_id} started ({options["concurrency"]} threads)')
+        ran = worker.run(once=options['once'])
+        self.stdout.write(f'Ran {ran} job(s)')
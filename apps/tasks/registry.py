@@ -0,0 +1,32 @@
+"""
+Task registry.
+
+Decorate a function with ``@task`` in an app's ``tasks.py`` to make it
+runnable by the worker; ``apps.tasks`` imports those modules at startup.
+Tasks receive their JSON payload as keyword arguments, so pass ids
+rather than model instances.
+"""
+TASKS = {}
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+def task(func=None, *, name=None, max_attempts=5):
+    """Register ``func`` under ``name`` (default: ``module.function``)."""
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        func.task_name = task_name
+        func.max_attempts = max_attempts
+        TASKS[task_name] = func
+        return func
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise UnknownTask(f'No task registered as {name!r}')
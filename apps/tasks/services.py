@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+
+def enqueue(task, *, delay: timedelta = None, **payload) -> Job:
+    """
+    Queue ``task`` (a registered function or its name) to run with
+    ``payload`` as keyword arguments. Inside a transaction the job commits
+    or rolls back with it.
+    """
+    func = get_task(task if isinstance(task, str) else task.task_name)
+    return Job.objects.create(
+        name=func.task_name,
+        payload=payload,
+        max_attempts=func.max_attempts,
+        run_at=timezone.now() + (delay or timedelta(0)),
+    )
+
+
+def enqueue_on_commit(task, **kwargs) -> None:
+    """
+    Queue ``task`` once the current transaction commits, keeping the job
+    insert out of short, contended transactions such as bookings. Nothing
+    is queued if the transaction rolls back.
+    """
+    get_task(task if isinstance(task, str) else task.task_name)  # fail fast on typos
+    transaction.on_commit(lambda: enqueue(task, **kwargs))
+
+
+def jobs_prune(*, older_than: timedelta) -> int:
+    """Delete finished jobs older than ``older_than``; failed jobs are kept for inspection."""
+    deleted, _ = Job.objects.filter(status='done', finished_at__lt=timezone.now() - older_than).delete()
+    return deleted
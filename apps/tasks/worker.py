@@ -0,0 +1,113 @@
+"""
+Job worker: claims due jobs from the ``task_jobs`` table and runs them on
+a thread pool.
+
+A job is claimed with ``UPDATE ... SET status='running' WHERE id = %s AND
+status = 'queued'``, so any number of worker processes can poll the same
+table without a broker. Failed jobs are re-queued with exponential
+backoff until ``max_attempts``; jobs left ``running`` by a crashed worker
+are re-queued once their lease expires.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import UnknownTask, get_task
+from .services import jobs_prune
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(self, *, concurrency: int = 4, poll_interval: float = 1.0):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.stop = threading.Event()
+        self.lease = timedelta(seconds=settings.TASKS_LEASE_SECONDS)
+
+    def claim(self, limit: int) -> list:
+        """Claim up to ``limit`` due jobs for this worker."""
+        now = timezone.now()
+        # Give back jobs whose worker died mid-run
+        Job.objects.filter(status='running', locked_at__lt=now - self.lease).update(status='queued', locked_by='')
+
+        due = Job.objects.filter(status='queued', run_at__lte=now).order_by('run_at', 'id')
+        claimed = []
+        for job_id in due.values_list('id', flat=True)[:limit * 2]:
+            won = Job.objects.filter(id=job_id, status='queued').update(
+                status='running', locked_by=self.worker_id, locked_at=now, attempts=F('attempts') + 1,
+            )
+            if won:
+                claimed.append(job_id)
+                if len(claimed) == limit:
+                    break
+        return list(Job.objects.filter(id__in=claimed, locked_by=self.worker_id).order_by('run_at', 'id'))
+
+    def execute(self, job: Job) -> bool:
+        """Run one claimed job and record the outcome. Returns True on success."""
+        close_old_connections()
+        try:
+            func = get_task(job.name)
+            func(**job.payload)
+        except Exception as exc:
+            self._failed(job, exc)
+            return False
+        else:
+            Job.objects.filter(id=job.id, locked_by=self.worker_id).update(
+                status='done', finished_at=timezone.now(), last_error='',
+            )
+            return True
+        finally:
+            close_old_connections()
+
+    def _failed(self, job: Job, exc: Exception):
+        error = ''.join(traceback.format_exception(exc))
+        if isinstance(exc, UnknownTask) or job.attempts >= job.max_attempts:
+            logger.error('Task %s #%s failed permanently: %s', job.name, job.id, exc)
+            changes = {'status': 'failed', 'finished_at': timezone.now()}
+        else:
+            delay = settings.TASKS_RETRY_BACKOFF * (2 ** (job.attempts - 1)) * random.uniform(0.5, 1.5)
+            logger.warning('Task %s #%s failed (attempt %s), retrying in %.0fs: %s', job.name, job.id, job.attempts, delay, exc)
+            changes = {'status': 'queued', 'run_at': timezone.now() + timedelta(seconds=delay)}
+        Job.objects.filter(id=job.id, locked_by=self.worker_id).update(last_error=error, locked_by='', **changes)
+
+    def run(self, *, once: bool = False) -> int:
+        """
+        Poll and run jobs until ``stop`` is set, or with ``once`` until no
+        job is due. Returns the number of jobs run.
+        """
+        ran = 0
+        pending = set()
+        last_prune = None
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task') as pool:
+            while not self.stop.is_set():
+                if last_prune is None or timezone.now() - last_prune > timedelta(hours=1):
+                    jobs_prune(older_than=timedelta(days=settings.TASKS_KEEP_DONE_DAYS))
+                    last_prune = timezone.now()
+
+                free = self.concurrency - len(pending)
+                jobs = self.claim(free) if free else []
+                pending.update(pool.submit(self.execute, job) for job in jobs)
+                ran += len(jobs)
+
+                if not pending:
+                    if once:
+                        break
+                    self.stop.wait(self.poll_interval)
+                    continue
+                done, pending = wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+            wait(pending)
+        return ran
@@ -20,4 +20,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from apps.core.asgi import FinishRequestMiddleware  # noqa: E402 (needs the app registry)
+
+application = FinishRequestMiddleware(django_application)
@@ -4,7 +4,7 @@ Django settings for config project.
 
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,15 +32,19 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     
     # Local apps
     'apps.core',
     'apps.accounts',
     'apps.events',
+    'apps.tasks',
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.MetricsMiddleware',
+    'apps.core.middleware.ProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -49,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -73,21 +78,113 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 
 # Database - MySQL Configuration
+# DB_ENGINE=apps.core.db.backends.mysql draws connections from an in-process
+# pool (see apps/core/db/pool.py); use it with DB_CONN_MAX_AGE=0 so every
+# request hands its connection back. It is the option that works under ASGI,
+# where each request runs on a new thread and thread-bound connections
+# (DB_CONN_MAX_AGE > 0) are never reused.
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.mysql')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': DB_ENGINE,
         'NAME': config('DB_NAME', default='event_management'),
         'USER': config('DB_USER', default='root'),
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='3306'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'POOL': {
+            'SIZE': config('DB_POOL_SIZE', default=10, cast=int),
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            'RECYCLE': config('DB_POOL_RECYCLE', default=3600, cast=int),
+            'PING_AFTER': config('DB_POOL_PING_AFTER', default=30, cast=int),
+        },
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
-        },
+        } if 'mysql' in DB_ENGINE else {},
     }
 }
 
+# Read replicas for the public catalog reads (see apps.core.db.routers):
+# comma-separated host[:port] entries sharing the primary's credentials,
+# or database files when DB_ENGINE is SQLite (local testing).
+for _index, _replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    if 'sqlite' in DB_ENGINE:
+        _location = {'NAME': _replica}
+    else:
+        _host, _, _port = _replica.partition(':')
+        _location = {'HOST': _host, 'PORT': _port or DATABASES['default']['PORT']}
+    DATABASES[f'replica_{_index}'] = {**DATABASES['default'], **_location, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['apps.core.db.routers.ReplicaRouter']
+# Replicas further behind the primary than this are skipped; clients that
+# wrote recently read from the primary for this long plus one check interval.
+DB_REPLICA_MAX_LAG = config('DB_REPLICA_MAX_LAG', default=5, cast=int)
+DB_REPLICA_CHECK_INTERVAL = config('DB_REPLICA_CHECK_INTERVAL', default=5, cast=int)
+
+
+# Cache - locmem by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache or filebased)
+# when running several worker processes. The refresh token blacklist filter
+# only runs on a shared backend (system check accounts.W001 warns otherwise).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='eventhub'),
+    }
+}
+
+# Response cache for the public catalog endpoints (seconds)
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+RESPONSE_CACHE_LOCK_TIMEOUT = config('RESPONSE_CACHE_LOCK_TIMEOUT', default=5, cast=int)
+
+# Uploaded images: size caps, and the WebP renditions built for them
+IMAGE_MAX_UPLOAD_BYTES = config('IMAGE_MAX_UPLOAD_BYTES', default=5 * 1024 * 1024, cast=int)
+IMAGE_MAX_PIXELS = config('IMAGE_MAX_PIXELS', default=40_000_000, cast=int)
+IMAGE_WEBP_QUALITY = config('IMAGE_WEBP_QUALITY', default=80, cast=int)
+IMAGE_RENDITIONS = {  # name: longest side in pixels
+    'thumb': 320,
+    'card': 640,
+    'large': 1280,
+}
+
+# Background tasks (run with `manage.py run_tasks`)
+TASKS_RETRY_BACKOFF = config('TASKS_RETRY_BACKOFF', default=10, cast=int)  # seconds, doubled per attempt
+TASKS_LEASE_SECONDS = config('TASKS_LEASE_SECONDS', default=600, cast=int)  # re-queue jobs of dead workers
+TASKS_KEEP_DONE_DAYS = config('TASKS_KEEP_DONE_DAYS', default=7, cast=int)
+
+# Email (console by default; set EMAIL_BACKEND/EMAIL_HOST for SMTP)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='EventHub <no-reply@eventhub.local>')
+
+
+# Serve the public catalog GETs (categories, events, tickets) from async
+# views. Enable when running under an ASGI server such as uvicorn.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+# Request profiler (apps/core/profiling.py): query count, DB and serializer
+# time per viewset action for a sample of the requests, at /api/ops/profile/
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=True, cast=bool)
+PROFILER_SAMPLE_RATE = config('PROFILER_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float)
+PROFILER_SERVER_TIMING = config('PROFILER_SERVER_TIMING', default=DEBUG, cast=bool)
+PROFILER_WINDOW_SECONDS = config('PROFILER_WINDOW_SECONDS', default=600, cast=int)
+PROFILER_SLOW_MS = config('PROFILER_SLOW_MS', default=1000, cast=int)
+
+# Prometheus metrics at /metrics (apps/core/metrics.py). Point METRICS_DIR at
+# a directory shared by the worker processes of a host (emptied on restart)
+# to aggregate them; outside DEBUG scrapers send "Bearer <METRICS_TOKEN>".
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,22 +229,29 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.HybridPagination',
     'PAGE_SIZE': 10,
 }
 
+# Event search engine: 'auto' (FULLTEXT on MySQL, LIKE elsewhere), 'mysql',
+# 'memory' (per-process index, single-process setups only) or 'like'.
+# The memory index orders its first EVENT_SEARCH_MAX_RESULTS matches by
+# relevance and the rest by id.
+EVENT_SEARCH_BACKEND = config('EVENT_SEARCH_BACKEND', default='auto')
+EVENT_SEARCH_MAX_RESULTS = config('EVENT_SEARCH_MAX_RESULTS', default=1000, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': False,  # AccountLoginView records last_login itself
 
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -160,10 +264,26 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
 
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('apps.accounts.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.TokenRefreshSerializer',
 }
 
+# How long a user's token version stays cached. Revocation is immediate
+# with a shared cache; with per-process caches other workers notice
+# within this many seconds.
+TOKEN_VERSION_CACHE_SECONDS = config('TOKEN_VERSION_CACHE_SECONDS', default=300, cast=int)
+
+# Refresh token blacklist: how often each worker rebuilds its Bloom filter
+# of blacklisted tokens, the share of unlisted tokens it lets through to
+# the database, and how far back each incremental load re-reads (longer
+# than any transaction that blacklists a token). The filter needs a shared
+# cache; with locmem or dummy it is disabled and every check goes to the
+# database. Run prune_token_blacklist from cron to drop expired rows.
+TOKEN_BLACKLIST_REBUILD_SECONDS = config('TOKEN_BLACKLIST_REBUILD_SECONDS', default=300, cast=int)
+TOKEN_BLACKLIST_FALSE_POSITIVE_RATE = config('TOKEN_BLACKLIST_FALSE_POSITIVE_RATE', default=0.01, cast=float)
+TOKEN_BLACKLIST_SYNC_OVERLAP_SECONDS = config('TOKEN_BLACKLIST_SYNC_OVERLAP_SECONDS', default=60, cast=int)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',